@@ -0,0 +1,175 @@
+# ass_writer.py
+# 한글/영어 SRT를 하나의 ASS 파일로 합쳐 쓰는 스트리밍 작성기 (세 프로세서 공용)
+# - cue는 겹침 수정/검사 때 캐시된 cue 저장소가 있으면 그것을 쓰고, 없으면 파일을 캐시에 올리지 않고 스트리밍으로 읽음
+# - 시간은 정수 ms에서 바로 'H:MM:SS.cc' 문자열로 변환
+# - 글꼴 크기/위치는 (언어, 글꼴 크기, 위치)마다 스타일 하나로 미리 만들고 (Alignment 8 + 여백),
+#   Dialogue 줄에는 {\fs..}{\pos(..)} 태그 없이 스타일 이름만 씀
+# - 두 트랙의 Dialogue 줄은 시작 시각 순서로 합쳐(heapq.merge) 일정 개수씩 묶어서 한 번에 기록
+#   (시작 시각 순서가 아닌 트랙은 cue 위치를 정렬한 뒤 합침)
+# 스타일 목록을 먼저 써야 하므로 cue 목록을 두 번 훑습니다 (첫 번째에 스타일을 수집하고 cue별 스타일 번호만 보관).
+
+import heapq
+from array import array
+from collections import namedtuple
+from itertools import islice
+from operator import itemgetter, le
+
+from srt_cues import SubtitleCues, cached_cues, iter_srt, ms_to_ass_time, parse_srt
+from utils import offset_position_for_slot
+
+# 한 번에 묶어서 쓸 Dialogue 줄 수
+WRITE_BATCH_SIZE = 2048
+
+ASS_SCRIPT_INFO_TEMPLATE = (
+    "[Script Info]\n"
+    "ScriptType: v4.00+\n"
+    "PlayResX: {width}\n"
+    "PlayResY: {height}\n"
+    "ScaledBorderAndShadow: yes\n\n"
+    "[V4+ Styles]\n"
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+    "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+    "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+)
+
+# Alignment 8: Top Center (텍스트가 아래로 확장되도록 유도). MarginV가 텍스트 윗변의 y 위치
+ASS_STYLE_TEMPLATE = (
+    "Style: {name},{font},{size},&H00FFFFFF,&H000000FF,&H00000000,&H00000000,1,0,0,0,100,100,0,0,1,3,0,8,"
+    "{margin_l},{margin_r},{margin_v},1\n"
+)
+
+ASS_EVENTS_HEADER = (
+    "\n"
+    "[Events]\n"
+    "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+)
+
+# 트랙 스타일(언어)별 글꼴
+STYLE_FONTS = {'Korean': 'NanumGothic', 'English': 'Arial'}
+
+# 좌우 기본 여백 (줄바꿈 너비 = PlayResX - 좌우 여백)
+BASE_MARGIN = 10
+
+
+# ASS에 쓸 자막 트랙 하나
+# - layout: text → (font_size, pos_x, pos_y) 를 계산하는 함수 (프로세서별 adjust_font_size_and_position)
+# - stack_downward: 'stack' 겹침 정책에서 추가 줄을 아래(True)/위(False)로 쌓을지
+SubtitleTrack = namedtuple('SubtitleTrack', ['srt_path', 'style', 'layout', 'stack_downward'])
+
+
+def style_key(track, text, slot, width):
+    """
+    cue 하나의 스타일 키 (언어, 글꼴 크기, 왼쪽 여백, 오른쪽 여백, MarginV)
+    레이아웃 함수의 (pos_x, pos_y)를 Alignment 8 기준 여백으로 바꿈 (가로 중심 = pos_x, 윗변 = pos_y)
+    """
+    font_size, pos_x, pos_y = track.layout(text)
+    if slot:
+        pos_y = offset_position_for_slot(pos_y, font_size, slot, track.stack_downward)
+    margin_l = BASE_MARGIN + max(0, 2 * pos_x - width)
+    margin_r = BASE_MARGIN + max(0, width - 2 * pos_x)
+    return track.style, font_size, margin_l, margin_r, pos_y
+
+
+def name_styles(keys):
+    """
+    스타일 키마다 이름을 붙임 (예: Korean72, 같은 크기의 다른 위치는 Korean72_2 ...)
+    언어/크기/위치 순서로 정렬해 같은 입력이면 항상 같은 이름
+    """
+    names = {}
+    counts = {}
+    for key in sorted(keys):
+        base = f"{key[0]}{key[1]}"
+        counts[base] = counts.get(base, 0) + 1
+        names[key] = base if counts[base] == 1 else f"{base}_{counts[base]}"
+    return names
+
+
+def collect_track_styles(track, cues, width, style_ids):
+    """
+    1차: 트랙의 cue마다 스타일 키를 계산해 style_ids(키 → 번호)에 등록
+    (2차에서 레이아웃을 다시 계산하지 않도록 cue당 2바이트만 보관)
+    cues는 캐시된 cue 저장소(배열을 바로 훑음) 또는 파일에서 스트리밍하는 Cue 반복자
+    (cue별 스타일 번호 배열, cue가 시작 시각 순서인지)를 반환
+    """
+    ids = array('H')
+    if isinstance(cues, SubtitleCues):
+        slots = cues.slots
+        for i in range(len(cues)):
+            key = style_key(track, cues.text(i).replace('\n', ' '), slots[i] if slots is not None else 0, width)
+            ids.append(style_ids.setdefault(key, len(style_ids)))
+        return ids, all(map(le, cues.starts[:-1], cues.starts[1:]))
+
+    in_order = True
+    previous_start = None
+    for cue in cues:
+        key = style_key(track, cue.text.replace('\n', ' '), cue.slot, width)
+        ids.append(style_ids.setdefault(key, len(style_ids)))
+        if previous_start is not None and cue.start_ms < previous_start:
+            in_order = False
+        previous_start = cue.start_ms
+    return ids, in_order
+
+
+def iter_track_events(cues, ids, style_names, order=None):
+    """
+    2차: (시작 ms, 종료 ms, 스타일 이름, 텍스트)를 yield
+    cue 저장소는 order(시작 시각 순 위치 목록, 없으면 저장 순서)대로 배열을 바로 훑고,
+    스트리밍 반복자는 읽은 순서대로 (시작 시각 순서인 트랙만 스트리밍으로 읽음)
+    """
+    if not isinstance(cues, SubtitleCues):
+        for cue, style_id in zip(cues, ids):
+            yield cue.start_ms, cue.end_ms, style_names[style_id], cue.text.replace('\n', ' ')
+        return
+    starts, ends, text = cues.starts, cues.ends, cues.text
+    for i in (order if order is not None else range(len(cues))):
+        yield starts[i], ends[i], style_names[ids[i]], text(i).replace('\n', ' ')
+
+
+def write_merged_ass(merged_ass, width, height, tracks, batch_size=WRITE_BATCH_SIZE):
+    """
+    헤더, 사용하는 스타일 목록, 시작 시각 순서로 합친 Dialogue 줄을 merged_ass 파일에 기록
+    height는 패딩을 포함한 최종 캔버스 높이(PlayResY)입니다.
+    캐시에 cue 저장소가 없는 트랙은 파일을 두 번 스트리밍으로 읽으며, 시작 시각 순서가 아닌 트랙만
+    이번 작업 동안 파싱해서 위치를 정렬합니다 (시작 시각이 같으면 tracks 순서, 트랙 안에서는 파일 순서).
+    """
+    tracks = [track for track in tracks if track.srt_path]
+
+    # 1차: 사용하는 스타일 수집
+    style_ids = {}
+    sources = []  # 트랙별 (cue 저장소 또는 None, 스타일 번호 배열, 정렬 순서 또는 None)
+    for track in tracks:
+        cues = cached_cues(track.srt_path)
+        ids, in_order = collect_track_styles(track, cues if cues is not None else iter_srt(track.srt_path),
+                                             width, style_ids)
+        order = None
+        if not in_order:
+            if cues is None:
+                cues = parse_srt(track.srt_path)
+            order = sorted(range(len(cues)), key=cues.starts.__getitem__)
+        sources.append((cues, ids, order))
+    names = name_styles(style_ids)
+    style_names = [None] * len(style_ids)
+    for key, style_id in style_ids.items():
+        style_names[style_id] = names[key]
+
+    with open(merged_ass, 'w', encoding='utf-8') as f:
+        f.write(ASS_SCRIPT_INFO_TEMPLATE.format(width=width, height=height))
+        f.writelines(
+            ASS_STYLE_TEMPLATE.format(name=names[key], font=STYLE_FONTS.get(key[0], 'Arial'), size=key[1],
+                                      margin_l=key[2], margin_r=key[3], margin_v=key[4])
+            for key in sorted(style_ids)
+        )
+        f.write(ASS_EVENTS_HEADER)
+
+        # 2차: 두 트랙을 시작 시각 순서로 합쳐 기록
+        events = heapq.merge(*(iter_track_events(cues if cues is not None else iter_srt(track.srt_path),
+                                                   ids, style_names, order)
+                               for track, (cues, ids, order) in zip(tracks, sources)),
+                             key=itemgetter(0))
+        lines = (f"Dialogue: 0,{ms_to_ass_time(start)},{ms_to_ass_time(end)},{style},,0,0,0,,{text}\n"
+                 for start, end, style, text in events)
+        while True:
+            batch = list(islice(lines, batch_size))
+            if not batch:
+                break
+            f.write(''.join(batch))
@@ -0,0 +1,176 @@
+# batch_journal.py
+# 배치 작업 저널: 작업마다 상태 변화(pending → running → done / failed)를 SQLite에 기록해서
+# GUI나 시스템이 중간에 종료되어도 다음 실행 때 남은 작업만 이어서 처리할 수 있게 합니다.
+# - jobs: 작업별 현재 상태, job_events: 상태 변화 기록 (추가만 함)
+# - 이어서 처리할 때 중단된 작업의 미완성 출력(*.partial.*)과 스크래치 공간에 남은 임시 파일도 정리합니다.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from scratch import get_scratch_space
+from utils import get_cache_dir, get_partial_output_path
+
+CACHE_FILE_NAME = "batch_journal.sqlite3"
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+class JournaledBatch:
+    """저널에 기록 중인 배치 하나 (스케줄러/GUI/CLI에서 상태 변화를 알릴 때 사용)"""
+
+    def __init__(self, journal, batch_id):
+        self.journal = journal
+        self.batch_id = batch_id
+
+    def job_started(self, index):
+        self.journal.set_job_state(self.batch_id, index, JOB_RUNNING)
+
+    def job_finished(self, index, result):
+        status, message = result[0], result[1]
+        state = JOB_DONE if status in ('Success', 'Warning') else JOB_FAILED
+        self.journal.set_job_state(self.batch_id, index, state, status, message)
+
+    def finish(self):
+        self.journal.finish_batch(self.batch_id)
+
+
+class BatchJournal:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self._lock = threading.Lock()
+        with self._lock, self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS batches ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, batch_key TEXT, settings_json TEXT,"
+                " created_at REAL, finished_at REAL);"
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " batch_id INTEGER, job_index INTEGER, video TEXT, korean_srt TEXT, english_srt TEXT,"
+                " state TEXT, status TEXT, message TEXT, updated_at REAL,"
+                " PRIMARY KEY (batch_id, job_index));"
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " batch_id INTEGER, job_index INTEGER, state TEXT, at REAL);"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start_batch(self, jobs, settings, batch_key='gui'):
+        """
+        새 배치 기록 시작. jobs: [(video, korean_srt, english_srt), ...]
+        같은 batch_key의 끝나지 않은 이전 배치는 종료 처리됩니다 (새 배치가 대체).
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE batches SET finished_at = ? WHERE batch_key = ? AND finished_at IS NULL",
+                         (now, batch_key))
+            batch_id = conn.execute(
+                "INSERT INTO batches (batch_key, settings_json, created_at) VALUES (?, ?, ?)",
+                (batch_key, json.dumps(settings, ensure_ascii=False), now)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO jobs (batch_id, job_index, video, korean_srt, english_srt, state, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(batch_id, i, video, kor, eng, JOB_PENDING, now) for i, (video, kor, eng) in enumerate(jobs)]
+            )
+        return JournaledBatch(self, batch_id)
+
+    def set_job_state(self, batch_id, index, state, status=None, message=None):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, status = COALESCE(?, status), message = COALESCE(?, message),"
+                " updated_at = ? WHERE batch_id = ? AND job_index = ?",
+                (state, status, message, now, batch_id, index)
+            )
+            conn.execute("INSERT INTO job_events (batch_id, job_index, state, at) VALUES (?, ?, ?, ?)",
+                         (batch_id, index, state, now))
+
+    def finish_batch(self, batch_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE batches SET finished_at = ? WHERE id = ?", (time.time(), batch_id))
+
+    def find_unfinished(self, batch_key='gui'):
+        """
+        끝나지 않은 가장 최근 배치를 찾아 dict로 반환 (없으면 None)
+        - settings: 배치 시작 시 저장한 설정
+        - pending: 아직 끝나지 않은 작업 [(video, korean_srt, english_srt), ...] (실행 중이던 작업 포함)
+        - results: 이미 끝난 작업의 (status, message) 목록 (finished_indices와 같은 순서)
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, settings_json FROM batches WHERE batch_key = ? AND finished_at IS NULL"
+                " ORDER BY id DESC LIMIT 1", (batch_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            batch_id, settings_json = row
+            jobs = conn.execute(
+                "SELECT job_index, video, korean_srt, english_srt, state, status, message FROM jobs"
+                " WHERE batch_id = ? ORDER BY job_index", (batch_id,)
+            ).fetchall()
+
+        pending, pending_indices, results, finished_indices = [], [], [], []
+        for job_index, video, kor, eng, state, status, message in jobs:
+            if state in (JOB_DONE, JOB_FAILED):
+                results.append((status, message))
+                finished_indices.append(job_index)
+            else:
+                pending.append((video, kor, eng))
+                pending_indices.append(job_index)
+        return {
+            'batch_id': batch_id,
+            'settings': json.loads(settings_json or '{}'),
+            'pending': pending,
+            'pending_indices': pending_indices,
+            'results': results,
+            'finished_indices': finished_indices,
+        }
+
+    def resume(self, batch_id):
+        """끝나지 않은 배치를 이어서 기록 (작업 번호는 find_unfinished의 pending_indices 사용)"""
+        return JournaledBatch(self, batch_id)
+
+    def discard(self, batch_id):
+        """이어서 처리하지 않기로 한 배치를 종료 처리"""
+        self.finish_batch(batch_id)
+
+
+def cleanup_orphans(videos, output_paths_for, scratch_dir=None):
+    """
+    중단된 작업이 남긴 미완성 출력과 임시 파일을 삭제하고, 삭제한 미완성 출력 경로 목록을 반환
+    - output_paths_for(video): 작업의 최종 출력 경로 목록 (VideoProcessorManager.get_output_paths).
+      그 경로의 미완성 이름만 지우므로 이름이 비슷한 다른 영상의 출력은 건드리지 않음
+    - 임시 ASS/업스케일/구간 파일은 스크래치 공간에 있으므로 종료된 프로세스의 스크래치 디렉터리를 정리
+    """
+    removed = []
+    for video in videos:
+        for output_path in output_paths_for(video):
+            path = get_partial_output_path(output_path)
+            if not os.path.isfile(path):
+                continue
+            try:
+                os.remove(path)
+                removed.append(path)
+                print(f"남은 미완성 출력 삭제: {path}")
+            except OSError as e:
+                print(f"남은 미완성 출력 삭제 실패 {path}: {e}")
+    get_scratch_space(scratch_dir).sweep_stale()
+    return removed
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_batch_journal():
+    """프로세스 전역 BatchJournal (처음 호출 시 생성)"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = BatchJournal()
+        return _journal
@@ -0,0 +1,113 @@
+# batch_scheduler.py
+# VideoProcessorManager 위에서 여러 영상을 동시에 처리하는 배치 스케줄러
+# - 동시 작업 수(N)는 설정 가능, 기본값은 CPU 코어 수 기반
+# - 하드웨어 인코더(NVENC/QSV/AMF/VAAPI) 동시 세션 수는 별도로 제한
+# - 결과는 작업이 끝나는 순서대로 반환
+
+import contextlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ffmpeg_runner import use_threads
+from job_result import JobResult, ERROR_UNEXPECTED
+
+# 소비자용 GPU 드라이버의 동시 인코딩 세션 제한을 고려한 기본값
+DEFAULT_MAX_HW_SESSIONS = 2
+
+# 작업 하나가 쓰는 최소 코어 수 (x264는 이 정도까지는 거의 선형으로 확장됨)
+CORES_PER_JOB = 4
+
+
+def default_max_workers():
+    """CPU 코어 수 기반 기본 동시 작업 수 (코어 4개당 작업 1개, 최소 1)"""
+    return max(1, (os.cpu_count() or 4) // CORES_PER_JOB)
+
+
+def is_hardware_encoder(encoder):
+    """소프트웨어(lib*) 인코더나 스트림 복사('copy')가 아니면 하드웨어 인코더로 간주"""
+    return not encoder.startswith('lib') and encoder != 'copy'
+
+
+# 현재 작업 스레드가 잡고 있는 하드웨어 세션 수 (분할 인코더가 동시 구간 수를 맞출 때 사용)
+_reserved = threading.local()
+
+
+def reserved_hw_sessions(default=DEFAULT_MAX_HW_SESSIONS):
+    """현재 스레드가 HardwareSessionLimiter로 잡은 세션 수 (잡지 않았으면 default)"""
+    return getattr(_reserved, 'sessions', None) or default
+
+
+class HardwareSessionLimiter:
+    """
+    하드웨어 인코더 동시 세션 수 제한.
+    분할 인코딩 작업은 동시에 여러 FFmpeg를 실행하므로 세션 여러 개를 한 번에 잡습니다
+    (하나씩 나눠 잡으면 작업끼리 서로 기다리며 멈출 수 있음).
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_HW_SESSIONS):
+        self.max_sessions = max_sessions
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def reserve(self, sessions=1):
+        """세션 sessions개(최대 max_sessions)가 빌 때까지 기다렸다가 with 블록 동안 잡음"""
+        sessions = max(1, min(sessions, self.max_sessions))
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_use + sessions <= self.max_sessions)
+            self._in_use += sessions
+        previous = getattr(_reserved, 'sessions', None)
+        _reserved.sessions = sessions
+        try:
+            yield sessions
+        finally:
+            _reserved.sessions = previous
+            with self._condition:
+                self._in_use -= sessions
+                self._condition.notify_all()
+
+
+class BatchScheduler:
+    def __init__(self, manager, max_workers=None, max_hw_sessions=None):
+        self.manager = manager
+        self.max_workers = max_workers or default_max_workers()
+        self.max_hw_sessions = max_hw_sessions or DEFAULT_MAX_HW_SESSIONS
+        # 실제로 하드웨어 인코더를 쓰는 시도마다 매니저가 세션을 잡음 (폴백 후 인코더 기준, process_with_fallback)
+        self.manager.hw_sessions = HardwareSessionLimiter(self.max_hw_sessions)
+
+    def _run_job(self, index, video, korean_sub, english_sub, on_job_start, threads):
+        if on_job_start:
+            on_job_start(index)
+        with use_threads(threads):
+            return self.manager.process_single_video(video, korean_sub, english_sub)
+
+    def run(self, jobs, on_job_start=None):
+        """
+        jobs: [(video_file, korean_sub, english_sub), ...]
+        작업이 끝나는 순서대로 (원래 인덱스, job, 결과 튜플)을 yield 합니다.
+        on_job_start(index)는 작업이 실제로 시작될 때 작업 스레드에서 호출됩니다 (배치 저널 기록용).
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        workers = min(self.max_workers, len(jobs))
+        # 동시에 실행되는 FFmpeg들이 코어를 나눠 쓰도록 작업당 스레드 수 조정 (작업 스레드별로 지정)
+        threads = max(1, (os.cpu_count() or 4) // workers)
+        print(f"배치 스케줄러 시작: 작업 {len(jobs)}개, 동시 작업 {workers}개, "
+              f"하드웨어 인코더 세션 최대 {self.max_hw_sessions}개")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-job") as executor:
+            futures = {
+                executor.submit(self._run_job, index, *job, on_job_start, threads): (index, job)
+                for index, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                index, job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = JobResult("Error", f"{os.path.basename(job[0])}: 작업 실행 중 오류 - {e}",
+                                       video=job[0], error_category=ERROR_UNEXPECTED)
+                yield index, job, result
@@ -0,0 +1,351 @@
+# benchmark.py
+# 합성 입력으로 전체 처리 과정을 측정하는 벤치마크 실행기
+# - 입력 생성: ffmpeg testsrc/sine 영상(해상도 × 길이), 영어/한글 SRT(cue 수별)
+# - 측정: VideoProcessorManager의 패딩 모드(none / top_bottom / bottom_double) × 업스케일링 여부마다
+#   경과 시간, 처리 fps, 최대 RSS(작업 프로세스 + FFmpeg), 임시 파일 최대 사용량, 출력 크기
+# - 결과는 JSON 보고서로 저장하고, 기준 보고서(--baseline)와 비교해 기준치를 넘게 나빠진 항목이 있으면 종료 코드 1
+#
+# 사용 예:
+#   python benchmark.py --output report.json
+#   python benchmark.py --resolutions 1280x720 --durations 60 --cues 100,100000 --baseline baseline.json
+#   python benchmark.py --output baseline.json   (기준 보고서 만들기)
+#
+# 측정 케이스마다 새 프로세스에서 실행하므로 최대 RSS가 케이스별로 분리됩니다 (RSS는 POSIX에서만 측정).
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from encoding_profiles import PROFILE_NAMES, DEFAULT_PROFILE
+from ffmpeg_runner import ffmpeg_binary
+
+PADDING_MODES = ('none', 'top_bottom', 'bottom_double')
+
+REPORT_VERSION = 1
+
+# 기준 대비 허용하는 증가율 (넘으면 회귀로 판단)
+DEFAULT_THRESHOLDS = {
+    'wall_seconds': 0.15,
+    'peak_rss_bytes': 0.20,
+    'peak_temp_bytes': 0.20,
+    'output_bytes': 0.10,
+}
+
+# 임시 파일 사용량을 샘플링하는 간격(초)
+TEMP_SAMPLE_INTERVAL = 0.1
+
+_ENGLISH_LINES = (
+    "I told you we should have left earlier.",
+    "Where are you going?",
+    "It's not what you think, I promise.",
+    "The train leaves at seven,\nso don't be late.",
+)
+_KOREAN_LINES = (
+    "그러니까 좀 더 일찍 출발했어야지.",
+    "어디 가는 거야?",
+    "네가 생각하는 그런 거 아니야, 정말이야.",
+    "기차는 7시에 떠나니까\n늦지 마.",
+)
+
+
+def parse_list(text, convert=str):
+    return [convert(item.strip()) for item in text.split(',') if item.strip()]
+
+
+def parse_resolution(text):
+    w, _, h = text.lower().partition('x')
+    return int(w), int(h)
+
+
+def _srt_time(ms):
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def generate_srt(path, cue_count, duration_seconds, lines):
+    """영상 길이에 cue_count개의 cue를 고르게 배치한 SRT 생성 (이미 있으면 재사용)"""
+    if os.path.exists(path):
+        return path
+    slot_ms = max(1, duration_seconds * 1000 // cue_count)
+    cue_ms = max(1, slot_ms * 4 // 5)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(cue_count):
+            start = i * slot_ms
+            f.write(f"{i + 1}\n{_srt_time(start)} --> {_srt_time(start + cue_ms)}\n{lines[i % len(lines)]}\n\n")
+    return path
+
+
+def generate_video(path, width, height, duration_seconds):
+    """testsrc2 영상 + sine 오디오 생성 (이미 있으면 재사용)"""
+    if os.path.exists(path):
+        return path
+    command = [
+        ffmpeg_binary(), '-hide_banner', '-v', 'error',
+        '-f', 'lavfi', '-i', f"testsrc2=size={width}x{height}:rate=25:duration={duration_seconds}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={duration_seconds}",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-g', '50', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest', '-y', path
+    ]
+    subprocess.run(command, check=True)
+    return path
+
+
+def build_cases(args):
+    """측정 케이스 목록 (입력 파일 생성 포함)"""
+    input_dir = os.path.join(args.work_dir, 'inputs')
+    os.makedirs(input_dir, exist_ok=True)
+    upscale_width, upscale_height = parse_resolution(args.upscale_target)
+
+    cases = []
+    for width, height in map(parse_resolution, parse_list(args.resolutions)):
+        for duration in parse_list(args.durations, int):
+            video = generate_video(os.path.join(input_dir, f"src_{width}x{height}_{duration}s.mp4"),
+                                   width, height, duration)
+            for cue_count in parse_list(args.cues, int):
+                english = generate_srt(os.path.join(input_dir, f"en_{cue_count}_{duration}s.srt"),
+                                       cue_count, duration, _ENGLISH_LINES)
+                korean = generate_srt(os.path.join(input_dir, f"ko_{cue_count}_{duration}s.srt"),
+                                      cue_count, duration, _KOREAN_LINES)
+                for padding_mode in PADDING_MODES:
+                    for upscale in (False, True):
+                        if upscale and (width, height) == (upscale_width, upscale_height):
+                            continue  # 목표 해상도와 같으면 업스케일링 케이스가 의미 없음
+                        case_id = (f"{padding_mode}/{width}x{height}/{duration}s/{cue_count}cues/"
+                                   f"{'upscale' if upscale else 'native'}")
+                        cases.append({
+                            'id': case_id,
+                            'padding_mode': padding_mode,
+                            'video': video,
+                            'korean_srt': korean,
+                            'english_srt': english,
+                            'use_upscaling': upscale,
+                            'target_width': upscale_width,
+                            'target_height': upscale_height,
+                            'single_pass': not args.two_pass,
+                            'encoding_profile': args.profile,
+                            'work_dir': os.path.join(args.work_dir, 'runs', case_id.replace('/', '_')),
+                        })
+    return cases
+
+
+def _dir_size(paths):
+    total = 0
+    for root_dir in paths:
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+    return total
+
+
+def _max_rss_bytes(children=False):
+    """
+    getrusage의 최대 RSS(바이트). children=True면 종료된 자식 프로세스(FFmpeg) 중 최댓값.
+    resource 모듈이 없는 플랫폼(Windows)에서는 None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    value = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return value if platform.system() == 'Darwin' else value * 1024  # Linux는 KB 단위
+
+
+def run_case(case):
+    """
+    케이스 하나를 실행하고 측정값 dict를 반환합니다 (새 작업 프로세스에서 호출됨).
+    입력 영상을 케이스 디렉터리에 링크해 출력이 그 안에 생기게 하고,
+    스크래치 디렉터리도 케이스 전용 디렉터리로 지정해 임시 파일 사용량을 따로 측정합니다.
+    """
+    scratch_dirs = [os.path.join(case['work_dir'], 'scratch'), os.path.join(case['work_dir'], 'tmpfs')]
+    for path in scratch_dirs:
+        os.makedirs(path, exist_ok=True)
+    os.environ['DUALSUB_SCRATCH_DIR'], os.environ['DUALSUB_TMPFS_DIR'] = scratch_dirs
+
+    video = os.path.join(case['work_dir'], os.path.basename(case['video']))
+    if not os.path.exists(video):
+        try:
+            os.link(case['video'], video)
+        except OSError:
+            shutil.copyfile(case['video'], video)
+
+    # 결과 JSON 외의 출력(프로세서 print)은 stderr로
+    with contextlib.redirect_stdout(sys.stderr):
+        from probe_cache import probe_media
+        from video_processor_manager import VideoProcessorManager
+
+        manager = VideoProcessorManager(
+            case['padding_mode'], case['use_upscaling'], case['target_width'], case['target_height'],
+            single_pass=case['single_pass'], use_output_cache=False, encoding_profile=case['encoding_profile']
+        )
+        info = probe_media(video)
+        processor = manager.processor
+
+        peak_temp = 0
+        stop = threading.Event()
+
+        def sample_temp_usage():
+            nonlocal peak_temp
+            while not stop.is_set():
+                peak_temp = max(peak_temp, _dir_size(scratch_dirs))
+                stop.wait(TEMP_SAMPLE_INTERVAL)
+
+        sampler = threading.Thread(target=sample_temp_usage, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            status, message = manager.process_single_video(video, case['korean_srt'], case['english_srt'])
+        finally:
+            wall = time.perf_counter() - started
+            stop.set()
+            sampler.join()
+
+        outputs = [path for path in manager.get_output_paths(video) if os.path.exists(path)]
+        frames = info.duration * info.frame_rate
+        rss_self = _max_rss_bytes()
+        rss_children = _max_rss_bytes(children=True)
+        result = {
+            'id': case['id'],
+            'status': status,
+            'wall_seconds': round(wall, 3),
+            'fps': round(frames / wall, 2) if wall > 0 else None,
+            'peak_rss_bytes': max(rss_self or 0, rss_children or 0) or None,
+            'peak_python_rss_bytes': rss_self,
+            'peak_temp_bytes': peak_temp,
+            'output_bytes': sum(os.path.getsize(path) for path in outputs) if outputs else None,
+            'encoder': processor.get_encoder(),
+        }
+        if status != 'Success':
+            result['message'] = message
+        for path in outputs:
+            os.remove(path)
+        return result
+
+
+def ffmpeg_version():
+    try:
+        result = subprocess.run([ffmpeg_binary(), '-version'], capture_output=True, text=True, check=False)
+        return result.stdout.splitlines()[0] if result.stdout else None
+    except OSError:
+        return None
+
+
+def compare_reports(report, baseline, thresholds=None):
+    """
+    같은 케이스 id끼리 비교해 회귀 목록 [(case_id, metric, baseline_value, value, change), ...]을 반환합니다.
+    기준에 없는 케이스나 값이 없는 지표는 건너뜁니다. 기준에서 성공한 케이스가 실패하면 'status' 회귀입니다.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    baseline_cases = {case['id']: case for case in baseline.get('cases', [])}
+    regressions = []
+    for case in report['cases']:
+        base = baseline_cases.get(case['id'])
+        if base is None:
+            continue
+        if base.get('status') == 'Success' and case.get('status') != 'Success':
+            regressions.append((case['id'], 'status', base.get('status'), case.get('status'), None))
+            continue
+        for metric, allowed in thresholds.items():
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > allowed:
+                regressions.append((case['id'], metric, old, new, change))
+    return regressions
+
+
+def print_summary(report, regressions, stream):
+    for case in report['cases']:
+        stream.write(f"{case['id']:<52} {case['status']:<8} {case['wall_seconds']:>8.2f}s "
+                     f"{case['fps'] or 0:>8.1f}fps  temp {((case['peak_temp_bytes'] or 0) / 1048576):>8.1f}MB  "
+                     f"out {((case['output_bytes'] or 0) / 1048576):>8.1f}MB\n")
+    for case_id, metric, old, new, change in regressions:
+        detail = f"{change:+.1%}" if change is not None else f"{old} → {new}"
+        stream.write(f"회귀: {case_id} {metric}: {old} → {new} ({detail})\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DualSubEncoder 합성 입력 벤치마크")
+    parser.add_argument('--resolutions', default='640x360,1280x720', help="원본 영상 해상도 목록 (쉼표 구분)")
+    parser.add_argument('--durations', default='10', help="원본 영상 길이(초) 목록 (쉼표 구분)")
+    parser.add_argument('--cues', default='50,5000,100000', help="자막 cue 수 목록 (쉼표 구분)")
+    parser.add_argument('--upscale-target', default='1920x1080', help="업스케일링 케이스의 목표 해상도")
+    parser.add_argument('--profile', choices=PROFILE_NAMES, default=DEFAULT_PROFILE, help="인코딩 프로파일")
+    parser.add_argument('--two-pass', action='store_true', help="업스케일 임시 파일을 만드는 2단계 인코딩으로 측정")
+    parser.add_argument('--filter', default=None, help="케이스 id에 이 문자열이 들어 있는 케이스만 실행")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'dualsub-benchmark'),
+                        help="합성 입력과 출력을 둘 디렉터리 (입력은 다음 실행 때 재사용)")
+    parser.add_argument('--output', default=None, help="JSON 보고서 저장 경로 (기본: stdout)")
+    parser.add_argument('--baseline', default=None, help="비교할 기준 보고서 JSON")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="모든 지표에 같은 허용 증가율 사용 (예: 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case['id']]
+
+    results = []
+    # 케이스마다 새 프로세스 (최대 RSS 분리, 이전 케이스의 캐시/메모리 영향 제거)
+    context = multiprocessing.get_context('spawn')
+    for index, case in enumerate(cases, start=1):
+        sys.stderr.write(f"[{index}/{len(cases)}] {case['id']}\n")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                results.append(executor.submit(run_case, case).result())
+            except Exception as e:
+                results.append({'id': case['id'], 'status': 'Error', 'message': str(e), 'wall_seconds': 0.0,
+                                'fps': None, 'peak_rss_bytes': None, 'peak_temp_bytes': None, 'output_bytes': None})
+
+    report = {
+        'version': REPORT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'ffmpeg': ffmpeg_version(),
+        },
+        'settings': {
+            'profile': args.profile,
+            'single_pass': not args.two_pass,
+            'upscale_target': args.upscale_target,
+        },
+        'cases': results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        thresholds = DEFAULT_THRESHOLDS
+        if args.threshold is not None:
+            thresholds = {metric: args.threshold for metric in DEFAULT_THRESHOLDS}
+        regressions = compare_reports(report, baseline, thresholds)
+
+    print_summary(report, regressions, sys.stderr)
+    failed = any(case['status'] != 'Success' for case in results)
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
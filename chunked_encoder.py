@@ -0,0 +1,189 @@
+# chunked_encoder.py
+# 긴 영상 하나를 키프레임 위치에서 여러 구간으로 나눠 동시에 인코딩한 뒤 하나로 합치는 분할 인코더
+# - 구간 경계: probe 캐시의 키프레임 목록에서 균등 분할 지점에 가장 가까운 키프레임
+# - 구간 인코딩: 프로세서와 같은 필터 체인(스케일/패딩/ass)을 사용하고, 자막 시간이 맞도록
+#   필터 앞에서 타임스탬프를 구간 시작만큼 밀었다가 필터 뒤에서 0부터 다시 시작하게 함
+# - 합치기: concat demuxer로 비디오 구간을 스트림 복사하고, 오디오는 원본에서 한 번만 복사
+# 영상이 짧거나 키프레임이 부족하면 기존 단일 FFmpeg 인코딩(processor.run_ffmpeg)으로 처리합니다.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from batch_scheduler import is_hardware_encoder, reserved_hw_sessions
+from encoding_profiles import hw_input_args, finalize_filter
+from ffmpeg_runner import run_ffmpeg_process, progress_args, ffmpeg_binary, ffmpeg_threads, ProgressEvent
+from probe_cache import get_probe_cache, probe_media
+from scratch import get_scratch_space, remove_scratch_file, estimate_upscaled_size
+
+# 구간 하나의 최소 길이(초). 이보다 짧게 나누면 프로세스 시작/합치기 비용이 더 큼
+MIN_SEGMENT_SECONDS = 30
+
+# 작업자당 구간 수 (구간마다 인코딩 속도가 달라도 작업자가 놀지 않도록 작업자 수보다 많이 나눔)
+SEGMENTS_PER_WORKER = 2
+
+
+def plan_segments(keyframes, duration, segment_count):
+    """
+    키프레임 목록(초)에서 구간 [(start, end), ...]을 계산합니다. 마지막 구간의 end는 None(끝까지).
+    나눌 수 없으면 구간 하나만 반환합니다.
+    """
+    if not keyframes or duration <= 0 or segment_count < 2:
+        return [(0.0, None)]
+
+    # 컨테이너 시작 시각이 0이 아닌 경우를 위해 첫 키프레임 기준으로 맞춤
+    origin = keyframes[0]
+    points = [k - origin for k in keyframes]
+
+    boundaries = []
+    for i in range(1, segment_count):
+        target = duration * i / segment_count
+        nearest = min(points, key=lambda k: abs(k - target))
+        last = boundaries[-1] if boundaries else 0.0
+        # 앞 구간/끝 부분이 너무 짧아지는 경계는 건너뜀
+        if nearest - last >= MIN_SEGMENT_SECONDS and duration - nearest >= MIN_SEGMENT_SECONDS:
+            boundaries.append(nearest)
+
+    starts = [0.0] + boundaries
+    ends = boundaries + [None]
+    return list(zip(starts, ends))
+
+
+def segment_filter(vf_filter, start):
+    """구간 시작 시각만큼 타임스탬프를 밀어 ass 필터가 원본 자막 시간을 그대로 쓰게 하는 필터 체인"""
+    if start <= 0:
+        return vf_filter
+    return f"setpts=PTS+{start:.6f}/TB,{vf_filter},setpts=PTS-STARTPTS"
+
+
+def _concat_list_entry(path, start, end):
+    """
+    concat demuxer 목록 항목 (작은따옴표는 '\'' 로 이스케이프)
+    setpts를 거친 구간은 마지막 프레임 길이가 빠져 파일 길이가 한 프레임 짧게 기록되므로,
+    구간 길이를 직접 지정해야 다음 구간과 타임스탬프가 겹쳐 프레임이 빠지지 않음
+    """
+    entry = "file '" + path.replace("'", "'\\''") + "'\n"
+    if end is not None:
+        entry += f"duration {end - start:.6f}\n"
+    return entry
+
+
+def run_chunked_encode(processor, input_path, output_path, vf_filter, source=None, chunk_workers=2):
+    """
+    processor.run_ffmpeg와 같은 (성공 여부, 오류 메시지)를 반환하는 분할 병렬 인코딩.
+    processor의 get_encoder(), encoding_args(), threads, scratch_dir, progress_callback 설정을 그대로 사용합니다.
+    """
+    source = source or input_path
+    try:
+        duration = probe_media(input_path).duration
+        segment_count = min(chunk_workers * SEGMENTS_PER_WORKER, int(duration // MIN_SEGMENT_SECONDS))
+        segments = plan_segments(get_probe_cache().keyframes(input_path), duration, segment_count)
+    except Exception as e:
+        print(f"키프레임 분석 실패, 단일 인코딩으로 처리합니다: {e}")
+        segments = [(0.0, None)]
+
+    if len(segments) < 2:
+        return processor.run_ffmpeg(input_path, output_path, vf_filter, source=source)
+
+    encoder = processor.get_encoder()
+    rate_control = processor.encoding_args(encoder, source)
+    workers = min(chunk_workers, len(segments))
+    if is_hardware_encoder(encoder):
+        # 배치 스케줄러가 이 작업에 잡아 준 하드웨어 세션 수만큼만 동시에 인코딩
+        workers = min(workers, reserved_hw_sessions())
+    threads = max(1, ffmpeg_threads(processor.threads) // workers)
+    print(f"분할 인코딩: 구간 {len(segments)}개, 동시 인코딩 {workers}개, 구간당 스레드 {threads}개")
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    scratch = get_scratch_space(processor.scratch_dir)
+    segment_paths = []
+    list_path = ""
+    try:
+        # 여유 공간은 전체 구간 크기 기준으로 한 번만 검사
+        info = probe_media(input_path)
+        expected = estimate_upscaled_size(input_path, info.width, info.height, info.width, info.height)
+        for i in range(len(segments)):
+            segment_paths.append(scratch.large_path(f"{stem}_chunk{i:03d}", "_temp.mkv", expected if i == 0 else 0))
+
+        # 구간별 진행 시간을 합쳐 작업 전체 진행률로 보고
+        progress_lock = threading.Lock()
+        segment_times = [0.0] * len(segments)
+
+        def on_segment_progress(index, event):
+            if not processor.progress_callback or event.out_time is None:
+                return
+            with progress_lock:
+                segment_times[index] = event.out_time
+                encoded = sum(segment_times)
+            processor.progress_callback(ProgressEvent(
+                source=source, stage='encode', frame=None, fps=None, speed=None, out_time=encoded,
+                percent=min(100.0, encoded * 100.0 / duration) if duration else None, done=False
+            ))
+
+        def encode_segment(index):
+            start, end = segments[index]
+            command = [ffmpeg_binary(), *hw_input_args(encoder), '-ss', f"{start:.6f}", '-i', input_path]
+            if end is not None:
+                command.extend(['-t', f"{end - start:.6f}"])
+            command.extend([
+                '-vf', finalize_filter(segment_filter(vf_filter, start), encoder),
+                '-an',
+                *rate_control,
+                '-threads', str(threads),
+                *progress_args(),
+                '-y',
+                segment_paths[index]
+            ])
+            print(f"구간 {index + 1}/{len(segments)} 인코딩 명령어: {' '.join(command)}")
+            returncode, stderr_tail = run_ffmpeg_process(
+                command, (end if end is not None else duration) - start, source=source, stage='encode',
+                on_progress=lambda event: on_segment_progress(index, event), echo_stderr=False
+            )
+            if returncode != 0 or not os.path.exists(segment_paths[index]):
+                raise RuntimeError(f"구간 {index + 1} 인코딩 실패.\n{stderr_tail}")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as executor:
+            futures = [executor.submit(encode_segment, i) for i in range(len(segments))]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                # 아직 시작하지 않은 구간은 취소 (실행 중인 구간은 끝날 때까지 대기)
+                for future in futures:
+                    future.cancel()
+                raise
+
+        list_path = scratch.small_path(f"{stem}_chunks", "_temp.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.writelines(_concat_list_entry(path, start, end) for path, (start, end) in zip(segment_paths, segments))
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        # 비디오는 구간을 이어 붙이고, 오디오는 원본에서 한 번만 스트림 복사
+        command = [
+            ffmpeg_binary(),
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-i', input_path,
+            '-map', '0:v:0', '-map', '1:a:0?',
+            '-c', 'copy',
+            *progress_args(),
+            '-y',
+            output_path
+        ]
+        print(f"구간 합치기 명령어: {' '.join(command)}")
+        returncode, stderr_tail = run_ffmpeg_process(
+            command, duration, source=source, stage='concat', on_progress=processor.progress_callback
+        )
+        if returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            return True, ""
+        return False, f"구간 합치기 실패.\n{stderr_tail}"
+
+    except FileNotFoundError:
+        return False, "FFmpeg가 설치되어 있지 않거나, 환경 변수로 등록되지 않았습니다."
+    except Exception as e:
+        return False, f"분할 인코딩 중 오류: {e}"
+    finally:
+        for path in segment_paths:
+            remove_scratch_file(path, "임시 구간 파일")
+        remove_scratch_file(list_path, "임시 구간 목록 파일")
@@ -0,0 +1,301 @@
+# cli.py
+# 디스플레이가 없는 렌더 서버용 헤드리스 배치 실행기.
+# PyQt6 / tkinter 를 import 하지 않으며, 매니페스트의 작업마다 JSON 결과 한 줄을 stdout으로 출력합니다.
+#
+# 사용 예:
+#   python cli.py jobs.csv --workers 4
+#   python cli.py jobs.json --padding-mode top_bottom --resolution 1920x1080
+#
+# 매니페스트 (CSV 헤더 또는 JSON 객체 목록의 키):
+#   video, korean_srt, english_srt, padding_mode, target_resolution
+#   - padding_mode: none / top_bottom / bottom_double (비어 있으면 --padding-mode 값)
+#     all이면 세 레이아웃을 한 번 디코딩해 FFmpeg 하나로 모두 출력
+#   - target_resolution: "1920x1080" 형식, "none"이면 업스케일링 안 함 (비어 있으면 --resolution 값)
+#
+# --hls를 지정하면 출력 파일 대신 <출력 이름>_hls/master.m3u8 과 단계별 세그먼트 디렉터리를 만듭니다.
+#
+# 결과 줄에는 단계별 처리 시간(stage_seconds), 인코더, 입출력 크기, 최종 해상도, 처리 fps, 오류 분류가 포함되며
+# --metrics-file을 지정하면 배치가 끝난 뒤 Prometheus textfile 형식의 집계도 기록합니다.
+#
+# 작업 상태는 배치 저널에 기록되므로, 중단된 배치는 --resume으로 끝나지 않은 작업만 다시 실행할 수 있습니다.
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import threading
+
+from batch_journal import get_batch_journal, cleanup_orphans
+from batch_scheduler import BatchScheduler
+from encoding_profiles import PROFILE_NAMES, DEFAULT_PROFILE
+from hls_output import HLS_SEGMENT_TYPE_NAMES
+from job_result import JobResult, write_prometheus_textfile, ERROR_INPUT, ERROR_SUBTITLE
+from preflight import preflight
+from soft_subtitle_mux import SOFT_SUBTITLE_MODE_NAMES
+from srt_cues import CueCacheReleaser
+from srt_overlap_error import OVERLAP_POLICIES, DEFAULT_OVERLAP_POLICY
+from video_processor_manager import VideoProcessorManager
+
+PADDING_MODES = ('none', 'top_bottom', 'bottom_double', 'all')
+
+
+def parse_resolution(text):
+    """'1920x1080' → (1920, 1080), 'none'/'0x0' → (0, 0)"""
+    text = (text or '').strip().lower()
+    if text in ('', 'none', 'off', '0x0'):
+        return 0, 0
+    if text.count('x') != 1:
+        raise ValueError(f"유효하지 않은 해상도: {text} (예: 1920x1080)")
+    w_str, h_str = text.split('x')
+    w, h = int(w_str.strip()), int(h_str.strip())
+    if w <= 0 or h <= 0:
+        raise ValueError(f"유효하지 않은 해상도: {text}")
+    return w, h
+
+
+MANIFEST_FIELDS = ('video', 'korean_srt', 'english_srt', 'padding_mode', 'target_resolution')
+
+
+def _manifest_value(value):
+    """매니페스트 값 하나를 문자열로 (JSON의 숫자는 문자열로 바꾸고, 객체/목록/참거짓은 ValueError)"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"문자열이어야 하는 값: {value!r}")
+
+
+def load_manifest(path):
+    """
+    CSV 또는 JSON 매니페스트를 읽어 dict 목록으로 반환
+    값이 잘못된 작업은 배치 전체를 멈추지 않도록 'error'에 메시지를 담아 반환 (실행 시 해당 작업만 실패 처리)
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+            if isinstance(rows, dict):
+                rows = rows.get('jobs', [])
+        else:
+            rows = list(csv.DictReader(f))
+
+    # 상대 경로는 매니페스트 위치 기준으로 해석
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for number, row in enumerate(rows, start=1):
+        job = dict.fromkeys(MANIFEST_FIELDS, '')
+        job['error'] = None
+        if not isinstance(row, dict):
+            job['error'] = f"매니페스트 {number}번째 작업이 객체가 아닙니다: {row!r}"
+            jobs.append(job)
+            continue
+        for key in MANIFEST_FIELDS:
+            try:
+                job[key] = _manifest_value(row.get(key))
+            except ValueError as e:
+                job['error'] = f"매니페스트 {number}번째 작업의 {key} 값이 올바르지 않습니다 - {e}"
+        for key in ('video', 'korean_srt', 'english_srt'):
+            if job[key]:
+                job[key] = os.path.join(base_dir, job[key])
+        jobs.append(job)
+    return jobs
+
+
+def subtitle_error(job, report):
+    """사전 점검 결과에서 작업 자막의 수정 실패/검사 오류 메시지 (문제가 없으면 None)"""
+    for key in ('korean_srt', 'english_srt'):
+        srt_path = job[key]
+        if not srt_path:
+            continue
+        if srt_path in report.fix_errors:
+            return str(report.fix_errors[srt_path])
+        errors = report.subtitle_errors.get(srt_path)
+        if errors:
+            return f"'{os.path.basename(srt_path)}' 자막 오류:\n" + "\n".join(errors)
+    return None
+
+
+def start_journal(args, jobs):
+    """
+    배치 저널 기록 시작. (JournaledBatch, {이미 끝난 작업 인덱스: (status, message)})를 반환합니다.
+    --resume이고 같은 매니페스트의 중단된 배치가 있으면 그 배치를 이어서 기록합니다.
+    """
+    journal = get_batch_journal()
+    batch_key = "cli:" + os.path.abspath(args.manifest)
+    pairs = [(job['video'], job['korean_srt'] or None, job['english_srt'] or None) for job in jobs]
+
+    if args.resume:
+        unfinished = journal.find_unfinished(batch_key)
+        if unfinished:
+            total = len(unfinished['pending']) + len(unfinished['results'])
+            same_jobs = total == len(jobs) and all(
+                pairs[index] == tuple(pending)
+                for index, pending in zip(unfinished['pending_indices'], unfinished['pending'])
+            )
+            if same_jobs:
+                print(f"중단된 배치 이어서 처리: 남은 작업 {len(unfinished['pending'])}개")
+                return journal.resume(unfinished['batch_id']), dict(zip(unfinished['finished_indices'],
+                                                                         unfinished['results']))
+            print("매니페스트가 중단된 배치와 달라 처음부터 다시 처리합니다.")
+        else:
+            print("이어서 처리할 중단된 배치가 없어 처음부터 처리합니다.")
+
+    settings = {key: value for key, value in vars(args).items() if key not in ('manifest', 'resume')}
+    return journal.start_batch(pairs, settings, batch_key), {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DualSubEncoder 헤드리스 배치 실행기")
+    parser.add_argument('manifest', help="작업 목록 CSV 또는 JSON 파일")
+    parser.add_argument('--padding-mode', choices=PADDING_MODES, default='none',
+                        help="매니페스트에 padding_mode가 없을 때 사용할 기본값")
+    parser.add_argument('--resolution', default='1920x1080',
+                        help="매니페스트에 target_resolution이 없을 때 사용할 기본값 (none이면 업스케일링 안 함)")
+    parser.add_argument('--workers', type=int, default=None, help="동시 작업 수 (기본: 코어 수 기반)")
+    parser.add_argument('--two-pass', action='store_true',
+                        help="업스케일 임시 파일을 만드는 기존 2단계 인코딩 사용")
+    parser.add_argument('--no-fix-overlaps', action='store_true', help="자막 시간 겹침 자동 수정 안 함")
+    parser.add_argument('--overlap-policy', choices=OVERLAP_POLICIES, default=DEFAULT_OVERLAP_POLICY,
+                        help="겹침 처리 방식: clamp(종료 시간 자르기), merge(텍스트 합치기), "
+                             "stack(위아래로 쌓기), strict(심각한 겹침이면 오류)")
+    parser.add_argument('--profile', choices=PROFILE_NAMES, default=DEFAULT_PROFILE,
+                        help="인코딩 프로파일: archive-lossless(무손실), high-quality(고화질 CRF), "
+                             "size-target(목표 비트레이트), speed(속도 우선)")
+    parser.add_argument('--target-bitrate', default=None,
+                        help="size-target 프로파일의 목표 비디오 비트레이트 (예: 4M, 2500k. 기본: 원본 비트레이트)")
+    parser.add_argument('--chunk-workers', type=int, default=1,
+                        help="2 이상이면 긴 영상을 키프레임 구간으로 나눠 이 수만큼 동시에 인코딩 (기본: 1, 나누지 않음)")
+    parser.add_argument('--design-layout', action='store_true',
+                        help="자막을 Full HD 기준 좌표계로 작성해 원본 해상도에서도 같은 모양으로 표시 (업스케일링 없이 빠르게 인코딩)")
+    parser.add_argument('--soft-subtitles', choices=SOFT_SUBTITLE_MODE_NAMES, default=None,
+                        help="자막을 입히지 않고 자막 트랙으로 넣음 (비디오/오디오 스트림 복사, 패딩/해상도 옵션 무시)")
+    parser.add_argument('--hls', choices=HLS_SEGMENT_TYPE_NAMES, default=None,
+                        help="1080p/720p/480p 단계별 HLS 세그먼트와 재생 목록으로 출력 (인코딩 중에도 앞부분부터 재생 가능)")
+    parser.add_argument('--scratch-dir', default=None,
+                        help="임시 업스케일 영상을 둘 빠른 로컬 디렉터리 (기본: DUALSUB_SCRATCH_DIR 또는 시스템 임시 디렉터리)")
+    parser.add_argument('--force', action='store_true',
+                        help="입력이 이전과 같아도 출력 캐시를 무시하고 다시 인코딩")
+    parser.add_argument('--progress', action='store_true',
+                        help="작업별 FFmpeg 진행 이벤트를 JSON 줄로 stderr에 출력")
+    parser.add_argument('--quiet', action='store_true', help="FFmpeg 로그 등 진행 출력을 숨김")
+    parser.add_argument('--resume', action='store_true',
+                        help="같은 매니페스트의 중단된 배치에서 이미 끝난 작업은 건너뛰고 이어서 처리")
+    parser.add_argument('--metrics-file', default=None,
+                        help="배치 결과 집계를 Prometheus textfile 형식으로 기록할 경로 (node_exporter textfile collector용)")
+    args = parser.parse_args(argv)
+    if args.hls and args.soft_subtitles:
+        parser.error("--hls와 --soft-subtitles는 함께 사용할 수 없습니다.")
+
+    result_stream = sys.stdout
+
+    def emit(record):
+        result_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        result_stream.flush()
+
+    progress_stream = sys.stderr
+    progress_lock = threading.Lock()
+
+    def report_progress(event):
+        # 여러 작업 스레드에서 동시에 호출되므로 줄 단위로 잠금
+        line = json.dumps({'event': 'progress', **event._asdict()}, ensure_ascii=False)
+        with progress_lock:
+            progress_stream.write(line + "\n")
+            progress_stream.flush()
+
+    jobs = load_manifest(args.manifest)
+    failed = 0
+    results = []  # 이번 실행에서 처리한 작업의 JobResult (--metrics-file 집계용)
+
+    def finish_job(index, result, **fields):
+        nonlocal failed
+        result = JobResult.from_tuple(result, video=jobs[index]['video'])
+        results.append(result)
+        job = jobs[index]
+        cue_cache.job_finished((job['video'], job['korean_srt'], job['english_srt']))
+        batch.job_finished(index, result)
+        emit({'index': index, **result.to_dict(), **fields})
+        if result.status not in ('Success', 'Warning'):
+            failed += 1
+
+    # 결과 줄 외의 모든 출력(프로세서 print, FFmpeg 로그)은 stderr로 보냄
+    with contextlib.ExitStack() as stack:
+        log_stream = stack.enter_context(open(os.devnull, 'w')) if args.quiet else sys.stderr
+        stack.enter_context(contextlib.redirect_stdout(log_stream))
+        batch, finished = start_journal(args, jobs)
+        for index, (status, message) in sorted(finished.items()):
+            emit({'index': index, 'video': jobs[index]['video'], 'status': status, 'message': message,
+                  'resumed': True})
+            if status not in ('Success', 'Warning'):
+                failed += 1
+
+        # 남은 작업 전체의 영상 probe / 자막 겹침 수정·검사를 한꺼번에 동시 실행
+        pending = [(job['video'], job['korean_srt'], job['english_srt'])
+                   for index, job in enumerate(jobs) if index not in finished]
+        report = preflight(pending, fix_overlaps=not args.no_fix_overlaps, overlap_policy=args.overlap_policy)
+        # 사전 점검에서 캐시한 자막 cue는 그 자막을 쓰는 마지막 작업이 끝나면 해제 (그룹이 달라도 같은 수정 결과 사용)
+        cue_cache = CueCacheReleaser(pending)
+
+        # 패딩 모드/목표 해상도가 같은 작업끼리 묶어 하나의 매니저로 처리
+        groups = {}
+        for index, job in enumerate(jobs):
+            if index in finished:
+                continue
+            try:
+                if job['error']:
+                    raise ValueError(job['error'])
+                padding_mode = job['padding_mode'] or args.padding_mode
+                if padding_mode not in PADDING_MODES:
+                    raise ValueError(f"알 수 없는 padding_mode: {padding_mode}")
+                if args.hls and padding_mode == 'all':
+                    raise ValueError("HLS 출력은 padding_mode 'all'과 함께 사용할 수 없습니다.")
+                resolution = parse_resolution(job['target_resolution'] or args.resolution)
+            except ValueError as e:
+                finish_job(index, JobResult('Error', str(e), error_category=ERROR_INPUT))
+                continue
+
+            probe_error = report.probe_errors.get(job['video'])
+            if probe_error:
+                # 영상 정보를 읽지 못한 작업은 인코딩을 시작하지 않고 바로 실패 처리
+                finish_job(index, JobResult('Error', f"{os.path.basename(job['video'])}: 영상 정보를 읽지 못했습니다 - {probe_error}",
+                                            error_category=ERROR_INPUT))
+                continue
+
+            error = subtitle_error(job, report)
+            if error:
+                finish_job(index, JobResult('Error', error, error_category=ERROR_SUBTITLE))
+                continue
+
+            groups.setdefault((padding_mode, resolution), []).append((index, job))
+
+        for (padding_mode, (width, height)), group in groups.items():
+            manager = VideoProcessorManager(padding_mode, bool(width and height), width, height,
+                                            single_pass=not args.two_pass, scratch_dir=args.scratch_dir,
+                                            use_output_cache=not args.force, chunk_workers=args.chunk_workers,
+                                            encoding_profile=args.profile, target_bitrate=args.target_bitrate,
+                                            design_space_layout=args.design_layout, soft_subtitles=args.soft_subtitles,
+                                            hls=args.hls)
+            if args.progress:
+                manager.processor.progress_callback = report_progress
+            scheduler = BatchScheduler(manager, max_workers=args.workers)
+            pairs = [(job['video'], job['korean_srt'] or None, job['english_srt'] or None) for _, job in group]
+            if args.resume:
+                # 중단된 작업의 미완성 출력은 이 매니저의 출력 이름으로만 찾아서 정리
+                cleanup_orphans((video for video, _, _ in pairs), manager.get_output_paths, args.scratch_dir)
+            jobs_run = scheduler.run(pairs, on_job_start=lambda position, group=group: batch.job_started(group[position][0]))
+            for position, _, result in jobs_run:
+                finish_job(group[position][0], result, padding_mode=padding_mode,
+                           target_resolution=f"{width}x{height}" if width and height else None)
+
+        batch.finish()
+
+    if args.metrics_file:
+        write_prometheus_textfile(results, args.metrics_file)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
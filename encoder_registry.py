@@ -0,0 +1,278 @@
+# encoder_registry.py
+# 인코더/하드웨어 감지 결과를 프로세스 전체에서 한 번만 구하고 디스크에 캐시하는 레지스트리
+# (ffmpeg 바이너리 경로/수정 시각과 호스트가 같으면 이전 감지 결과를 재사용)
+# 하드웨어 인코더는 ffmpeg 빌드에 포함되어 있어도 드라이버/장치가 없으면 실패하므로,
+# 짧은 lavfi 테스트 인코딩에 성공한 인코더만 우선순위대로 인코더 체인에 넣습니다 (마지막은 항상 libx264).
+
+import contextlib
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import threading
+
+from encoding_profiles import hw_input_args, finalize_filter
+from ffmpeg_runner import ffmpeg_binary as default_ffmpeg_binary
+from utils import get_cache_dir
+
+CACHE_FILE_NAME = "encoder_capabilities.json"
+
+# 캐시 형식이 바뀌면 올려서 이전 감지 결과를 무시하도록 함
+CAPABILITIES_VERSION = 2
+
+# 하드웨어 인코더 우선순위 (테스트 인코딩에 성공한 것만 사용)
+HARDWARE_ENCODER_PREFERENCE = ('h264_nvenc', 'h264_qsv', 'h264_amf', 'h264_vaapi')
+SOFTWARE_ENCODER = 'libx264'
+
+# 테스트 인코딩 제한 시간(초). 드라이버가 멈추는 경우에도 감지가 끝나도록 함
+TRIAL_ENCODE_TIMEOUT = 30
+
+
+def _list_ffmpeg_encoders(ffmpeg_binary):
+    """'ffmpeg -encoders' 출력에서 인코더 이름 목록을 추출"""
+    result = subprocess.run(
+        [ffmpeg_binary, '-hide_banner', '-encoders'],
+        capture_output=True, text=True, check=False, encoding='utf-8'
+    )
+    encoders = []
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        # 예: " V....D libx264   libx264 H.264 / AVC ..." (플래그 6자리 + 이름)
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS':
+            encoders.append(parts[1])
+    return encoders
+
+
+def _detect_nvidia_gpu(encoders):
+    """NVIDIA GPU 존재 여부를 확인하는 함수"""
+    try:
+        if 'h264_nvenc' in encoders:
+            print("NVIDIA NVENC 인코더 감지됨")
+            return True
+
+        if platform.system() == 'Windows':
+            result = subprocess.run(
+                ['wmic', 'path', 'win32_VideoController', 'get', 'name'],
+                capture_output=True, text=True, check=False, encoding='cp949'
+            )
+            if 'NVIDIA' in result.stdout:
+                print("NVIDIA GPU 감지됨 (Windows)")
+                return True
+
+        elif platform.system() == 'Linux':
+            result = subprocess.run(
+                ['lspci'], capture_output=True, text=True, check=False, encoding='utf-8'
+            )
+            if 'NVIDIA' in result.stdout:
+                print("NVIDIA GPU 감지됨 (Linux)")
+                return True
+
+        print("NVIDIA GPU 감지되지 않음")
+        return False
+
+    except Exception as e:
+        print(f"GPU 감지 중 오류 발생: {e}")
+        return False
+
+
+def _trial_encode(ffmpeg_binary, encoder):
+    """작은 lavfi 테스트 영상을 인코딩해 보고 성공 여부를 반환 (출력은 버림)"""
+    command = [
+        ffmpeg_binary, '-hide_banner', '-v', 'error', *hw_input_args(encoder),
+        '-f', 'lavfi', '-i', 'testsrc2=size=256x144:rate=25',
+        '-frames:v', '5',
+        '-vf', finalize_filter('format=yuv420p', encoder),
+        '-c:v', encoder,
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=False, encoding='utf-8',
+                                errors='replace', timeout=TRIAL_ENCODE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"인코더 테스트 실패 ({encoder}): {e}")
+        return False
+    if result.returncode != 0:
+        reason = result.stderr.strip().splitlines()[-1:] or [f"종료 코드 {result.returncode}"]
+        print(f"인코더 테스트 실패 ({encoder}): {reason[0]}")
+        return False
+    print(f"인코더 테스트 성공: {encoder}")
+    return True
+
+
+def _detect_cpu_vendor():
+    processor_info = platform.processor()
+    if processor_info:
+        if 'Intel' in processor_info or 'GenuineIntel' in processor_info:
+            return 'Intel'
+        elif 'AMD' in processor_info or 'AuthenticAMD' in processor_info:
+            return 'AMD'
+
+    if platform.system() == 'Windows':
+        try:
+            result = subprocess.run(
+                ['wmic', 'cpu', 'get', 'Name'],
+                capture_output=True, text=True, check=False, encoding='cp949'
+            )
+            if result.returncode == 0:
+                output = result.stdout.strip()
+                if 'Intel' in output: return 'Intel'
+                if 'AMD' in output: return 'AMD'
+        except Exception as e:
+            print(f"Windows CPU WMIC 감지 오류: {e}")
+
+    if platform.system() == 'Linux':
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                cpuinfo = f.read()
+                if 'GenuineIntel' in cpuinfo:
+                    return 'Intel'
+                elif 'AuthenticAMD' in cpuinfo:
+                    return 'AMD'
+        except OSError:
+            pass
+    return 'Unknown'
+
+
+class EncoderRegistry:
+    """
+    인코더 감지 결과 레지스트리.
+    처음 조회할 때 한 번만 감지하고(또는 디스크 캐시에서 읽고), 이후에는 메모리 값을 반환합니다.
+    """
+
+    def __init__(self, ffmpeg_binary=None, cache_path=None):
+        self.ffmpeg_binary = ffmpeg_binary or default_ffmpeg_binary()
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self._capabilities = None
+        self._lock = threading.Lock()
+        # 작업 스레드별로 강제한 인코더 (실패한 작업을 다음 인코더로 다시 시도할 때 사용)
+        self._override = threading.local()
+        # 이번 프로세스에서 실제 작업에 실패해 체인에서 뺀 인코더 (디스크 캐시에는 저장하지 않음)
+        self._demoted = set()
+
+    def _cache_key(self):
+        """캐시 키: ffmpeg 실제 경로 + 수정 시각 + 호스트/OS. ffmpeg를 찾지 못하면 None"""
+        ffmpeg_path = shutil.which(self.ffmpeg_binary)
+        if not ffmpeg_path:
+            return None
+        ffmpeg_path = os.path.realpath(ffmpeg_path)
+        return {
+            'ffmpeg_path': ffmpeg_path,
+            'ffmpeg_mtime': os.path.getmtime(ffmpeg_path),
+            'host': socket.gethostname(),
+            'system': platform.system(),
+            'version': CAPABILITIES_VERSION,
+        }
+
+    def _load_cache(self, key):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != key:
+            return None
+        return data.get('capabilities')
+
+    def _save_cache(self, key, capabilities):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'capabilities': capabilities}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"인코더 감지 캐시 저장 실패 {self.cache_path}: {e}")
+
+    def _probe(self):
+        try:
+            encoders = _list_ffmpeg_encoders(self.ffmpeg_binary)
+        except FileNotFoundError:
+            encoders = []
+        working = [encoder for encoder in HARDWARE_ENCODER_PREFERENCE
+                   if encoder in encoders and _trial_encode(self.ffmpeg_binary, encoder)]
+        return {
+            'encoders': encoders,
+            'nvidia_gpu': _detect_nvidia_gpu(encoders),
+            'cpu_vendor': _detect_cpu_vendor(),
+            'encoder_chain': working + [SOFTWARE_ENCODER],
+        }
+
+    def capabilities(self):
+        """감지 결과 dict (encoders, nvidia_gpu, cpu_vendor, encoder_chain)"""
+        with self._lock:
+            if self._capabilities is None:
+                key = self._cache_key()
+                capabilities = self._load_cache(key) if key else None
+                if capabilities is None:
+                    capabilities = self._probe()
+                    if key:
+                        self._save_cache(key, capabilities)
+                else:
+                    print(f"인코더 감지 캐시 사용: {self.cache_path}")
+                self._capabilities = capabilities
+            return self._capabilities
+
+    def invalidate(self):
+        """메모리/디스크 캐시를 모두 비워 다음 조회 시 다시 감지하도록 함"""
+        with self._lock:
+            self._capabilities = None
+            self._demoted.clear()
+            try:
+                os.remove(self.cache_path)
+            except OSError:
+                pass
+
+    def detect_nvidia_gpu(self):
+        return self.capabilities()['nvidia_gpu']
+
+    def detect_cpu_vendor(self):
+        return self.capabilities()['cpu_vendor']
+
+    def encoder_chain(self):
+        """테스트 인코딩에 성공한 인코더를 우선순위대로 나열한 목록 (마지막은 소프트웨어 인코더, demote한 인코더 제외)"""
+        chain = self.capabilities()['encoder_chain']
+        with self._lock:
+            return [encoder for encoder in chain if encoder not in self._demoted]
+
+    def get_encoder(self):
+        """현재 스레드에서 사용할 인코더 (use_encoder로 강제한 값, 없으면 체인의 첫 번째)"""
+        override = getattr(self._override, 'encoder', None)
+        return override or self.encoder_chain()[0]
+
+    @contextlib.contextmanager
+    def use_encoder(self, encoder):
+        """with 블록 안에서 현재 스레드의 get_encoder()가 encoder를 반환하도록 함"""
+        previous = getattr(self._override, 'encoder', None)
+        self._override.encoder = encoder
+        try:
+            yield
+        finally:
+            self._override.encoder = previous
+
+    def demote(self, encoder):
+        """
+        실제 작업에서 실패한 인코더를 이번 프로세스의 체인에서 제외합니다.
+        입력 한 개나 일시적인 드라이버 오류로 실패했을 수도 있으므로 디스크 캐시에는 반영하지 않고,
+        다음 실행에서는 감지 결과대로 다시 사용합니다. (소프트웨어 인코더는 제외하지 않음)
+        """
+        if encoder == SOFTWARE_ENCODER or encoder not in self.capabilities()['encoder_chain']:
+            return
+        with self._lock:
+            if encoder in self._demoted:
+                return
+            self._demoted.add(encoder)
+        print(f"인코더 {encoder}를 사용할 수 없어 다음 인코더부터 사용합니다: {self.encoder_chain()}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_encoder_registry():
+    """프로세스 공용 EncoderRegistry 인스턴스를 반환 (모든 VideoProcessor가 공유)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = EncoderRegistry()
+        return _registry
@@ -0,0 +1,128 @@
+# encoding_profiles.py
+# 출력 화질/용량 설정(인코딩 프로파일)과 인코더별 FFmpeg 옵션 매핑
+# - archive-lossless: 기존 기본값. 무손실(libx264 -crf 0) 또는 하드웨어 인코더의 최고 화질 고정 QP
+# - high-quality: 눈으로 구분하기 어려운 화질의 CRF/CQ (무손실 대비 파일 크기 수십 분의 1)
+# - size-target: 목표 비트레이트(지정하지 않으면 원본 비디오 비트레이트)에 맞춘 VBR
+# - speed: 가장 빠른 프리셋 + 적당한 화질
+# 인코더는 이름으로 계열(software / nvenc / qsv / vaapi / amf)을 판단해 각 계열에서 유효한 옵션만 사용합니다.
+
+from collections import namedtuple
+
+EncodingProfile = namedtuple('EncodingProfile', ['name', 'label'])
+
+PROFILES = (
+    EncodingProfile('archive-lossless', "보관용 무손실 (파일 매우 큼)"),
+    EncodingProfile('high-quality', "고화질 (권장)"),
+    EncodingProfile('size-target', "목표 비트레이트 (원본 크기 유지)"),
+    EncodingProfile('speed', "속도 우선"),
+)
+PROFILE_NAMES = tuple(profile.name for profile in PROFILES)
+DEFAULT_PROFILE = 'archive-lossless'
+
+# VAAPI 인코더가 사용할 렌더 노드 (하드웨어 프레임으로 업로드 필요)
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
+# 프로파일 × 인코더 계열별 옵션 ('{bitrate}', '{maxrate}', '{bufsize}'는 size-target에서 채움)
+_RATE_CONTROL = {
+    'archive-lossless': {
+        'software': ['-crf', '0', '-preset', 'fast'],
+        'nvenc': ['-preset', 'p7', '-tune', 'lossless'],
+        'qsv': ['-preset', 'veryslow', '-global_quality', '1'],
+        'vaapi': ['-rc_mode', 'CQP', '-qp', '1'],
+        'amf': ['-quality', 'quality', '-rc', 'cqp', '-qp_i', '0', '-qp_p', '0', '-qp_b', '0'],
+    },
+    'high-quality': {
+        'software': ['-crf', '18', '-preset', 'slow'],
+        'nvenc': ['-preset', 'p6', '-tune', 'hq', '-rc', 'vbr', '-cq', '19', '-b:v', '0'],
+        'qsv': ['-preset', 'slower', '-global_quality', '20'],
+        'vaapi': ['-rc_mode', 'CQP', '-qp', '20'],
+        'amf': ['-quality', 'quality', '-rc', 'cqp', '-qp_i', '18', '-qp_p', '20', '-qp_b', '22'],
+    },
+    'size-target': {
+        'software': ['-b:v', '{bitrate}', '-maxrate', '{maxrate}', '-bufsize', '{bufsize}', '-preset', 'medium'],
+        'nvenc': ['-preset', 'p5', '-rc', 'vbr', '-b:v', '{bitrate}', '-maxrate', '{maxrate}', '-bufsize', '{bufsize}'],
+        'qsv': ['-preset', 'medium', '-b:v', '{bitrate}', '-maxrate', '{maxrate}', '-bufsize', '{bufsize}'],
+        'vaapi': ['-rc_mode', 'VBR', '-b:v', '{bitrate}', '-maxrate', '{maxrate}', '-bufsize', '{bufsize}'],
+        'amf': ['-quality', 'balanced', '-rc', 'vbr_peak', '-b:v', '{bitrate}', '-maxrate', '{maxrate}',
+                '-bufsize', '{bufsize}'],
+    },
+    'speed': {
+        'software': ['-crf', '23', '-preset', 'veryfast'],
+        'nvenc': ['-preset', 'p1', '-rc', 'vbr', '-cq', '23', '-b:v', '0'],
+        'qsv': ['-preset', 'veryfast', '-global_quality', '25'],
+        'vaapi': ['-rc_mode', 'CQP', '-qp', '24'],
+        'amf': ['-quality', 'speed', '-rc', 'cqp', '-qp_i', '22', '-qp_p', '24', '-qp_b', '26'],
+    },
+}
+
+
+def encoder_family(encoder):
+    """인코더 이름에서 계열 판단 (h264_nvenc → nvenc, libx264 → software)"""
+    for family in ('nvenc', 'qsv', 'vaapi', 'amf'):
+        if encoder.endswith('_' + family):
+            return family
+    return 'software'
+
+
+def parse_bitrate(value):
+    """'4000k', '4M', '4000000' 형식의 비트레이트를 bps 정수로 변환. 해석할 수 없으면 None"""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    scale = 1
+    if text.endswith('k'):
+        text, scale = text[:-1], 1000
+    elif text.endswith('m'):
+        text, scale = text[:-1], 1000 * 1000
+    try:
+        bps = int(float(text) * scale)
+    except ValueError:
+        return None
+    return bps if bps > 0 else None
+
+
+def encoder_args(profile, encoder, target_bitrate=None):
+    """
+    '-c:v <encoder>'와 프로파일의 화질 옵션 목록.
+    size-target인데 비트레이트를 알 수 없으면 high-quality 옵션을 사용합니다.
+    알 수 없는 프로파일 이름이면 ValueError.
+    """
+    if profile not in _RATE_CONTROL:
+        raise ValueError(f"알 수 없는 인코딩 프로파일: {profile} (사용 가능: {', '.join(PROFILE_NAMES)})")
+    family = encoder_family(encoder)
+
+    if profile == 'size-target':
+        bps = parse_bitrate(target_bitrate)
+        if bps is None:
+            print("목표 비트레이트를 알 수 없어 high-quality 프로파일로 인코딩합니다.")
+            return ['-c:v', encoder, *_RATE_CONTROL['high-quality'][family]]
+        values = {'bitrate': f"{bps // 1000}k", 'maxrate': f"{bps * 3 // 2000}k", 'bufsize': f"{bps * 2 // 1000}k"}
+        return ['-c:v', encoder, *(arg.format(**values) for arg in _RATE_CONTROL[profile][family])]
+
+    return ['-c:v', encoder, *_RATE_CONTROL[profile][family]]
+
+
+def hw_input_args(encoder):
+    """입력(-i) 앞에 붙일 하드웨어 장치 옵션 (VAAPI만 필요)"""
+    if encoder_family(encoder) == 'vaapi':
+        return ['-vaapi_device', VAAPI_DEVICE]
+    return []
+
+
+def finalize_filter(vf_filter, encoder):
+    """소프트웨어 필터 체인 끝에 인코더가 요구하는 프레임 변환을 추가 (VAAPI: nv12 → 하드웨어 업로드)"""
+    if encoder_family(encoder) == 'vaapi':
+        return f"{vf_filter},format=nv12,hwupload" if vf_filter else "format=nv12,hwupload"
+    return vf_filter
+
+
+def rate_control_signature(profile, encoder, target_bitrate=None):
+    """
+    출력 캐시 지문에 넣을 화질 설정 문자열 (오디오는 항상 스트림 복사)
+    size-target에서 비트레이트를 지정하지 않으면 영상마다 원본 비트레이트를 쓰므로 'source'로 기록
+    """
+    if profile == 'size-target':
+        detail = f"bitrate={parse_bitrate(target_bitrate) or 'source'}"
+    else:
+        detail = ' '.join(encoder_args(profile, encoder)[2:])
+    return f"{profile};{encoder_family(encoder)};{detail};audio=copy"
@@ -0,0 +1,135 @@
+# ffmpeg_runner.py
+# FFmpeg를 '-progress pipe:1 -nostats'로 실행하고 진행 상황을 이벤트로 전달하는 실행기
+# - stdout: key=value 진행 정보 → ProgressEvent로 변환해 콜백 호출
+# - stderr: 최근 STDERR_TAIL_LINES 줄만 링 버퍼에 보관 (오류 보고용, 긴 작업에도 메모리 일정)
+
+import contextlib
+import os
+import subprocess
+import threading
+from collections import deque, namedtuple
+
+# 오류 메시지에 포함할 stderr 마지막 줄 수
+STDERR_TAIL_LINES = 200
+
+# 사용할 FFmpeg/ffprobe 실행 파일을 지정하는 환경 변수 (기본: PATH의 ffmpeg / ffprobe)
+FFMPEG_BINARY_ENV = 'DUALSUB_FFMPEG'
+FFPROBE_BINARY_ENV = 'DUALSUB_FFPROBE'
+
+# FFmpeg 진행 이벤트
+# - source: 작업을 구분하기 위한 원본 영상 경로, stage: 'upscale' / 'encode' 등
+# - out_time: 지금까지 인코딩한 출력 시간(초), percent: probe한 전체 길이 대비 진행률 (길이를 모르면 None)
+# - done: 마지막 이벤트(progress=end) 여부
+ProgressEvent = namedtuple('ProgressEvent', [
+    'source', 'stage', 'frame', 'fps', 'speed', 'out_time', 'percent', 'done'
+])
+
+# 작업 스레드별 -threads 값 (병렬 배치에서 작업마다 지정, use_threads 참고)
+_thread_override = threading.local()
+
+
+def ffmpeg_binary():
+    """FFmpeg 실행 파일 (DUALSUB_FFMPEG 환경 변수로 다른 빌드나 테스트용 대체 실행 파일 지정 가능)"""
+    return os.environ.get(FFMPEG_BINARY_ENV) or 'ffmpeg'
+
+
+def ffprobe_binary():
+    """ffprobe 실행 파일 (DUALSUB_FFPROBE 환경 변수로 지정 가능)"""
+    return os.environ.get(FFPROBE_BINARY_ENV) or 'ffprobe'
+
+
+def progress_args():
+    """출력 경로 앞에 붙일 진행 정보 옵션"""
+    return ['-progress', 'pipe:1', '-nostats']
+
+
+def ffmpeg_threads(default=None):
+    """FFmpeg -threads 값: 현재 스레드에 use_threads로 지정한 값 → default → CPU 코어 수"""
+    return getattr(_thread_override, 'threads', None) or default or os.cpu_count() or 4
+
+
+@contextlib.contextmanager
+def use_threads(threads):
+    """with 블록 안에서 현재 스레드의 ffmpeg_threads()가 threads를 반환하도록 함 (프로세서 공유 상태를 바꾸지 않음)"""
+    previous = getattr(_thread_override, 'threads', None)
+    _thread_override.threads = threads
+    try:
+        yield
+    finally:
+        _thread_override.threads = previous
+
+
+def _parse_float(value, suffix=''):
+    try:
+        return float(value.rstrip(suffix)) if value and value != 'N/A' else None
+    except ValueError:
+        return None
+
+
+def _make_event(fields, source, stage, duration):
+    out_time_us = fields.get('out_time_us') or fields.get('out_time_ms')  # 둘 다 마이크로초 단위
+    out_time = _parse_float(out_time_us)
+    out_time = out_time / 1_000_000 if out_time is not None and out_time >= 0 else None
+    done = fields.get('progress') == 'end'
+    percent = None
+    if duration and out_time is not None:
+        percent = min(100.0, out_time * 100.0 / duration)
+    if done and duration:
+        percent = 100.0
+    frame = _parse_float(fields.get('frame'))
+    return ProgressEvent(
+        source=source,
+        stage=stage,
+        frame=int(frame) if frame is not None else None,
+        fps=_parse_float(fields.get('fps')),
+        speed=_parse_float(fields.get('speed'), 'x'),
+        out_time=out_time,
+        percent=percent,
+        done=done,
+    )
+
+
+def run_ffmpeg_process(command, duration=0.0, source=None, stage='encode', on_progress=None, echo_stderr=True):
+    """
+    FFmpeg 명령을 실행하고 (종료 코드, stderr 마지막 부분 문자열)을 반환합니다.
+    command에는 progress_args()가 포함되어 있어야 합니다.
+    on_progress(ProgressEvent)는 FFmpeg가 진행 블록을 보낼 때마다(기본 0.5초 간격) 호출됩니다.
+    FFmpeg 실행 파일이 없으면 FileNotFoundError가 그대로 전달됩니다.
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+
+    def drain_stderr():
+        for line in process.stderr:
+            stderr_tail.append(line)
+            if echo_stderr:
+                print(line.rstrip())
+
+    stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+    stderr_thread.start()
+
+    fields = {}
+    for line in process.stdout:
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        fields[key] = value.strip()
+        if key == 'progress':
+            if on_progress:
+                try:
+                    on_progress(_make_event(fields, source, stage, duration))
+                except Exception as e:
+                    print(f"진행 콜백 오류: {e}")
+            fields = {}
+
+    process.wait()
+    stderr_thread.join()
+    return process.returncode, ''.join(stderr_tail)
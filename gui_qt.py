@@ -4,20 +4,26 @@ import sys
 import threading
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QPushButton, QListWidget, QCheckBox, QProgressBar,
-    QLabel, QMessageBox, QGridLayout, QVBoxLayout, QDialog, QTextEdit, QLineEdit, QComboBox
+    QLabel, QMessageBox, QGridLayout, QVBoxLayout, QDialog, QTextEdit, QLineEdit, QComboBox, QSpinBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QObject
 
 import tkinter as tk
 import re
 from tkinter import filedialog
-from srt_overlap_error import fix_srt_overlaps_and_save, SevereOverlapError
+from srt_overlap_error import SevereOverlapError, OVERLAP_POLICIES
 
 # VideoProcessorManager import
 from video_processor_manager import VideoProcessorManager
+from batch_scheduler import BatchScheduler, default_max_workers, CORES_PER_JOB
+from batch_journal import get_batch_journal, cleanup_orphans
+from encoding_profiles import PROFILES, PROFILE_NAMES, DEFAULT_PROFILE
+from soft_subtitle_mux import SOFT_SUBTITLE_MODES, SOFT_SUBTITLE_MODE_NAMES
+from hls_output import HLS_SEGMENT_TYPE_NAMES
 
 # subtitle_checker.py의 함수를 사용
-from subtitle_checker import check_subtitle_files
+from preflight import preflight
+from srt_cues import CueCacheReleaser
 
 
 # Helper class for thread signals
@@ -44,7 +50,11 @@ class VideoProcessingApp(QWidget):
         self.video_subtitle_pairs = []
         self.results = []
         self.processor = None  # Initialize processor attribute
+        self.scheduler = None  # BatchScheduler (동시 작업 수 제한)
         self.processing_thread = None  # To keep track of the thread
+        self.batch = None  # 현재 배치의 저널 기록 (JournaledBatch)
+        self.job_indices = []  # 스케줄러 작업 번호 → 저널 작업 번호
+        self.resume_state = None  # 이어서 처리할 이전 배치 (batch_journal.find_unfinished 결과)
 
         self.initUI()
 
@@ -53,6 +63,86 @@ class VideoProcessingApp(QWidget):
         self.status_updated.connect(self.update_status_label)
         self.processing_finished.connect(self.show_final_results_qt)
 
+        self.offer_resume()
+
+    def offer_resume(self):
+        """이전 실행에서 끝나지 않은 배치가 있으면 이어서 처리할지 묻습니다."""
+        journal = get_batch_journal()
+        unfinished = journal.find_unfinished()
+        if not unfinished:
+            return
+        if not unfinished['pending']:
+            journal.discard(unfinished['batch_id'])
+            return
+
+        answer = QMessageBox.question(
+            self, "이전 작업 이어서 처리",
+            f"이전 실행에서 끝나지 않은 작업이 {len(unfinished['pending'])}개 있습니다 "
+            f"(완료 {len(unfinished['results'])}개).\n남은 작업을 이어서 처리하시겠습니까?"
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            journal.discard(unfinished['batch_id'])
+            return
+
+        self.apply_settings(unfinished['settings'])
+        self.video_subtitle_pairs = list(unfinished['pending'])
+        self.resume_state = unfinished
+        self.update_file_listbox()
+        self.status_label.setText(f"이전 작업 {len(self.video_subtitle_pairs)}개를 이어서 처리할 준비가 되었습니다.")
+
+    def current_settings(self):
+        """배치 저널에 저장할 위젯 설정값"""
+        return {
+            'padding': self.padding_checkbox.isChecked(),
+            'padding_mode_index': self.padding_mode_combo.currentIndex(),
+            'fix_overlaps': self.fix_overlap_checkbox.isChecked(),
+            'overlap_policy': OVERLAP_POLICIES[self.overlap_policy_combo.currentIndex()],
+            'use_upscaling': self.upscale_checkbox.isChecked(),
+            'target_resolution': self.target_resolution_input.text(),
+            'single_pass': self.single_pass_checkbox.isChecked(),
+            'chunked': self.chunked_checkbox.isChecked(),
+            'design_layout': self.design_layout_checkbox.isChecked(),
+            'soft_subtitles': self.soft_subtitles(),
+            'hls': self.hls_segment_type(),
+            'encoding_profile': PROFILE_NAMES[self.profile_combo.currentIndex()],
+            'use_output_cache': self.skip_unchanged_checkbox.isChecked(),
+            'workers': self.workers_spinbox.value(),
+        }
+
+    def apply_settings(self, settings):
+        """current_settings()로 저장한 값을 위젯에 복원 (없는 항목은 현재 값 유지)"""
+        if 'padding' in settings:
+            self.padding_checkbox.setChecked(settings['padding'])
+        if 'padding_mode_index' in settings:
+            self.padding_mode_combo.setCurrentIndex(settings['padding_mode_index'])
+        if 'fix_overlaps' in settings:
+            self.fix_overlap_checkbox.setChecked(settings['fix_overlaps'])
+        if settings.get('overlap_policy') in OVERLAP_POLICIES:
+            self.overlap_policy_combo.setCurrentIndex(OVERLAP_POLICIES.index(settings['overlap_policy']))
+        if 'use_upscaling' in settings:
+            self.upscale_checkbox.setChecked(settings['use_upscaling'])
+        if 'target_resolution' in settings:
+            self.target_resolution_input.setText(settings['target_resolution'])
+        if 'single_pass' in settings:
+            self.single_pass_checkbox.setChecked(settings['single_pass'])
+        if 'chunked' in settings:
+            self.chunked_checkbox.setChecked(settings['chunked'])
+        if 'design_layout' in settings:
+            self.design_layout_checkbox.setChecked(settings['design_layout'])
+        if settings.get('soft_subtitles') in SOFT_SUBTITLE_MODE_NAMES:
+            self.output_mode_combo.setCurrentIndex(SOFT_SUBTITLE_MODE_NAMES.index(settings['soft_subtitles']) + 1)
+        elif settings.get('hls') in HLS_SEGMENT_TYPE_NAMES:
+            self.output_mode_combo.setCurrentIndex(
+                1 + len(SOFT_SUBTITLE_MODE_NAMES) + HLS_SEGMENT_TYPE_NAMES.index(settings['hls']))
+        elif 'soft_subtitles' in settings:
+            self.output_mode_combo.setCurrentIndex(0)
+        if settings.get('encoding_profile') in PROFILE_NAMES:
+            self.profile_combo.setCurrentIndex(PROFILE_NAMES.index(settings['encoding_profile']))
+        if 'use_output_cache' in settings:
+            self.skip_unchanged_checkbox.setChecked(settings['use_output_cache'])
+        if 'workers' in settings:
+            self.workers_spinbox.setValue(settings['workers'])
+
     def rename_file_if_needed(self, file_path):
         """파일 경로를 받아와서 파일명에 허용되지 않는 문자가 있으면 수정하고, 파일명을 변경합니다."""
         if not file_path or not os.path.exists(file_path):
@@ -117,7 +207,8 @@ class VideoProcessingApp(QWidget):
         self.padding_mode_combo = QComboBox()
         self.padding_mode_combo.addItems([
             "상하단 패딩 (영어=위, 한글=아래)",
-            "하단 이중 패딩 (영어패딩 → 한글패딩)"
+            "하단 이중 패딩 (영어패딩 → 한글패딩)",
+            "세 가지 레이아웃 모두 (한 번 디코딩)"
         ])
         self.padding_mode_label.setEnabled(False)
         self.padding_mode_combo.setEnabled(False)
@@ -127,7 +218,21 @@ class VideoProcessingApp(QWidget):
         # --- Row 4: Subtitle Overlap Fix Option ---
         self.fix_overlap_checkbox = QCheckBox("자막 시간 겹침 자동 수정")
         self.fix_overlap_checkbox.setChecked(True)  # 기본값으로 활성화
-        layout.addWidget(self.fix_overlap_checkbox, 4, 0, 1, 3)
+        self.fix_overlap_checkbox.stateChanged.connect(self.toggle_overlap_policy)
+        layout.addWidget(self.fix_overlap_checkbox, 4, 0)
+
+        self.overlap_policy_label = QLabel("겹침 처리 방식:")
+        layout.addWidget(self.overlap_policy_label, 4, 1, alignment=Qt.AlignmentFlag.AlignRight)
+
+        # 콤보 항목 순서는 OVERLAP_POLICIES와 같음
+        self.overlap_policy_combo = QComboBox()
+        self.overlap_policy_combo.addItems([
+            "종료 시간 자르기",
+            "겹친 텍스트 합치기",
+            "겹친 자막 위아래로 쌓기",
+            "엄격 (심각한 겹침이면 중단)"
+        ])
+        layout.addWidget(self.overlap_policy_combo, 4, 2)
 
         # --- Row 5: Upscaling Options ---
         self.upscale_checkbox = QCheckBox("자동 업스케일링 (권장, 낮은 해상도 영상에 효과적)")
@@ -142,21 +247,69 @@ class VideoProcessingApp(QWidget):
         self.target_resolution_input.setFixedWidth(100)  # 가로 길이 고정
         layout.addWidget(self.target_resolution_input, 5, 2, alignment=Qt.AlignmentFlag.AlignLeft)
 
-        # --- Row 6: Start Button ---
+        # --- Row 6: Single-pass Option ---
+        self.single_pass_checkbox = QCheckBox("단일 패스 처리 (업스케일 임시 파일 없이 한 번에 인코딩)")
+        self.single_pass_checkbox.setChecked(True)  # 기본값으로 활성화
+        layout.addWidget(self.single_pass_checkbox, 6, 0)
+
+        self.chunked_checkbox = QCheckBox("긴 영상 분할 병렬 인코딩")
+        self.chunked_checkbox.setChecked(False)
+        layout.addWidget(self.chunked_checkbox, 6, 1, 1, 2)
+
+        # --- Row 7: Output Cache / Concurrent Jobs ---
+        self.skip_unchanged_checkbox = QCheckBox("입력이 같으면 기존 출력 재사용")
+        self.skip_unchanged_checkbox.setChecked(True)  # 기본값으로 활성화
+        layout.addWidget(self.skip_unchanged_checkbox, 7, 0)
+
+        self.workers_label = QLabel("동시 작업 수:")
+        layout.addWidget(self.workers_label, 7, 1, alignment=Qt.AlignmentFlag.AlignRight)
+
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spinbox.setValue(default_max_workers())  # 코어 수 기반 기본값
+        layout.addWidget(self.workers_spinbox, 7, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        # --- Row 8: Encoding Profile ---
+        self.profile_label = QLabel("인코딩 프로파일:")
+        layout.addWidget(self.profile_label, 8, 0, alignment=Qt.AlignmentFlag.AlignRight)
+
+        # 콤보 항목 순서는 PROFILES와 같음
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems([profile.label for profile in PROFILES])
+        self.profile_combo.setCurrentIndex(PROFILE_NAMES.index(DEFAULT_PROFILE))
+        layout.addWidget(self.profile_combo, 8, 1, 1, 2)
+
+        # --- Row 9: Resolution-independent Subtitle Layout ---
+        self.design_layout_checkbox = QCheckBox("해상도 독립 자막 레이아웃 (업스케일링 없이 원본 해상도에서도 같은 자막 크기)")
+        self.design_layout_checkbox.setChecked(False)
+        layout.addWidget(self.design_layout_checkbox, 9, 0, 1, 3)
+
+        # --- Row 10: Output Mode (burn-in / soft subtitles / HLS) ---
+        self.output_mode_label = QLabel("출력 방식:")
+        layout.addWidget(self.output_mode_label, 10, 0, alignment=Qt.AlignmentFlag.AlignRight)
+
+        # 첫 항목은 자막 입히기, 이후 SOFT_SUBTITLE_MODES 순서, 마지막은 HLS_SEGMENT_TYPE_NAMES 순서
+        self.output_mode_combo = QComboBox()
+        self.output_mode_combo.addItems(["자막 입히기 (재인코딩)"] + [mode.label for mode in SOFT_SUBTITLE_MODES] +
+                                        [f"HLS 스트리밍 ({name.upper()} 세그먼트, 1080p/720p/480p)"
+                                         for name in HLS_SEGMENT_TYPE_NAMES])
+        layout.addWidget(self.output_mode_combo, 10, 1, 1, 2)
+
+        # --- Row 11: Start Button ---
         self.start_button = QPushButton("처리 시작")
         self.start_button.clicked.connect(self.start_processing)
-        layout.addWidget(self.start_button, 6, 0, 1, 3)  # Span 3 columns
+        layout.addWidget(self.start_button, 11, 0, 1, 3)  # Span 3 columns
 
-        # --- Row 7: Progress Bar ---
+        # --- Row 12: Progress Bar ---
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(True)
-        layout.addWidget(self.progress_bar, 7, 0, 1, 3)  # Span 3 columns
+        layout.addWidget(self.progress_bar, 12, 0, 1, 3)  # Span 3 columns
 
-        # --- Row 8: Status Label ---
+        # --- Row 13: Status Label ---
         self.status_label = QLabel("")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.status_label, 8, 0, 1, 3)  # Span 3 columns
+        layout.addWidget(self.status_label, 13, 0, 1, 3)  # Span 3 columns
 
         # Adjust column stretch factors for better resizing
         layout.setColumnStretch(0, 2)
@@ -176,6 +329,12 @@ class VideoProcessingApp(QWidget):
         is_checked = (state == Qt.CheckState.Checked.value)
         self.target_resolution_label.setEnabled(is_checked)
         self.target_resolution_input.setEnabled(is_checked)
+        self.single_pass_checkbox.setEnabled(is_checked)
+
+    def toggle_overlap_policy(self, state):
+        is_checked = (state == Qt.CheckState.Checked.value)
+        self.overlap_policy_label.setEnabled(is_checked)
+        self.overlap_policy_combo.setEnabled(is_checked)
 
     def select_files(self):
         root = tk.Tk()
@@ -189,6 +348,11 @@ class VideoProcessingApp(QWidget):
         if not video_files_tuple:
             return
 
+        # 파일을 새로 고르면 이전 배치 이어서 처리는 취소 (새 배치로 시작)
+        if self.resume_state:
+            self.video_subtitle_pairs = []
+            self.resume_state = None
+
         video_files = list(video_files_tuple)
 
         initial_dir = ""
@@ -246,44 +410,40 @@ class VideoProcessingApp(QWidget):
             QMessageBox.warning(self, "처리 중", "이미 다른 작업이 처리 중입니다.")
             return
 
-        # --- 자막 겹침 자동 수정 옵션 처리 ---
-        if self.fix_overlap_checkbox.isChecked():
-            try:
-                fixed_any = False
-                new_pairs = []
-                for video, kor_sub, eng_sub in self.video_subtitle_pairs:
-                    new_kor_path = kor_sub
-                    new_eng_path = eng_sub
-
-                    if kor_sub:
-                        new_kor_path = fix_srt_overlaps_and_save(kor_sub)
-                        if new_kor_path != kor_sub:
-                            fixed_any = True
-
-                    if eng_sub:
-                        new_eng_path = fix_srt_overlaps_and_save(eng_sub)
-                        if new_eng_path != eng_sub:
-                            fixed_any = True
-
-                    new_pairs.append((video, new_kor_path, new_eng_path))
-
-                self.video_subtitle_pairs = new_pairs
-                if fixed_any:
-                    self.update_file_listbox()
-                    QMessageBox.information(self, "알림", "자막 겹침이 자동으로 수정되었습니다.\n수정된 파일(*.fixed.srt)이 생성되었습니다.")
-
-            except SevereOverlapError as e:
-                QMessageBox.critical(self, "심각한 자막 오류", str(e))
-                return  # 처리 중단
-            except Exception as e:
-                QMessageBox.critical(self, "자막 수정 오류", f"자막 파일 자동 수정 중 오류가 발생했습니다:\n{e}")
-                return
+        # --- 사전 점검: 영상 probe + 자막 겹침 자동 수정(옵션) + 자막 검사를 배치 전체에 대해 동시에 실행 ---
+        # 수정 결과는 메모리 cue 캐시에 저장되어 ASS 생성에 그대로 사용됨 (*.fixed.srt 생성 안 함)
+        fix_overlaps = self.fix_overlap_checkbox.isChecked()
+        policy = OVERLAP_POLICIES[self.overlap_policy_combo.currentIndex()]
+        try:
+            report = preflight(self.video_subtitle_pairs, fix_overlaps=fix_overlaps, overlap_policy=policy)
+        except Exception as e:
+            QMessageBox.critical(self, "사전 점검 오류", f"파일 사전 점검 중 오류가 발생했습니다:\n{e}")
+            return
+
+        if report.probe_errors:
+            # 영상 정보를 읽지 못한 파일은 인코딩도 실패하므로 시작 전에 모두 모아 표시
+            QMessageBox.critical(self, "영상 오류", "다음 영상의 정보를 읽지 못했습니다. 목록에서 제외하거나 파일을 확인해주세요:\n\n"
+                                 + "\n\n".join(f"{os.path.basename(video)}: {error}"
+                                                for video, error in report.probe_errors.items()))
+            return  # 처리 중단
+
+        if report.fix_errors:
+            # 수정하지 못한 파일을 모두 모아 한 번에 표시
+            errors = list(report.fix_errors.values())
+            if all(isinstance(error, SevereOverlapError) for error in errors):
+                QMessageBox.critical(self, "심각한 자막 오류", "\n\n".join(str(error) for error in errors))
+            else:
+                QMessageBox.critical(self, "자막 수정 오류", "자막 파일 자동 수정 중 오류가 발생했습니다:\n"
+                                     + "\n\n".join(str(error) for error in errors))
+            return  # 처리 중단
 
-        # 자막 파일 오류 최종 검사
-        subtitle_check_result = check_subtitle_files(self.video_subtitle_pairs)
-        if subtitle_check_result:
-            error_file, errors = subtitle_check_result
-            self.show_srt_errors_qt(error_file, errors)
+        summaries = [fix_report.summary() for fix_report in report.fix_reports.values() if fix_report.changed_count]
+        if summaries:
+            QMessageBox.information(self, "알림", "자막 겹침이 자동으로 수정되었습니다.\n\n" + "\n".join(summaries))
+
+        # 자막 파일 오류 최종 검사 (오류가 있는 파일을 모두 한 번에 표시)
+        if report.subtitle_errors:
+            self.show_srt_errors_qt(report.subtitle_errors)
             return
 
         # --- 업스케일링 옵션 값 가져오기 ---
@@ -313,41 +473,94 @@ class VideoProcessingApp(QWidget):
             target_width = 0
             target_height = 0
 
+        if self.hls_segment_type() and self.padding_checkbox.isChecked() and self.padding_mode_combo.currentIndex() == 2:
+            QMessageBox.warning(self, "입력 오류", "HLS 출력은 '세 가지 레이아웃 모두' 패딩 모드와 함께 사용할 수 없습니다.")
+            return
+
         self.progress_bar.setMaximum(len(self.video_subtitle_pairs))
         self.progress_bar.setValue(0)
         self.results.clear()
+
+        # --- 배치 저널 기록 시작 (이어서 처리하는 경우 이전 결과 포함) ---
+        journal = get_batch_journal()
+        resumed = self.resume_state is not None
+        if resumed:
+            self.batch = journal.resume(self.resume_state['batch_id'])
+            self.job_indices = list(self.resume_state['pending_indices'])
+            self.results.extend(self.resume_state['results'])
+            self.resume_state = None
+        else:
+            self.batch = journal.start_batch(self.video_subtitle_pairs, self.current_settings())
+            self.job_indices = list(range(len(self.video_subtitle_pairs)))
         self.status_label.setText("처리 준비 중...")
         self.start_button.setEnabled(False)
         self.select_files_button.setEnabled(False)
 
-        # --- 패딩 모드 결정 (none / top_bottom / bottom_double) ---
+        # --- 패딩 모드 결정 (none / top_bottom / bottom_double / all) ---
         if self.padding_checkbox.isChecked():
-            padding_mode = 'top_bottom' if self.padding_mode_combo.currentIndex() == 0 else 'bottom_double'
+            padding_mode = ('top_bottom', 'bottom_double', 'all')[self.padding_mode_combo.currentIndex()]
         else:
             padding_mode = 'none'
 
         # VideoProcessorManager 인스턴스 생성 (새로운 파라미터 전달)
         self.processor = VideoProcessorManager(
-            padding_mode, use_upscaling, target_width, target_height
+            padding_mode, use_upscaling, target_width, target_height,
+            single_pass=self.single_pass_checkbox.isChecked(),
+            use_output_cache=self.skip_unchanged_checkbox.isChecked(),
+            chunk_workers=self.chunk_workers(),
+            encoding_profile=PROFILE_NAMES[self.profile_combo.currentIndex()],
+            design_space_layout=self.design_layout_checkbox.isChecked(),
+            soft_subtitles=self.soft_subtitles(),
+            hls=self.hls_segment_type()
         )
+        if resumed:
+            # 중단된 작업의 미완성 출력은 현재 설정의 출력 이름으로만 찾아서 정리
+            cleanup_orphans((video for video, _, _ in self.video_subtitle_pairs), self.processor.get_output_paths)
+        # 위젯 값은 GUI 스레드에서 읽어 스케줄러에 전달
+        self.scheduler = BatchScheduler(self.processor, max_workers=self.workers_spinbox.value())
 
         self.processing_thread = threading.Thread(target=self.process_videos, daemon=True)
         self.processing_thread.start()
 
     def process_videos(self):
         try:
-            for i, (video, korean_sub, english_sub) in enumerate(self.video_subtitle_pairs):
-                self.status_updated.emit(f"처리 중 ({i+1}/{len(self.video_subtitle_pairs)}): {os.path.basename(video)}")
-
-                if not self.processor:
+            total = len(self.video_subtitle_pairs)
+            if not self.processor:
+                for video, _, _ in self.video_subtitle_pairs:
                     self.results.append(("Error", f"{os.path.basename(video)}: Processor not initialized."))
-                    self.progress_updated.emit(i + 1)
-                    continue
+                return
+
+            scheduler = self.scheduler
+            self.status_updated.emit(f"처리 중 (0/{total}), 동시 작업 {scheduler.max_workers}개")
+            done = 0
+
+            def on_progress(event):
+                # 작업 스레드에서 호출됨 (시그널 emit은 스레드 안전)
+                if event.percent is None:
+                    return
+                speed = f", {event.speed:.1f}x" if event.speed else ""
+                self.status_updated.emit(
+                    f"처리 중 ({done}/{total}): {os.path.basename(event.source)} "
+                    f"{'업스케일링' if event.stage == 'upscale' else '인코딩'} {event.percent:.0f}%{speed}"
+                )
 
-                result = self.processor.process_single_video(video, korean_sub, english_sub)
+            self.processor.processor.progress_callback = on_progress
+            batch, job_indices = self.batch, self.job_indices
+            # 사전 점검에서 캐시한 자막 cue는 그 자막을 쓰는 마지막 작업이 끝나면 해제
+            cue_cache = CueCacheReleaser(self.video_subtitle_pairs)
+
+            # 작업이 끝나는 순서대로 결과를 받아 진행률 갱신
+            jobs = scheduler.run(self.video_subtitle_pairs,
+                                 on_job_start=lambda i: batch.job_started(job_indices[i]))
+            for done, (index, job, result) in enumerate(jobs, start=1):
+                video = job[0]
+                cue_cache.job_finished(job)
+                batch.job_finished(job_indices[index], result)
                 self.results.append(result)
-                self.progress_updated.emit(i + 1)
+                self.progress_updated.emit(done)
+                self.status_updated.emit(f"처리 중 ({done}/{total}): {os.path.basename(video)} 완료")
 
+            batch.finish()
             self.status_updated.emit("모든 처리가 완료되었습니다.")
         except Exception as e:
             self.status_updated.emit(f"처리 중 심각한 오류 발생: {e}")
@@ -355,6 +568,23 @@ class VideoProcessingApp(QWidget):
         finally:
             self.processing_finished.emit(self.results)
 
+    def soft_subtitles(self):
+        """선택한 소프트 자막 모드 이름 (자막 입히기/HLS면 None)"""
+        index = self.output_mode_combo.currentIndex()
+        return SOFT_SUBTITLE_MODE_NAMES[index - 1] if 0 < index <= len(SOFT_SUBTITLE_MODE_NAMES) else None
+
+    def hls_segment_type(self):
+        """선택한 HLS 세그먼트 형식 (HLS 출력이 아니면 None)"""
+        index = self.output_mode_combo.currentIndex() - 1 - len(SOFT_SUBTITLE_MODE_NAMES)
+        return HLS_SEGMENT_TYPE_NAMES[index] if index >= 0 else None
+
+    def chunk_workers(self):
+        """분할 인코딩 시 영상 하나당 동시 인코딩 수 (동시 작업들이 코어를 나눠 씀)"""
+        if not self.chunked_checkbox.isChecked():
+            return 1
+        cores_per_job = (os.cpu_count() or 4) // self.workers_spinbox.value()
+        return max(2, cores_per_job // CORES_PER_JOB)
+
     def update_progress_bar(self, value):
         self.progress_bar.setValue(value)
 
@@ -397,20 +627,27 @@ class VideoProcessingApp(QWidget):
 
         dialog.exec()
 
-    def show_srt_errors_qt(self, srt_file, errors):
-        """SRT 파일 오류를 PyQt6 Dialog로 표시합니다."""
+    def show_srt_errors_qt(self, errors_by_file):
+        """SRT 파일 오류를 PyQt6 Dialog로 표시합니다. errors_by_file: {자막 경로: 오류 메시지 리스트}"""
+        file_names = [os.path.basename(srt_file) for srt_file in errors_by_file]
         dialog = QDialog(self)
-        dialog.setWindowTitle(f"'{os.path.basename(srt_file)}' 자막 오류")
+        if len(file_names) == 1:
+            dialog.setWindowTitle(f"'{file_names[0]}' 자막 오류")
+        else:
+            dialog.setWindowTitle(f"자막 오류 ({len(file_names)}개 파일)")
         dialog.setGeometry(200, 200, 600, 400)
 
         layout = QVBoxLayout(dialog)
 
-        info_label = QLabel(f"파일 '{os.path.basename(srt_file)}'에서 다음 오류가 발견되었습니다:")
+        info_label = QLabel(f"자막 파일 {len(file_names)}개에서 다음 오류가 발견되었습니다:")
         layout.addWidget(info_label)
 
         text_edit = QTextEdit()
         text_edit.setReadOnly(True)
-        text_edit.setText("\n".join(errors))
+        text_edit.setText("\n\n".join(
+            f"=== {os.path.basename(srt_file)} ({len(errors)}건) ===\n" + "\n".join(errors)
+            for srt_file, errors in errors_by_file.items()
+        ))
         layout.addWidget(text_edit)
 
         close_button = QPushButton("확인")
@@ -421,7 +658,8 @@ class VideoProcessingApp(QWidget):
         dialog.exec()
 
         QMessageBox.critical(self, "자막 오류",
-                             f"'{os.path.basename(srt_file)}'에 오류가 발견되어 처리를 중단합니다.\n오류 내용을 확인하세요.")
+                             "다음 자막 파일에 오류가 발견되어 처리를 중단합니다.\n오류 내용을 확인하세요.\n\n"
+                             + "\n".join(file_names))
 
     def closeEvent(self, event):
         event.accept()
@@ -0,0 +1,327 @@
+# hls_output.py
+# HLS 스트리밍 출력: 자막을 입힌 영상을 해상도/비트레이트 단계(ladder)별 세그먼트와 재생 목록으로 기록
+# - filter_complex: 원본을 한 번 디코딩(+스케일)하고 패딩/ASS를 한 번 적용한 뒤 split으로 나눠 단계별 크기로 축소
+# - 단계마다 hls muxer 출력 하나 (세그먼트 길이에 맞춰 키프레임을 고정해 단계 간 세그먼트 경계가 일치)
+# - 출력은 미완성 디렉터리(<이름>_hls.partial)에 쓰고 성공했을 때만 기존 출력 디렉터리와 교체합니다
+#   (다시 실행하다 실패하거나 중단되어도 이전에 완성된 출력은 그대로 남음)
+# - master.m3u8은 인코딩 전에 먼저 쓰고, 단계별 재생 목록은 EVENT 형식이라 세그먼트가 생길 때마다 갱신되므로
+#   인코딩이 끝나기 전에도 플레이어가 미완성 디렉터리의 master.m3u8로 앞부분부터 재생할 수 있습니다.
+# 자막 배치는 패딩 모드에 해당하는 프로세서의 build_subtitle_filter를 그대로 사용합니다.
+
+import os
+import re
+import shutil
+from collections import namedtuple
+
+from encoding_profiles import encoder_args, encoder_family, hw_input_args, finalize_filter, parse_bitrate
+from ffmpeg_runner import run_ffmpeg_process, progress_args, ffmpeg_binary, ffmpeg_threads
+from job_result import JobTimer, ERROR_INPUT, ERROR_SUBTITLE, ERROR_SCRATCH, ERROR_ENCODE, ERROR_UNEXPECTED
+from probe_cache import probe_media
+from scratch import get_scratch_space, remove_scratch_file, estimate_ass_size, ScratchSpaceError
+from utils import build_upscale_filter
+
+# 단계 이름, 영상(패딩 제외) 높이, 목표 비트레이트
+HlsRung = namedtuple('HlsRung', ['name', 'height', 'bitrate'])
+
+DEFAULT_LADDER = (
+    HlsRung('1080p', 1080, '5000k'),
+    HlsRung('720p', 720, '2800k'),
+    HlsRung('480p', 480, '1400k'),
+)
+
+# 세그먼트 형식 이름 → (hls_segment_type 값, 세그먼트 확장자, 재생 목록 버전)
+HLS_SEGMENT_TYPES = {
+    'fmp4': ('fmp4', 'm4s', 7),
+    'ts': ('mpegts', 'ts', 3),
+}
+HLS_SEGMENT_TYPE_NAMES = tuple(HLS_SEGMENT_TYPES)
+
+# 세그먼트 길이(초). 모든 단계에서 같은 시각에 키프레임을 강제해 단계 전환이 세그먼트 경계에서 가능
+HLS_SEGMENT_SECONDS = 6
+
+# 원본 오디오가 AAC가 아니면 다시 인코딩할 비트레이트 (재생 목록 BANDWIDTH 계산에도 사용)
+HLS_AUDIO_BITRATE = '128k'
+
+MASTER_PLAYLIST_NAME = "master.m3u8"
+
+_MAP_URI_PATTERN = re.compile(r'URI="([^"]+)"')
+
+
+def _even(value):
+    return max(2, int(round(value / 2.0)) * 2)
+
+
+def ladder_rungs(video_height, ladder=DEFAULT_LADDER):
+    """영상 높이에서 만들 단계 목록 (영상보다 큰 단계는 제외, 모두 크면 가장 낮은 단계의 비트레이트로 원본 크기 하나)"""
+    rungs = [rung for rung in ladder if rung.height <= video_height]
+    if not rungs:
+        lowest = min(ladder, key=lambda rung: rung.height)
+        rungs = [HlsRung(f"{video_height}p", video_height, lowest.bitrate)]
+    return rungs
+
+
+def plan_ladder(video_width, video_height, display_height, ladder=DEFAULT_LADDER):
+    """
+    [(단계, 출력 너비, 출력 높이), ...] 계산. 높이는 패딩을 포함한 캔버스를 같은 비율로 줄인 값입니다.
+    영상보다 큰 단계는 만들지 않고, 모든 단계가 영상보다 크면 가장 낮은 단계의 비트레이트로 원본 크기 하나만 만듭니다.
+    """
+    planned = []
+    for rung in ladder_rungs(video_height, ladder):
+        scale = rung.height / video_height
+        planned.append((rung, _even(video_width * scale), _even(display_height * scale)))
+    return planned
+
+
+def build_master_playlist(planned, segment_type):
+    """단계별 재생 목록을 가리키는 master 재생 목록 (BANDWIDTH는 최대 비트레이트 + 오디오)"""
+    _, _, version = HLS_SEGMENT_TYPES[segment_type]
+    lines = ["#EXTM3U", f"#EXT-X-VERSION:{version}", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for rung, width, height in planned:
+        bandwidth = parse_bitrate(rung.bitrate) * 3 // 2 + parse_bitrate(HLS_AUDIO_BITRATE)
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}")
+        lines.append(f"{rung.name}/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def build_ladder_filter(head_filter, planned, encoder):
+    """[0:v] → (스케일, 패딩/자막) → split → 단계별 scale → [out0], [out1], ... 형태의 filter_complex 문자열"""
+    count = len(planned)
+    branches = ''.join(f"[v{i}]" for i in range(count))
+    chains = [f"[0:v]{head_filter},split={count}{branches}"]
+    for i, (_, width, height) in enumerate(planned):
+        chains.append(f"[v{i}]{finalize_filter(f'scale={width}:{height}', encoder)}[out{i}]")
+    return ';'.join(chains)
+
+
+def hls_muxer_args(rung_dir, segment_type):
+    """단계 하나의 hls muxer 옵션과 재생 목록 경로"""
+    muxer_type, extension, _ = HLS_SEGMENT_TYPES[segment_type]
+    args = [
+        '-f', 'hls',
+        '-hls_time', str(HLS_SEGMENT_SECONDS),
+        '-hls_playlist_type', 'event',
+        '-hls_segment_type', muxer_type,
+        # temp_file: 세그먼트를 다 쓴 뒤 이름을 바꿔 플레이어가 쓰는 중인 세그먼트를 읽지 않게 함
+        '-hls_flags', 'independent_segments+temp_file',
+        '-hls_segment_filename', os.path.join(rung_dir, f"seg_%05d.{extension}"),
+    ]
+    if muxer_type == 'fmp4':
+        args.extend(['-hls_fmp4_init_filename', 'init.mp4'])
+    return [*args, os.path.join(rung_dir, "index.m3u8")]
+
+
+def _playlist_uris(playlist_path, require_end=False):
+    """재생 목록이 가리키는 파일 경로 목록 (EXT-X-MAP 초기화 세그먼트 포함, 재생 목록 위치 기준)"""
+    base_dir = os.path.dirname(playlist_path)
+    uris, ended = [], False
+    with open(playlist_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line == '#EXT-X-ENDLIST':
+                ended = True
+            elif line.startswith('#EXT-X-MAP:'):
+                match = _MAP_URI_PATTERN.search(line)
+                if match:
+                    uris.append(os.path.join(base_dir, match.group(1)))
+            elif line and not line.startswith('#'):
+                uris.append(os.path.join(base_dir, line))
+    if require_end and not ended:
+        raise ValueError(f"끝나지 않은 HLS 재생 목록: {playlist_path}")
+    return uris
+
+
+def hls_output_files(master_path):
+    """
+    HLS 출력을 이루는 모든 파일 (master 재생 목록, 단계별 재생 목록, 초기화/미디어 세그먼트)
+    단계별 재생 목록에 #EXT-X-ENDLIST가 없으면 인코딩이 끝나지 않은 출력이므로 ValueError
+    """
+    files = [master_path]
+    for variant in _playlist_uris(master_path):
+        files.append(variant)
+        files.extend(_playlist_uris(variant, require_end=True))
+    return files
+
+
+def _replace_directory(new_dir, target_dir):
+    """new_dir를 target_dir 이름으로 옮김. 기존 target_dir는 교체가 끝난 뒤 삭제 (교체 실패 시 되돌림)"""
+    old_dir = None
+    if os.path.isdir(target_dir):
+        old_dir = f"{target_dir}.old"
+        if os.path.isdir(old_dir):
+            shutil.rmtree(old_dir)
+        os.replace(target_dir, old_dir)
+    try:
+        os.replace(new_dir, target_dir)
+    except OSError:
+        if old_dir:
+            os.replace(old_dir, target_dir)
+        raise
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class HlsPackager:
+    """
+    VideoProcessorManager가 HLS 출력을 선택했을 때 사용하는 처리기
+    layout: 패딩/자막 배치를 제공하는 프로세서 (video_processor 계열)
+    (process_single_video / get_output_path / get_encoder 등 프로세서와 같은 인터페이스)
+    """
+
+    def __init__(self, layout, segment_type='fmp4', ladder=DEFAULT_LADDER):
+        if segment_type not in HLS_SEGMENT_TYPES:
+            raise ValueError(f"알 수 없는 HLS 세그먼트 형식: {segment_type} (사용 가능: {', '.join(HLS_SEGMENT_TYPE_NAMES)})")
+        self.layout = layout
+        self.segment_type = segment_type
+        self.ladder = ladder
+        self.use_upscaling = layout.use_upscaling
+        self.target_width = layout.target_width
+        self.target_height = layout.target_height
+        self.scratch_dir = layout.scratch_dir
+        # 프로세서와 같은 속성 (스케줄러/CLI/GUI가 설정). 단계별 비트레이트를 쓰므로 인코딩 프로파일은 사용하지 않음
+        self.threads = None
+        self.progress_callback = None
+        self.chunk_workers = 1
+        self.encoding_profile = None
+        self.target_bitrate = None
+        self.design_space_layout = False
+
+    def get_encoder(self):
+        return self.layout.get_encoder()
+
+    def output_settings(self):
+        """출력 캐시 지문에 넣을 설정"""
+        settings = {
+            'hls': self.segment_type,
+            'hls_layout': type(self.layout).__module__,
+            'ladder': [list(rung) for rung in self.ladder],
+            'segment_seconds': HLS_SEGMENT_SECONDS,
+            'target': [self.target_width, self.target_height] if self.use_upscaling else None,
+            'encoder': self.get_encoder(),
+        }
+        if self.design_space_layout:
+            settings['layout_space'] = 'design'
+        return settings
+
+    def get_output_dir(self, input_path):
+        base, _ = os.path.splitext(self.layout.get_output_path(input_path))
+        return f"{base}_hls"
+
+    def get_output_path(self, input_path):
+        return os.path.join(self.get_output_dir(input_path), MASTER_PLAYLIST_NAME)
+
+    def hw_sessions_needed(self, input_path):
+        """FFmpeg 하나가 단계마다 인코더를 하나씩 열므로 이 영상에서 만들 단계 수만큼"""
+        if self.use_upscaling:
+            video_height = self.target_height
+        else:
+            _, video_height = self.layout.get_video_resolution(input_path)
+        if not video_height:
+            return len(self.ladder)
+        return len(ladder_rungs(video_height, self.ladder))
+
+    def process_single_video(self, input_path, korean_srt_path, english_srt_path):
+        video_name = os.path.basename(input_path)
+        video_name_no_ext = os.path.splitext(video_name)[0]
+        temp_ass_path = ""
+        build_dir = ""
+        job = JobTimer(input_path)
+        self.layout.design_space_layout = self.design_space_layout
+
+        try:
+            output_path = self.get_output_path(input_path)
+            job.output = output_path
+
+            if not korean_srt_path and not english_srt_path:
+                warning_msg = f"{video_name}: 최소 하나의 SRT 자막 파일이 선택되지 않았습니다. 스킵합니다."
+                return job.result("Warning", warning_msg)
+
+            with job.stage('probe'):
+                original_width, original_height = self.layout.get_video_resolution(input_path)
+            if not original_width or not original_height:
+                error_msg = f"{video_name}: 원본 비디오 해상도 가져오기 실패"
+                return job.result("Error", error_msg, ERROR_INPUT)
+
+            encoder = self.get_encoder()
+            job.encoder = encoder
+            final_video_width, final_video_height = original_width, original_height
+            scale_filter = ""
+            if self.use_upscaling and (original_width != self.target_width or original_height != self.target_height):
+                scale_filter = build_upscale_filter(self.target_width, self.target_height)
+                final_video_width, final_video_height = self.target_width, self.target_height
+
+            # 자막은 가장 큰 크기에서 한 번만 입히고 단계별로 축소
+            temp_ass_path = get_scratch_space(self.scratch_dir).small_path(
+                video_name_no_ext + "_hls", "_temp.ass", estimate_ass_size(korean_srt_path, english_srt_path)
+            )
+            with job.stage('ass'):
+                subtitle_filter, final_display_height = self.layout.build_subtitle_filter(
+                    english_srt_path, korean_srt_path, temp_ass_path, final_video_width, final_video_height)
+            if subtitle_filter is None:
+                error_msg = f"{video_name}: ASS 파일 병합 실패."
+                return job.result("Error", error_msg, ERROR_SUBTITLE)
+            head_filter = f"{scale_filter},{subtitle_filter}" if scale_filter else subtitle_filter
+
+            planned = plan_ladder(final_video_width, final_video_height, final_display_height, self.ladder)
+            print(f"HLS 단계: {', '.join(f'{rung.name}({width}x{height}, {rung.bitrate})' for rung, width, height in planned)}")
+
+            # 미완성 디렉터리에 새로 쓰고 master 재생 목록을 먼저 기록 (기존 출력은 성공할 때까지 그대로 둠)
+            output_dir = self.get_output_dir(input_path)
+            build_dir = f"{output_dir}.partial"
+            if os.path.isdir(build_dir):
+                shutil.rmtree(build_dir)
+            for rung, _, _ in planned:
+                os.makedirs(os.path.join(build_dir, rung.name), exist_ok=True)
+            build_master_path = os.path.join(build_dir, MASTER_PLAYLIST_NAME)
+            with open(build_master_path, 'w', encoding='utf-8') as f:
+                f.write(build_master_playlist(planned, self.segment_type))
+            print(f"인코딩 중 재생 목록: {build_master_path}")
+
+            # HLS 플레이어 호환을 위해 AAC가 아닌 오디오만 다시 인코딩
+            audio_codec = probe_media(input_path).audio_codec
+            audio_args = ['-c:a', 'copy'] if audio_codec in (None, 'aac') else ['-c:a', 'aac', '-b:a', HLS_AUDIO_BITRATE]
+            threads = ffmpeg_threads(self.threads)
+            keyframes = ['-force_key_frames', f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})"]
+            if encoder_family(encoder) == 'software':
+                keyframes.extend(['-sc_threshold', '0'])
+
+            command = [ffmpeg_binary(), *hw_input_args(encoder), '-i', input_path,
+                       '-filter_complex', build_ladder_filter(head_filter, planned, encoder),
+                       *progress_args(), '-y']
+            for i, (rung, _, _) in enumerate(planned):
+                command.extend(['-map', f"[out{i}]", '-map', '0:a:0?',
+                                *encoder_args('size-target', encoder, rung.bitrate), *keyframes, *audio_args,
+                                '-threads', str(threads),
+                                *hls_muxer_args(os.path.join(build_dir, rung.name), self.segment_type)])
+
+            print(f"실행할 FFmpeg HLS 명령어: {' '.join(command)}")
+            with job.stage('encode'):
+                returncode, stderr_tail = run_ffmpeg_process(
+                    command, self.layout.get_video_duration(input_path),
+                    source=input_path, stage='encode', on_progress=self.progress_callback
+                )
+            playlists = [os.path.join(build_dir, rung.name, "index.m3u8") for rung, _, _ in planned]
+            if returncode != 0 or not all(os.path.exists(path) for path in playlists):
+                error_msg = f"{video_name}: FFmpeg HLS 처리 실패 (인코더: {encoder}).\n{stderr_tail}"
+                return job.result("Error", error_msg, ERROR_ENCODE)
+
+            with job.stage('finalize'):
+                _replace_directory(build_dir, output_dir)
+            build_dir = ""
+            job.width, job.height = planned[0][1], planned[0][2]
+            success_msg = (f"{video_name}: HLS 출력 완료 ({len(planned)}단계: "
+                           f"{', '.join(rung.name for rung, _, _ in planned)}). 인코더: {encoder}"
+                           f" 출력: {os.path.basename(output_dir)}/{MASTER_PLAYLIST_NAME}")
+            return job.result("Success", success_msg)
+
+        except ScratchSpaceError as e:
+            return job.result("Error", f"{video_name}: {e}", ERROR_SCRATCH)
+        except Exception as e:
+            error_msg = f"{video_name}: 예기치 않은 오류 발생 - {e}"
+            return job.result("Error", error_msg, ERROR_UNEXPECTED)
+        finally:
+            with job.stage('cleanup'):
+                remove_scratch_file(temp_ass_path, "임시 ASS 파일")
+                # 실패한 출력은 재생 목록이 끝나지 않은 채 남지 않도록 미완성 디렉터리째 삭제
+                if build_dir and os.path.isdir(build_dir):
+                    shutil.rmtree(build_dir, ignore_errors=True)
+                    print(f"미완성 HLS 출력 삭제: {build_dir}")
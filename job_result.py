@@ -0,0 +1,218 @@
+# job_result.py
+# 작업 결과 구조체와 단계별 시간 측정, 배치 결과 내보내기(JSON lines / Prometheus textfile)
+# JobResult는 (status, message) 튜플을 상속하므로 기존 코드처럼 `status, message = result`,
+# result[0] 으로 그대로 쓸 수 있고, 추가 정보는 속성으로 읽습니다.
+
+import contextlib
+import json
+import os
+import time
+
+from probe_cache import probe_media
+
+# 오류 분류 (error_category)
+ERROR_INPUT = 'input'            # 해상도/메타데이터를 읽지 못함, 자막 없음 등 입력 문제
+ERROR_SUBTITLE = 'subtitle'      # 자막 검사/ASS 생성 실패
+ERROR_SCRATCH = 'scratch'        # 임시 공간 부족
+ERROR_UPSCALE = 'upscale'        # 2단계 모드의 업스케일링 실패
+ERROR_ENCODE = 'encode'          # 최종 인코딩 실패
+ERROR_UNEXPECTED = 'unexpected'  # 예기치 않은 예외
+
+# 처리 단계 이름 (stage_seconds의 키)
+STAGES = ('probe', 'upscale', 'ass', 'encode', 'mux', 'finalize', 'cleanup')
+
+
+class JobResult(tuple):
+    """
+    (status, message) 튜플 + 상세 정보 속성
+    - video, output: 입력/출력 경로 (다중 출력 모드의 output은 경로 목록, HLS는 master 재생 목록)
+    - encoder: 사용한 인코더, attempted_encoders: 실패 후 다시 시도하기 전에 사용한 인코더 목록
+    - stage_seconds: {단계 이름: 초}
+    - input_bytes, output_bytes, width, height: 입력/출력 크기와 최종 해상도
+    - fps: 업스케일링 + 인코딩 단계 기준 처리 속도 (프레임/초)
+    - error_category: 실패 시 오류 분류 (ERROR_*), cached: 출력 캐시로 재인코딩을 건너뛴 경우 True
+    """
+
+    FIELDS = ('video', 'output', 'encoder', 'attempted_encoders', 'stage_seconds', 'input_bytes', 'output_bytes',
+              'width', 'height', 'fps', 'error_category', 'cached')
+
+    def __new__(cls, status, message, **details):
+        return super().__new__(cls, (status, message))
+
+    def __init__(self, status, message, **details):
+        unknown = set(details) - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"알 수 없는 JobResult 항목: {', '.join(sorted(unknown))}")
+        for name in self.FIELDS:
+            setattr(self, name, details.get(name))
+        if self.stage_seconds is None:
+            self.stage_seconds = {}
+        if self.attempted_encoders is None:
+            self.attempted_encoders = []
+        self.cached = bool(self.cached)
+
+    @property
+    def status(self):
+        return self[0]
+
+    @property
+    def message(self):
+        return self[1]
+
+    @classmethod
+    def from_tuple(cls, result, **details):
+        """기존 (status, message) 튜플을 JobResult로 변환 (이미 JobResult면 그대로)"""
+        if isinstance(result, JobResult):
+            return result
+        return cls(result[0], result[1], **details)
+
+    def to_dict(self):
+        record = {'status': self.status, 'message': self.message}
+        record.update((name, getattr(self, name)) for name in self.FIELDS)
+        record['stage_seconds'] = {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()}
+        return record
+
+
+class JobTimer:
+    """
+    프로세서 안에서 단계별 시간과 결과 정보를 모으는 도우미
+    result()로 만든 JobResult는 이 타이머의 stage_seconds를 공유하므로,
+    반환 후 finally 블록의 'cleanup' 단계 시간도 결과에 포함됩니다.
+    """
+
+    def __init__(self, video):
+        self.video = video
+        self.stage_seconds = {}
+        self.encoder = None
+        self.output = None
+        self.width = None
+        self.height = None
+        self.frames = None  # 인코딩한 프레임 수 추정치 (None이면 결과를 만들 때 probe 캐시의 길이 × 프레임 레이트)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def result(self, status, message, error_category=None):
+        encode_seconds = self.stage_seconds.get('upscale', 0.0) + self.stage_seconds.get('encode', 0.0)
+        fps = None
+        if status == 'Success' and self.frames is None:
+            try:
+                info = probe_media(self.video)
+                self.frames = info.duration * info.frame_rate
+            except Exception:
+                self.frames = 0
+        if status == 'Success' and self.frames and encode_seconds > 0:
+            fps = round(self.frames / encode_seconds, 2)
+        return JobResult(
+            status, message,
+            video=self.video,
+            output=self.output if status == 'Success' else None,
+            encoder=self.encoder,
+            stage_seconds=self.stage_seconds,
+            input_bytes=_file_size(self.video),
+            output_bytes=output_size(self.output) if status == 'Success' else None,
+            width=self.width,
+            height=self.height,
+            fps=fps,
+            error_category=error_category,
+        )
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path) if path else None
+    except OSError:
+        return None
+
+
+def output_size(output):
+    """
+    출력 크기 (바이트). 다중 출력 모드처럼 경로 목록이면 합계,
+    HLS 재생 목록(.m3u8)이면 세그먼트를 포함한 재생 목록 디렉터리 전체 크기
+    """
+    if isinstance(output, (list, tuple)):
+        sizes = [output_size(path) for path in output]
+        return None if None in sizes else sum(sizes)
+    if output and output.endswith('.m3u8'):
+        total = 0
+        for root, _, files in os.walk(os.path.dirname(output)):
+            total += sum(_file_size(os.path.join(root, name)) or 0 for name in files)
+        return total if os.path.exists(output) else None
+    return _file_size(output)
+
+
+def write_jsonl(results, stream):
+    """결과마다 JSON 한 줄씩 기록"""
+    for result in results:
+        stream.write(json.dumps(JobResult.from_tuple(result).to_dict(), ensure_ascii=False) + "\n")
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(results, prefix='dualsub'):
+    """
+    배치 결과를 Prometheus 텍스트 형식(node_exporter textfile collector용)으로 변환
+    단계별 시간은 합계/개수, 상태·오류 분류·인코더별 작업 수, 입출력 바이트 합계를 기록합니다.
+    """
+    results = [JobResult.from_tuple(result) for result in results]
+    by_status, by_category, by_encoder = {}, {}, {}
+    stage_sum, stage_count = {}, {}
+    input_bytes = output_bytes = frames_seconds = 0
+    frames = 0.0
+    for result in results:
+        by_status[result.status] = by_status.get(result.status, 0) + 1
+        if result.error_category:
+            by_category[result.error_category] = by_category.get(result.error_category, 0) + 1
+        if result.encoder and not result.cached:
+            by_encoder[result.encoder] = by_encoder.get(result.encoder, 0) + 1
+        for stage, seconds in result.stage_seconds.items():
+            stage_sum[stage] = stage_sum.get(stage, 0.0) + seconds
+            stage_count[stage] = stage_count.get(stage, 0) + 1
+        input_bytes += result.input_bytes or 0
+        output_bytes += result.output_bytes or 0
+        if result.fps:
+            seconds = result.stage_seconds.get('upscale', 0.0) + result.stage_seconds.get('encode', 0.0)
+            frames += result.fps * seconds
+            frames_seconds += seconds
+
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+    metric('jobs', 'gauge', "Jobs in the last batch by status.",
+           [({'status': status}, count) for status, count in sorted(by_status.items())])
+    metric('job_errors', 'gauge', "Failed jobs in the last batch by error category.",
+           [({'category': category}, count) for category, count in sorted(by_category.items())])
+    metric('jobs_by_encoder', 'gauge', "Encoded jobs in the last batch by encoder.",
+           [({'encoder': encoder}, count) for encoder, count in sorted(by_encoder.items())])
+    metric('stage_seconds_sum', 'gauge', "Total seconds spent per processing stage in the last batch.",
+           [({'stage': stage}, round(stage_sum[stage], 3)) for stage in sorted(stage_sum)])
+    metric('stage_seconds_count', 'gauge', "Jobs that ran each processing stage in the last batch.",
+           [({'stage': stage}, stage_count[stage]) for stage in sorted(stage_count)])
+    metric('input_bytes', 'gauge', "Total input video bytes in the last batch.", [({}, input_bytes)])
+    metric('output_bytes', 'gauge', "Total output video bytes in the last batch.", [({}, output_bytes)])
+    metric('encode_fps', 'gauge', "Frames per second over upscale and encode stages in the last batch.",
+           [({}, round(frames / frames_seconds, 2) if frames_seconds else 0)])
+    metric('batch_completion_timestamp_seconds', 'gauge', "Unix time the last batch finished.",
+           [({}, int(time.time()))])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(results, path, prefix='dualsub'):
+    """Prometheus textfile 기록 (수집기가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(format_prometheus(results, prefix))
+    os.replace(tmp_path, path)
@@ -0,0 +1,186 @@
+# multi_output.py
+# 세 가지 레이아웃(패딩 없음 / 상하단 패딩 / 하단 이중 패딩)을 FFmpeg 한 번으로 모두 출력하는 처리기
+# - filter_complex: 원본을 한 번 디코딩(+스케일)한 뒤 split으로 나눠 각 프로세서 모듈의 패딩/ASS 필터 체인을 적용
+# - 출력마다 -map으로 필터 결과와 원본 오디오를 지정해 하나의 프로세스에서 세 파일을 인코딩
+# 디코딩/스케일/입력 읽기가 한 번으로 줄어듭니다. 항상 단일 패스이며 분할 인코딩(chunk_workers)은 사용하지 않습니다.
+
+import os
+
+from encoding_profiles import DEFAULT_PROFILE, hw_input_args, finalize_filter
+from ffmpeg_runner import run_ffmpeg_process, progress_args, ffmpeg_binary, ffmpeg_threads
+from job_result import JobTimer, ERROR_INPUT, ERROR_SUBTITLE, ERROR_SCRATCH, ERROR_ENCODE, ERROR_UNEXPECTED
+from scratch import get_scratch_space, remove_scratch_file, estimate_ass_size, ScratchSpaceError
+from utils import build_upscale_filter, get_partial_output_path
+from video_processor import VideoProcessor
+from video_processor_with_padding import VideoProcessor as VideoProcessorWithPadding
+from video_processor_with_bottom_double_padding import VideoProcessor as VideoProcessorWithBottomDoublePadding
+
+# (ASS 임시 파일 이름에 붙일 레이아웃 이름, 프로세서 클래스) - 출력 순서
+LAYOUTS = (
+    ('none', VideoProcessor),
+    ('top_bottom', VideoProcessorWithPadding),
+    ('bottom_double', VideoProcessorWithBottomDoublePadding),
+)
+
+
+def build_filter_complex(scale_filter, layout_filters, encoder):
+    """
+    [0:v] → (스케일) → split → 레이아웃별 필터 체인 → [out0], [out1], ... 형태의 filter_complex 문자열
+    layout_filters: 레이아웃별 패딩/ASS 필터 문자열 (출력 순서)
+    """
+    count = len(layout_filters)
+    branches = ''.join(f"[v{i}]" for i in range(count))
+    head = f"{scale_filter}," if scale_filter else ""
+    chains = [f"[0:v]{head}split={count}{branches}"]
+    for i, layout_filter in enumerate(layout_filters):
+        chains.append(f"[v{i}]{finalize_filter(layout_filter, encoder)}[out{i}]")
+    return ';'.join(chains)
+
+
+class MultiOutputProcessor:
+    """
+    VideoProcessorManager가 padding_mode='all'일 때 사용하는 처리기
+    (process_single_video / get_output_path / get_encoder 등 프로세서와 같은 인터페이스)
+    """
+
+    def __init__(self, use_upscaling, target_width, target_height, single_pass=True, scratch_dir=None):
+        self.use_upscaling = use_upscaling
+        self.target_width = target_width
+        self.target_height = target_height
+        # 스케일도 filter_complex 안에서 한 번만 하므로 항상 단일 패스 (지문 호환을 위해 값은 보관)
+        self.single_pass = single_pass
+        self.scratch_dir = scratch_dir
+        self.layouts = [(name, processor_class(use_upscaling, target_width, target_height, True, scratch_dir))
+                        for name, processor_class in LAYOUTS]
+        # 프로세서와 같은 속성 (매니페스트/스케줄러/CLI/GUI가 설정, 처리할 때 레이아웃 프로세서에 전달)
+        self.threads = None
+        self.progress_callback = None
+        self.chunk_workers = 1
+        self.encoding_profile = DEFAULT_PROFILE
+        self.target_bitrate = None
+        self.design_space_layout = False
+
+    def _sync_layouts(self):
+        for _, layout in self.layouts:
+            layout.threads = self.threads
+            layout.encoding_profile = self.encoding_profile
+            layout.target_bitrate = self.target_bitrate
+            layout.design_space_layout = self.design_space_layout
+
+    def get_encoder(self):
+        return self.layouts[0][1].get_encoder()
+
+    def encoding_args(self, encoder, source):
+        return self.layouts[0][1].encoding_args(encoder, source)
+
+    def get_output_paths(self, input_path):
+        return [layout.get_output_path(input_path) for _, layout in self.layouts]
+
+    def get_output_path(self, input_path):
+        # 대표 출력 (패딩 없는 레이아웃). 전체 목록은 get_output_paths
+        return self.get_output_paths(input_path)[0]
+
+    def get_video_resolution(self, input_path):
+        return self.layouts[0][1].get_video_resolution(input_path)
+
+    def hw_sessions_needed(self, input_path):
+        """FFmpeg 하나가 레이아웃마다 인코더를 하나씩 열므로 레이아웃 수만큼 (분할 인코딩은 사용하지 않음)"""
+        return len(self.layouts)
+
+    def get_video_duration(self, input_path):
+        return self.layouts[0][1].get_video_duration(input_path)
+
+    def process_single_video(self, input_path, korean_srt_path, english_srt_path):
+        video_name = os.path.basename(input_path)
+        video_name_no_ext = os.path.splitext(video_name)[0]
+        temp_ass_paths = []
+        partial_output_paths = []
+        job = JobTimer(input_path)
+        self._sync_layouts()
+
+        try:
+            output_paths = self.get_output_paths(input_path)
+            job.output = output_paths
+
+            if not korean_srt_path and not english_srt_path:
+                warning_msg = f"{video_name}: 최소 하나의 SRT 자막 파일이 선택되지 않았습니다. 스킵합니다."
+                return job.result("Warning", warning_msg)
+
+            with job.stage('probe'):
+                original_width, original_height = self.get_video_resolution(input_path)
+            if not original_width or not original_height:
+                error_msg = f"{video_name}: 원본 비디오 해상도 가져오기 실패"
+                return job.result("Error", error_msg, ERROR_INPUT)
+
+            encoder = self.get_encoder()
+            job.encoder = encoder
+            if self.chunk_workers > 1:
+                print("다중 출력 모드는 분할 인코딩을 지원하지 않아 한 번에 인코딩합니다.")
+
+            final_video_width, final_video_height = original_width, original_height
+            scale_filter = ""
+            if self.use_upscaling and (original_width != self.target_width or original_height != self.target_height):
+                print(f"원본 해상도 ({original_width}x{original_height})를 목표 해상도 ({self.target_width}x{self.target_height})로 한 번 스케일링한 뒤 세 출력에 나눠 씁니다.")
+                scale_filter = build_upscale_filter(self.target_width, self.target_height)
+                final_video_width, final_video_height = self.target_width, self.target_height
+
+            # 레이아웃마다 ASS 생성 (패딩 크기에 따라 자막 위치가 다름)
+            scratch = get_scratch_space(self.scratch_dir)
+            layout_filters = []
+            with job.stage('ass'):
+                for name, layout in self.layouts:
+                    temp_ass_path = scratch.small_path(f"{video_name_no_ext}_{name}", "_temp.ass",
+                                                       estimate_ass_size(korean_srt_path, english_srt_path))
+                    temp_ass_paths.append(temp_ass_path)
+                    subtitle_filter, _ = layout.build_subtitle_filter(
+                        english_srt_path, korean_srt_path, temp_ass_path, final_video_width, final_video_height)
+                    if subtitle_filter is None:
+                        error_msg = f"{video_name}: ASS 파일 병합 실패 ({name})."
+                        return job.result("Error", error_msg, ERROR_SUBTITLE)
+                    layout_filters.append(subtitle_filter)
+
+            threads = ffmpeg_threads(self.threads)
+            rate_control = self.encoding_args(encoder, input_path)
+            command = [ffmpeg_binary(), *hw_input_args(encoder), '-i', input_path,
+                       '-filter_complex', build_filter_complex(scale_filter, layout_filters, encoder),
+                       *progress_args(), '-y']
+            # 출력마다 필터 결과 하나 + 원본 오디오 (미완성 이름으로 쓴 뒤 모두 성공하면 최종 이름으로 교체)
+            for i, output_path in enumerate(output_paths):
+                partial_output_path = get_partial_output_path(output_path)
+                partial_output_paths.append(partial_output_path)
+                if os.path.exists(partial_output_path):
+                    os.remove(partial_output_path)
+                command.extend(['-map', f"[out{i}]", '-map', '0:a?', *rate_control, '-c:a', 'copy',
+                                '-threads', str(threads), partial_output_path])
+
+            print(f"실행할 FFmpeg 다중 출력 명령어: {' '.join(command)}")
+            with job.stage('encode'):
+                returncode, stderr_tail = run_ffmpeg_process(
+                    command, self.get_video_duration(input_path),
+                    source=input_path, stage='encode', on_progress=self.progress_callback
+                )
+            if returncode != 0 or not all(os.path.exists(path) and os.path.getsize(path) > 0
+                                          for path in partial_output_paths):
+                error_msg = f"{video_name}: FFmpeg 다중 출력 처리 실패 (인코더: {encoder}).\n{stderr_tail}"
+                return job.result("Error", error_msg, ERROR_ENCODE)
+
+            with job.stage('finalize'):
+                for partial_output_path, output_path in zip(partial_output_paths, output_paths):
+                    os.replace(partial_output_path, output_path)
+            job.width, job.height = final_video_width, final_video_height
+            success_msg = (f"{video_name}: 세 가지 레이아웃을 한 번에 처리했습니다. 인코더: {encoder}"
+                           f" 최종 해상도: {final_video_width}:{final_video_height}"
+                           f" 출력: {', '.join(os.path.basename(path) for path in output_paths)}")
+            return job.result("Success", success_msg)
+
+        except ScratchSpaceError as e:
+            return job.result("Error", f"{video_name}: {e}", ERROR_SCRATCH)
+        except Exception as e:
+            error_msg = f"{video_name}: 예기치 않은 오류 발생 - {e}"
+            return job.result("Error", error_msg, ERROR_UNEXPECTED)
+        finally:
+            with job.stage('cleanup'):
+                for temp_ass_path in temp_ass_paths:
+                    remove_scratch_file(temp_ass_path, "임시 ASS 파일")
+                for partial_output_path in partial_output_paths:
+                    remove_scratch_file(partial_output_path, "미완성 출력 파일")
@@ -0,0 +1,164 @@
+# output_cache.py
+# 입력 지문(fingerprint) 기반 출력 캐시: 배치를 다시 실행했을 때 입력과 설정이 같고
+# 기존 출력 파일이 그대로 남아 있으면 재인코딩 없이 바로 완료 처리합니다.
+# 지문 = 영상 샘플 청크 해시 + 실제로 사용하는 자막 cue 전체 해시 + 패딩 모드/해상도/인코더/화질 설정
+# 기록은 캐시 디렉터리의 SQLite 파일에 출력 경로별로 (지문, 출력 크기, 출력 수정 시각)으로 저장됩니다.
+# HLS 출력은 master 재생 목록이 가리키는 재생 목록/세그먼트 전체의 크기 합과 가장 늦은 수정 시각을 사용합니다.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from encoding_profiles import DEFAULT_PROFILE, rate_control_signature
+from hls_output import MASTER_PLAYLIST_NAME, hls_output_files
+from srt_cues import iter_cues
+from utils import get_cache_dir
+
+CACHE_FILE_NAME = "output_manifest.sqlite3"
+
+# 출력 결과에 영향을 주는 코드(레이아웃 계산, 필터 체인 등)가 바뀌면 올려서 기존 기록을 무효화
+OUTPUT_CACHE_VERSION = 2
+
+# 영상 지문 계산 시 읽을 청크 수와 크기 (파일 전체를 읽지 않음)
+VIDEO_SAMPLE_CHUNKS = 16
+VIDEO_SAMPLE_CHUNK_SIZE = 64 * 1024
+
+def fingerprint_video(path):
+    """파일 크기 + 처음/끝을 포함한 균등 간격 청크들의 blake2b 해시"""
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(size).encode())
+    with open(path, 'rb') as f:
+        if size <= VIDEO_SAMPLE_CHUNKS * VIDEO_SAMPLE_CHUNK_SIZE:
+            digest.update(f.read())
+        else:
+            step = (size - VIDEO_SAMPLE_CHUNK_SIZE) // (VIDEO_SAMPLE_CHUNKS - 1)
+            for i in range(VIDEO_SAMPLE_CHUNKS):
+                f.seek(i * step)
+                digest.update(f.read(VIDEO_SAMPLE_CHUNK_SIZE))
+    return digest.hexdigest()
+
+
+def fingerprint_subtitles(srt_path):
+    """
+    ASS 생성에 실제로 쓰이는 cue(겹침 수정 결과 포함) 전체의 해시
+    원본 파일이 같아도 겹침 처리 정책이 다르면 다른 지문이 됩니다.
+    """
+    if not srt_path:
+        return None
+    digest = hashlib.blake2b(digest_size=20)
+    for cue in iter_cues(srt_path):
+        digest.update(f"{cue.start_ms},{cue.end_ms},{cue.slot},{cue.text}\x00".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def processor_settings(processor):
+    """출력에 영향을 주는 프로세서 설정"""
+    if hasattr(processor, 'output_settings'):
+        # 재인코딩하지 않는 처리기(소프트 자막 mux)는 자체 설정만 사용
+        return {'layout': type(processor).__module__, **processor.output_settings()}
+    encoder = processor.get_encoder()
+    settings = {
+        'layout': type(processor).__module__,
+        'use_upscaling': bool(processor.use_upscaling),
+        'target': [processor.target_width, processor.target_height] if processor.use_upscaling else None,
+        'single_pass': bool(getattr(processor, 'single_pass', True)),
+        'encoder': encoder,
+        'rate_control': rate_control_signature(getattr(processor, 'encoding_profile', DEFAULT_PROFILE), encoder,
+                                               getattr(processor, 'target_bitrate', None)),
+    }
+    # 기본 레이아웃의 기존 지문은 그대로 유효하도록 해상도 독립 레이아웃일 때만 추가
+    if getattr(processor, 'design_space_layout', False):
+        settings['layout_space'] = 'design'
+    return settings
+
+
+def job_fingerprint(processor, video_path, korean_srt_path, english_srt_path):
+    payload = {
+        'version': OUTPUT_CACHE_VERSION,
+        'video': fingerprint_video(video_path),
+        'korean': fingerprint_subtitles(korean_srt_path),
+        'english': fingerprint_subtitles(english_srt_path),
+        'settings': processor_settings(processor),
+    }
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+
+def output_signature(output_path):
+    """
+    출력의 (크기, 수정 시각). HLS 출력(master.m3u8)이면 이루는 파일 전체의 크기 합과 가장 늦은 수정 시각이라
+    세그먼트가 빠지거나 잘리면 달라집니다. 파일이 없으면 OSError, 끝나지 않은 HLS 재생 목록이면 ValueError
+    """
+    if os.path.basename(output_path) == MASTER_PLAYLIST_NAME:
+        paths = hls_output_files(output_path)
+    else:
+        paths = [output_path]
+    stats = [os.stat(path) for path in paths]
+    return sum(stat.st_size for stat in stats), max(stat.st_mtime_ns for stat in stats)
+
+
+class OutputCache:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self._lock = threading.Lock()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS outputs ("
+                    " output_path TEXT PRIMARY KEY, fingerprint TEXT, size INTEGER, mtime_ns INTEGER)"
+                )
+        except sqlite3.Error as e:
+            print(f"출력 캐시 초기화 실패 (캐시 없이 진행): {e}")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def is_valid(self, output_path, fingerprint):
+        """기록된 지문이 같고 출력 파일(HLS면 모든 재생 목록/세그먼트)이 기록 이후 바뀌지 않았으면 True"""
+        try:
+            size, mtime_ns = output_signature(output_path)
+        except (OSError, ValueError):
+            return False
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT fingerprint, size, mtime_ns FROM outputs WHERE output_path = ?",
+                    (os.path.abspath(output_path),)
+                ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None and row == (fingerprint, size, mtime_ns)
+
+    def record(self, output_path, fingerprint):
+        """성공한 출력 파일의 지문 기록"""
+        try:
+            size, mtime_ns = output_signature(output_path)
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO outputs (output_path, fingerprint, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (os.path.abspath(output_path), fingerprint, size, mtime_ns)
+                )
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"출력 캐시 기록 실패: {e}")
+
+    def forget(self, output_path):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM outputs WHERE output_path = ?", (os.path.abspath(output_path),))
+        except sqlite3.Error as e:
+            print(f"출력 캐시 삭제 실패: {e}")
+
+
+_output_cache = None
+_output_cache_lock = threading.Lock()
+
+
+def get_output_cache():
+    """프로세스 전역 OutputCache (처음 호출 시 생성)"""
+    global _output_cache
+    with _output_cache_lock:
+        if _output_cache is None:
+            _output_cache = OutputCache()
+        return _output_cache
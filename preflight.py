@@ -0,0 +1,101 @@
+# preflight.py
+# 배치 시작 전 사전 점검을 asyncio로 한꺼번에 실행하는 오케스트레이터
+# - 영상 ffprobe: probe 캐시에 없는 파일만 asyncio 서브프로세스로 동시에 실행하고 결과를 캐시에 저장
+# - 자막: (선택) 겹침 수정 → 형식/겹침 검사를 파일마다 스레드에서 실행 (같은 자막 파일은 한 번만)
+#   겹침 수정 없이 검사만 하는 파일은 내용 해시 기준으로 결과를 캐시해 다시 검사하지 않음 (subtitle_check_cache)
+# 동시 실행 수는 세마포어 하나로 제한합니다. GUI/CLI처럼 이벤트 루프가 없는 코드는 preflight()를 사용합니다.
+
+import asyncio
+import os
+from collections import namedtuple
+
+from probe_cache import get_probe_cache, ProbeError
+from srt_overlap_error import fix_srt_overlaps_in_memory, DEFAULT_OVERLAP_POLICY
+from subtitle_check_cache import check_srt_cached
+
+# ffprobe / 자막 작업 동시 실행 수 기본값 (대부분 I/O·서브프로세스 대기이므로 코어 수보다 크게)
+DEFAULT_CONCURRENCY = min(32, (os.cpu_count() or 4) * 4)
+
+# 모든 dict는 배치 순서(영상 순서, 작업마다 한글 → 영어 자막)를 따름
+PreflightReport = namedtuple('PreflightReport', [
+    'media',            # {영상 경로: MediaInfo}
+    'probe_errors',     # {영상 경로: 오류 메시지}
+    'fix_reports',      # {자막 경로: OverlapReport} (겹침 수정을 요청한 경우)
+    'fix_errors',       # {자막 경로: 예외} (SevereOverlapError / IOError 등, 이 파일은 검사하지 않음)
+    'subtitle_errors',  # {자막 경로: 오류 메시지 목록} (오류가 있는 파일만)
+])
+
+
+def _unique(paths):
+    return list(dict.fromkeys(path for path in paths if path))
+
+
+async def _probe(path, semaphore):
+    cache = get_probe_cache()
+    info = await asyncio.to_thread(cache.lookup, path)
+    if info is not None:
+        return info
+
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            cache.ffprobe_binary, '-v', 'error', *cache.PROBE_ARGS, path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ProbeError(stderr.decode('utf-8', 'replace').strip() or f"ffprobe 종료 코드 {process.returncode}")
+    return await asyncio.to_thread(cache.record_probe, path, stdout.decode('utf-8'))
+
+
+def _prepare_subtitle(srt_path, fix_overlaps, overlap_policy):
+    """자막 하나의 (수정 보고, 수정 예외, 검사 오류 목록)"""
+    report = None
+    if fix_overlaps:
+        try:
+            report = fix_srt_overlaps_in_memory(srt_path, overlap_policy)
+        except Exception as e:
+            return None, e, []
+    return report, None, check_srt_cached(srt_path)
+
+
+async def _prepare_subtitle_async(srt_path, fix_overlaps, overlap_policy, semaphore):
+    async with semaphore:
+        return await asyncio.to_thread(_prepare_subtitle, srt_path, fix_overlaps, overlap_policy)
+
+
+async def run_preflight(video_subtitle_pairs, fix_overlaps=False, overlap_policy=DEFAULT_OVERLAP_POLICY,
+                        probe_videos=True, concurrency=None):
+    """
+    [(video, korean_srt, english_srt), ...] 전체를 동시에 점검하고 PreflightReport를 반환합니다.
+    probe_videos=False이면 자막만 점검합니다.
+    """
+    semaphore = asyncio.Semaphore(concurrency or DEFAULT_CONCURRENCY)
+    videos = _unique(video for video, _, _ in video_subtitle_pairs) if probe_videos else []
+    subtitles = _unique(srt for _, kor, eng in video_subtitle_pairs for srt in (kor, eng))
+
+    # 영상 probe와 자막 점검을 함께 실행 (probe 실패는 해당 영상의 오류로만 기록)
+    probe_results, subtitle_results = await asyncio.gather(
+        asyncio.gather(*(_probe(video, semaphore) for video in videos), return_exceptions=True),
+        asyncio.gather(*(_prepare_subtitle_async(srt, fix_overlaps, overlap_policy, semaphore) for srt in subtitles)),
+    )
+
+    report = PreflightReport({}, {}, {}, {}, {})
+    for video, result in zip(videos, probe_results):
+        if isinstance(result, Exception):
+            report.probe_errors[video] = str(result) or type(result).__name__
+        else:
+            report.media[video] = result
+    for srt, (fix_report, fix_error, errors) in zip(subtitles, subtitle_results):
+        if fix_report is not None:
+            report.fix_reports[srt] = fix_report
+        if fix_error is not None:
+            report.fix_errors[srt] = fix_error
+        if errors:
+            report.subtitle_errors[srt] = errors
+    return report
+
+
+def preflight(video_subtitle_pairs, fix_overlaps=False, overlap_policy=DEFAULT_OVERLAP_POLICY,
+              probe_videos=True, concurrency=None):
+    """run_preflight의 동기 버전 (새 이벤트 루프에서 실행)"""
+    return asyncio.run(run_preflight(video_subtitle_pairs, fix_overlaps, overlap_policy, probe_videos, concurrency))
@@ -0,0 +1,245 @@
+# probe_cache.py
+# 입력 영상당 ffprobe를 한 번만 실행(-show_streams -show_format JSON)하고
+# 결과를 SQLite 파일에 (경로, 크기, 수정 시각) 기준으로 캐시하는 메타데이터 저장소
+# 같은 라이브러리를 다시 처리하면 probe 없이 캐시에서 바로 읽습니다.
+# 키프레임 위치는 파일 전체를 읽어야 하므로 필요할 때(keyframes())만 probe 후 같은 행에 저장합니다.
+
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+from collections import namedtuple
+
+from ffmpeg_runner import ffprobe_binary as default_ffprobe_binary
+from scratch import is_scratch_path
+from utils import get_cache_dir
+
+CACHE_FILE_NAME = "probe_cache.sqlite3"
+
+# 캐시 형식이 바뀌면 올려서 이전 행을 무시하도록 함
+PROBE_SCHEMA_VERSION = 1
+
+MediaInfo = namedtuple('MediaInfo', [
+    'width', 'height',
+    'duration',          # 초 (float, 알 수 없으면 0.0)
+    'frame_rate',        # fps (float, 알 수 없으면 0.0)
+    'video_codec', 'pix_fmt',
+    'audio_codec',       # 오디오 스트림이 없으면 None
+    'video_bit_rate',    # 비디오 스트림 비트레이트(bps), 없으면 None
+    'bit_rate',          # 컨테이너 전체 비트레이트(bps), 없으면 None
+])
+
+
+class ProbeError(Exception):
+    """ffprobe 실행 실패 또는 비디오 스트림 없음"""
+    pass
+
+
+def _parse_rate(rate):
+    """'30000/1001' 형식의 프레임 레이트를 float로 변환"""
+    try:
+        num, _, den = (rate or '').partition('/')
+        return float(num) / float(den or 1) if float(den or 1) else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_probe_json(data):
+    """ffprobe JSON(dict)에서 MediaInfo 추출"""
+    streams = data.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not s.get('disposition', {}).get('attached_pic')), None)
+    if video is None or not video.get('width') or not video.get('height'):
+        raise ProbeError("비디오 스트림을 찾을 수 없습니다.")
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    fmt = data.get('format', {})
+
+    return MediaInfo(
+        width=int(video['width']),
+        height=int(video['height']),
+        duration=_to_float(fmt.get('duration') or video.get('duration')),
+        frame_rate=_parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate')),
+        video_codec=video.get('codec_name'),
+        pix_fmt=video.get('pix_fmt'),
+        audio_codec=audio.get('codec_name') if audio else None,
+        video_bit_rate=_to_int(video.get('bit_rate')),
+        bit_rate=_to_int(fmt.get('bit_rate')),
+    )
+
+
+class ProbeCache:
+    def __init__(self, db_path=None, ffprobe_binary=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self.ffprobe_binary = ffprobe_binary or default_ffprobe_binary()
+        self._lock = threading.Lock()
+        self._memory = {}  # abspath → (size, mtime_ns, MediaInfo)
+        self._init_db()
+
+    def _connect(self):
+        # 여러 프로세스(GUI + CLI)가 같은 파일을 써도 잠금 대기 후 진행
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS media_info ("
+                    " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version INTEGER,"
+                    " probe_json TEXT, keyframes_json TEXT)"
+                )
+        except sqlite3.Error as e:
+            print(f"probe 캐시 초기화 실패 (캐시 없이 진행): {e}")
+
+    def _execute(self, sql, params):
+        """캐시 쓰기. 실패해도 probe 결과 사용에는 지장 없으므로 경고만 출력"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(sql, params)
+        except sqlite3.Error as e:
+            print(f"probe 캐시 저장 실패: {e}")
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_row(self, key, size, mtime_ns):
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    "SELECT probe_json, keyframes_json FROM media_info"
+                    " WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+                    (key, size, mtime_ns, PROBE_SCHEMA_VERSION)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def _run_ffprobe(self, args):
+        result = subprocess.run(
+            [self.ffprobe_binary, '-v', 'error', *args],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8'
+        )
+        if result.returncode != 0:
+            raise ProbeError(result.stderr.strip() or f"ffprobe 종료 코드 {result.returncode}")
+        return result.stdout
+
+    # 메타데이터 probe에 쓰는 ffprobe 인자 (preflight의 비동기 실행도 같은 인자를 사용)
+    PROBE_ARGS = ('-show_streams', '-show_format', '-of', 'json')
+
+    def lookup(self, path):
+        """캐시(메모리 → SQLite)에 유효한 MediaInfo가 있으면 반환, 없으면 None (ffprobe는 실행하지 않음)"""
+        key = os.path.abspath(path)
+        size, mtime_ns = self._stamp(path)
+
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached and cached[:2] == (size, mtime_ns):
+            return cached[2]
+
+        row = self._load_row(key, size, mtime_ns)
+        if not row:
+            return None
+        info = parse_probe_json(json.loads(row[0]))
+        with self._lock:
+            self._memory[key] = (size, mtime_ns, info)
+        return info
+
+    def record_probe(self, path, output):
+        """
+        ffprobe JSON 출력을 캐시에 저장하고 MediaInfo 반환
+        (스크래치 공간의 임시 파일은 곧 삭제되므로 SQLite에는 저장하지 않고 메모리에만 보관)
+        """
+        key = os.path.abspath(path)
+        size, mtime_ns = self._stamp(path)
+        data = json.loads(output)
+        info = parse_probe_json(data)
+        with self._lock:
+            self._memory[key] = (size, mtime_ns, info)
+        if is_scratch_path(path):
+            return info
+        self._execute(
+            "INSERT OR REPLACE INTO media_info (path, size, mtime_ns, version, probe_json, keyframes_json)"
+            " VALUES (?, ?, ?, ?, ?, NULL)",
+            (key, size, mtime_ns, PROBE_SCHEMA_VERSION, json.dumps(data))
+        )
+        return info
+
+    def probe(self, path):
+        """영상 메타데이터(MediaInfo) 반환. 캐시가 유효하면 ffprobe를 실행하지 않음"""
+        info = self.lookup(path)
+        if info is None:
+            info = self.record_probe(path, self._run_ffprobe([*self.PROBE_ARGS, path]))
+        return info
+
+    def keyframes(self, path):
+        """첫 비디오 스트림의 키프레임 시각(초) 목록. 처음 요청할 때만 패킷을 probe 해서 캐시"""
+        self.probe(path)  # 행이 최신 상태인지 보장
+        key = os.path.abspath(path)
+        size, mtime_ns = self._stamp(path)
+        row = self._load_row(key, size, mtime_ns)
+        if row and row[1] is not None:
+            return json.loads(row[1])
+
+        # 디코딩 없이 패킷 플래그(K)만 읽음
+        output = self._run_ffprobe([
+            '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path
+        ])
+        keyframes = []
+        for line in output.splitlines():
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                keyframes.append(float(pts_time))
+        keyframes.sort()
+
+        if is_scratch_path(path):
+            return keyframes
+        self._execute(
+            "UPDATE media_info SET keyframes_json = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (json.dumps(keyframes), key, size, mtime_ns)
+        )
+        return keyframes
+
+    def invalidate(self, path=None):
+        """특정 파일(또는 전체)의 캐시 삭제"""
+        with self._lock:
+            if path is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(os.path.abspath(path), None)
+        if path is None:
+            self._execute("DELETE FROM media_info", ())
+        else:
+            self._execute("DELETE FROM media_info WHERE path = ?", (os.path.abspath(path),))
+
+
+_probe_cache = None
+_probe_cache_lock = threading.Lock()
+
+
+def get_probe_cache():
+    """프로세스 전역 ProbeCache (처음 호출 시 생성)"""
+    global _probe_cache
+    with _probe_cache_lock:
+        if _probe_cache is None:
+            _probe_cache = ProbeCache()
+        return _probe_cache
+
+
+def probe_media(path):
+    """get_probe_cache().probe(path)의 축약형"""
+    return get_probe_cache().probe(path)
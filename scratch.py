@@ -0,0 +1,195 @@
+# scratch.py
+# 작업 중 생기는 임시 파일(병합 ASS, 2단계 모드의 업스케일 영상)을 원본 영상 옆(NAS 등)이 아닌
+# 빠른 로컬 저장소에 두기 위한 스크래치 공간 관리
+# - 작은 파일(ASS): tmpfs(/dev/shm)에 우선 배치, 공간이 부족하거나 없으면 로컬 임시 디렉터리
+# - 큰 파일(업스케일 임시 영상): DUALSUB_SCRATCH_DIR 또는 지정한 로컬 디렉터리 (기본: 시스템 임시 디렉터리)
+# - 프로세스별 하위 디렉터리를 만들고 종료 시(atexit) 삭제,
+#   비정상 종료로 남은 다른 프로세스의 디렉터리는 다음 실행 때 정리
+
+import atexit
+import os
+import platform
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from utils import make_unique_temp_path
+
+SCRATCH_DIR_PREFIX = "dualsub-scratch-"
+_SCRATCH_DIR_PATTERN = re.compile(re.escape(SCRATCH_DIR_PREFIX) + r"(\d+)$")
+
+# 프로세스 생존 여부를 확인할 수 없는 플랫폼(Windows)에서 남은 디렉터리를 정리하는 기준 시간
+STALE_SCRATCH_AGE_SECONDS = 24 * 3600
+
+# 여유 공간 검사 시 예상 크기에 더하는 안전 여유분
+FREE_SPACE_MARGIN_BYTES = 64 * 1024 * 1024
+
+# 무손실(-crf 0) 업스케일 임시 영상 크기 추정 배율 (원본 크기 × 픽셀 수 비율 × 배율)
+LOSSLESS_SIZE_FACTOR = 8
+
+
+class ScratchSpaceError(OSError):
+    """스크래치 디렉터리의 여유 공간이 부족할 때 발생"""
+    pass
+
+
+def _default_tmpfs_dir():
+    """작은 임시 파일용 tmpfs 디렉터리 (DUALSUB_TMPFS_DIR → /dev/shm → 시스템 임시 디렉터리)"""
+    configured = os.environ.get('DUALSUB_TMPFS_DIR')
+    if configured:
+        return configured
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def _default_large_dir():
+    """큰 임시 파일용 로컬 디렉터리 (DUALSUB_SCRATCH_DIR → 시스템 임시 디렉터리)"""
+    return os.environ.get('DUALSUB_SCRATCH_DIR') or tempfile.gettempdir()
+
+
+def _is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 다른 사용자의 살아 있는 프로세스
+    return True
+
+
+def sweep_stale_scratch_dirs(root):
+    """root 아래에서 이미 종료된 프로세스가 남긴 스크래치 디렉터리를 삭제"""
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return
+    is_windows = platform.system() == 'Windows'
+    for name in entries:
+        match = _SCRATCH_DIR_PATTERN.match(name)
+        if not match:
+            continue
+        pid = int(match.group(1))
+        if pid == os.getpid():
+            continue
+        path = os.path.join(root, name)
+        if is_windows:
+            # Windows에서는 os.kill(pid, 0)이 프로세스를 종료시키므로 디렉터리 나이로 판단
+            try:
+                stale = time.time() - os.path.getmtime(path) > STALE_SCRATCH_AGE_SECONDS
+            except OSError:
+                continue
+        else:
+            stale = not _is_process_alive(pid)
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
+            print(f"이전 실행에서 남은 스크래치 디렉터리 삭제: {path}")
+
+
+def is_scratch_path(path):
+    """스크래치 디렉터리(dualsub-scratch-<pid>) 안의 임시 파일 경로인지 여부"""
+    directory = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return _SCRATCH_DIR_PATTERN.match(directory) is not None
+
+
+def _free_bytes(path):
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return 0
+
+
+def estimate_upscaled_size(input_path, original_width, original_height, target_width, target_height):
+    """2단계 모드의 무손실 업스케일 임시 영상 크기 추정치(바이트)"""
+    pixel_ratio = (target_width * target_height) / max(1, original_width * original_height)
+    return int(os.path.getsize(input_path) * max(1.0, pixel_ratio) * LOSSLESS_SIZE_FACTOR)
+
+
+def estimate_ass_size(*srt_paths):
+    """병합 ASS 파일 크기 추정치(바이트): Dialogue 줄마다 태그가 붙으므로 SRT 합계의 약 2배"""
+    return 2 * sum(os.path.getsize(path) for path in srt_paths if path)
+
+
+class ScratchSpace:
+    """
+    프로세스 단위 스크래치 공간.
+    small_path()는 tmpfs에, large_path()는 로컬 디스크에 고유한 임시 파일 경로를 만들어 줍니다.
+    """
+
+    def __init__(self, large_dir=None, tmpfs_dir=None):
+        self.large_root = large_dir or _default_large_dir()
+        self.tmpfs_root = tmpfs_dir or _default_tmpfs_dir()
+        self._dirs = {}
+        self._lock = threading.Lock()
+        atexit.register(self.cleanup)
+
+    def _process_dir(self, root):
+        """root 아래의 이 프로세스 전용 디렉터리 (처음 사용할 때 생성 + 오래된 디렉터리 정리)"""
+        with self._lock:
+            path = self._dirs.get(root)
+            if path is None:
+                os.makedirs(root, exist_ok=True)
+                sweep_stale_scratch_dirs(root)
+                path = os.path.join(root, f"{SCRATCH_DIR_PREFIX}{os.getpid()}")
+                os.makedirs(path, exist_ok=True)
+                self._dirs[root] = path
+            return path
+
+    def small_path(self, stem, suffix, expected_bytes=0):
+        """ASS 등 작은 임시 파일 경로 (tmpfs 공간이 부족하면 로컬 디스크로 대체)"""
+        root = self.tmpfs_root
+        if _free_bytes(root) < expected_bytes + FREE_SPACE_MARGIN_BYTES:
+            root = self.large_root
+        return make_unique_temp_path(self._process_dir(root), stem, suffix)
+
+    def large_path(self, stem, suffix, expected_bytes=0):
+        """업스케일 임시 영상 등 큰 임시 파일 경로. 여유 공간이 부족하면 ScratchSpaceError"""
+        directory = self._process_dir(self.large_root)
+        required = expected_bytes + FREE_SPACE_MARGIN_BYTES
+        free = _free_bytes(directory)
+        if free < required:
+            raise ScratchSpaceError(
+                f"스크래치 디렉터리 여유 공간 부족: {directory} "
+                f"(필요 약 {required // (1024 * 1024)}MB, 남은 공간 {free // (1024 * 1024)}MB). "
+                f"DUALSUB_SCRATCH_DIR로 다른 로컬 디스크를 지정하세요."
+            )
+        return make_unique_temp_path(directory, stem, suffix)
+
+    def sweep_stale(self):
+        """종료된 다른 프로세스가 남긴 스크래치 디렉터리 정리 (배치를 이어서 처리할 때 호출)"""
+        for root in {self.tmpfs_root, self.large_root}:
+            sweep_stale_scratch_dirs(root)
+
+    def cleanup(self):
+        """이 프로세스의 스크래치 디렉터리를 모두 삭제 (종료 시 자동 호출)"""
+        with self._lock:
+            dirs, self._dirs = list(self._dirs.values()), {}
+        for path in dirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def remove_scratch_file(path, label):
+    """임시 파일이 남아 있으면 삭제 (실패해도 작업 결과에는 영향 없음)"""
+    if not path or not os.path.exists(path):
+        return
+    try:
+        os.remove(path)
+        print(f"{label} 삭제: {path}")
+    except Exception as e:
+        print(f"{label} 삭제 실패 {path}: {e}")
+
+
+_spaces = {}
+_spaces_lock = threading.Lock()
+
+
+def get_scratch_space(large_dir=None):
+    """large_dir별로 공유되는 프로세스 전역 ScratchSpace"""
+    with _spaces_lock:
+        space = _spaces.get(large_dir)
+        if space is None:
+            space = ScratchSpace(large_dir)
+            _spaces[large_dir] = space
+        return space
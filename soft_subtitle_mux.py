@@ -0,0 +1,173 @@
+# soft_subtitle_mux.py
+# 소프트 자막 출력 모드: 자막을 영상에 입히지(재인코딩) 않고 자막 스트림으로 넣어 비디오/오디오는 스트림 복사
+# - mkv: 언어별 ASS 트랙 2개 (한국어 기본 트랙) 또는 generate_merged_ass의 한/영 합친 ASS 트랙 1개
+# - mp4: 언어별 mov_text 트랙 2개 (mov_text는 위치/크기 태그를 지원하지 않아 텍스트만 유지)
+# ASS는 원본 해상도 그대로의 영상에 표시되므로 항상 Full HD 기준 좌표계(PlayRes)로 작성합니다 (utils.layout_space).
+# 패딩 영역은 재인코딩 없이 만들 수 없으므로 자막 배치는 패딩 없는 레이아웃(video_processor)을 사용합니다.
+
+import os
+from collections import namedtuple
+
+from ffmpeg_runner import run_ffmpeg_process, progress_args, ffmpeg_binary
+from job_result import JobTimer, ERROR_INPUT, ERROR_SUBTITLE, ERROR_SCRATCH, ERROR_ENCODE, ERROR_UNEXPECTED
+from scratch import get_scratch_space, remove_scratch_file, estimate_ass_size, ScratchSpaceError
+from utils import get_partial_output_path, layout_space
+
+# 스트림 복사 작업의 '인코더' 이름 (스케줄러의 하드웨어 세션 제한 대상이 아님)
+STREAM_COPY = 'copy'
+
+SoftSubtitleMode = namedtuple('SoftSubtitleMode', ['name', 'container', 'merged', 'label'])
+
+SOFT_SUBTITLE_MODES = (
+    SoftSubtitleMode('mkv', 'mkv', False, "소프트 자막 MKV (언어별 트랙)"),
+    SoftSubtitleMode('mkv-merged', 'mkv', True, "소프트 자막 MKV (한/영 합친 ASS 트랙)"),
+    SoftSubtitleMode('mp4', 'mp4', False, "소프트 자막 MP4 (언어별 mov_text 트랙)"),
+)
+SOFT_SUBTITLE_MODE_NAMES = tuple(mode.name for mode in SOFT_SUBTITLE_MODES)
+
+# 자막 스트림 코덱 (컨테이너별)
+_SUBTITLE_CODECS = {'mkv': 'ass', 'mp4': 'mov_text'}
+
+# (ISO 639-2 언어 코드, 트랙 제목)
+_KOREAN = ('kor', "한국어")
+_ENGLISH = ('eng', "English")
+_MERGED = ('mul', "한국어 + English")
+
+
+def get_soft_subtitle_mode(name):
+    for mode in SOFT_SUBTITLE_MODES:
+        if mode.name == name:
+            return mode
+    raise ValueError(f"알 수 없는 소프트 자막 모드: {name} (사용 가능: {', '.join(SOFT_SUBTITLE_MODE_NAMES)})")
+
+
+def build_mux_command(input_path, output_path, subtitle_tracks, container):
+    """
+    subtitle_tracks: [(자막 파일 경로, 언어 코드, 제목), ...] (첫 번째 트랙이 기본 트랙)
+    비디오/오디오는 스트림 복사, 원본에 있던 자막 스트림은 넣지 않음
+    """
+    command = [ffmpeg_binary(), '-i', input_path]
+    for path, _, _ in subtitle_tracks:
+        command.extend(['-i', path])
+    command.extend(['-map', '0:v', '-map', '0:a?'])
+    for i in range(len(subtitle_tracks)):
+        command.extend(['-map', f"{i + 1}:0"])
+    command.extend(['-c:v', 'copy', '-c:a', 'copy', '-c:s', _SUBTITLE_CODECS[container]])
+    for i, (_, language, title) in enumerate(subtitle_tracks):
+        command.extend([
+            f"-metadata:s:s:{i}", f"language={language}",
+            f"-metadata:s:s:{i}", f"title={title}",
+            f"-disposition:s:{i}", 'default' if i == 0 else '0',
+        ])
+        if container == 'mp4':
+            # mp4는 트랙 제목을 handler 이름으로 표시하는 플레이어가 많음
+            command.extend([f"-metadata:s:s:{i}", f"handler_name={title}"])
+    if container == 'mp4':
+        command.extend(['-movflags', '+faststart'])
+    command.extend([*progress_args(), '-y', output_path])
+    return command
+
+
+class SoftSubtitleMuxer:
+    """
+    VideoProcessorManager가 프로세서 대신 사용하는 소프트 자막 처리기
+    (process_single_video / get_output_path / get_encoder 등 프로세서와 같은 인터페이스)
+    """
+
+    def __init__(self, mode='mkv', scratch_dir=None):
+        # 자막 배치/ASS 생성은 패딩 없는 프로세서의 것을 그대로 사용 (모드 목록만 필요한 CLI 시작 시에는 import 안 함)
+        from video_processor import VideoProcessor as SubtitleLayout
+        self.mode = get_soft_subtitle_mode(mode)
+        self.scratch_dir = scratch_dir
+        self.layout = SubtitleLayout(False, 0, 0, scratch_dir=scratch_dir)
+        # 프로세서와 같은 속성 (스케줄러/CLI/GUI가 설정). 스트림 복사이므로 threads는 사용하지 않음
+        self.threads = None
+        self.progress_callback = None
+        self.use_upscaling = False
+        self.target_width = 0
+        self.target_height = 0
+
+    def get_encoder(self):
+        return STREAM_COPY
+
+    def output_settings(self):
+        """출력 캐시 지문에 넣을 설정 (인코더/화질 설정과 무관)"""
+        return {'soft_subtitles': self.mode.name}
+
+    def get_output_path(self, input_path):
+        base, _ = os.path.splitext(input_path)
+        return f"{base}_softsub.{self.mode.container}"
+
+    def process_single_video(self, input_path, korean_srt_path, english_srt_path):
+        video_name = os.path.basename(input_path)
+        video_name_no_ext = os.path.splitext(video_name)[0]
+        temp_ass_paths = []
+        partial_output_path = ""
+        job = JobTimer(input_path)
+        job.encoder = STREAM_COPY
+
+        try:
+            output_path = self.get_output_path(input_path)
+            job.output = output_path
+
+            if not korean_srt_path and not english_srt_path:
+                warning_msg = f"{video_name}: 최소 하나의 SRT 자막 파일이 선택되지 않았습니다. 스킵합니다."
+                return job.result("Warning", warning_msg)
+
+            with job.stage('probe'):
+                width, height = self.layout.get_video_resolution(input_path)
+            if not width or not height:
+                error_msg = f"{video_name}: 원본 비디오 해상도 가져오기 실패"
+                return job.result("Error", error_msg, ERROR_INPUT)
+            ass_width, ass_height, _ = layout_space(width, height, (0, 0), True)
+
+            # 트랙별 (영어 SRT, 한글 SRT, 언어 정보). 합친 트랙은 한 ASS에 두 언어를 모두 씀
+            if self.mode.merged:
+                track_sources = [(english_srt_path, korean_srt_path, _MERGED)]
+            else:
+                track_sources = [(None, korean_srt_path, _KOREAN), (english_srt_path, None, _ENGLISH)]
+                track_sources = [source for source in track_sources if source[0] or source[1]]
+
+            subtitle_tracks = []
+            scratch = get_scratch_space(self.scratch_dir)
+            with job.stage('ass'):
+                for english_srt, korean_srt, (language, title) in track_sources:
+                    temp_ass_path = scratch.small_path(f"{video_name_no_ext}_{language}", "_temp.ass",
+                                                       estimate_ass_size(korean_srt, english_srt))
+                    temp_ass_paths.append(temp_ass_path)
+                    if not self.layout.generate_merged_ass(english_srt, korean_srt, temp_ass_path,
+                                                           ass_width, ass_height, 0, 0):
+                        error_msg = f"{video_name}: ASS 파일 생성 실패 ({title})."
+                        return job.result("Error", error_msg, ERROR_SUBTITLE)
+                    subtitle_tracks.append((temp_ass_path, language, title))
+
+            partial_output_path = get_partial_output_path(output_path)
+            if os.path.exists(partial_output_path):
+                os.remove(partial_output_path)
+            command = build_mux_command(input_path, partial_output_path, subtitle_tracks, self.mode.container)
+            print(f"실행할 FFmpeg 자막 mux 명령어: {' '.join(command)}")
+            with job.stage('mux'):
+                returncode, stderr_tail = run_ffmpeg_process(
+                    command, self.layout.get_video_duration(input_path),
+                    source=input_path, stage='mux', on_progress=self.progress_callback
+                )
+            if returncode == 0 and os.path.exists(partial_output_path) and os.path.getsize(partial_output_path) > 0:
+                with job.stage('finalize'):
+                    os.replace(partial_output_path, output_path)
+                job.width, job.height = width, height
+                success_msg = (f"{video_name}: 자막 트랙 {len(subtitle_tracks)}개를 넣었습니다 (재인코딩 없음). "
+                               f"출력: {os.path.basename(output_path)}")
+                return job.result("Success", success_msg)
+            error_msg = f"{video_name}: 자막 mux 실패.\n{stderr_tail}"
+            return job.result("Error", error_msg, ERROR_ENCODE)
+
+        except ScratchSpaceError as e:
+            return job.result("Error", f"{video_name}: {e}", ERROR_SCRATCH)
+        except Exception as e:
+            error_msg = f"{video_name}: 예기치 않은 오류 발생 - {e}"
+            return job.result("Error", error_msg, ERROR_UNEXPECTED)
+        finally:
+            with job.stage('cleanup'):
+                for temp_ass_path in temp_ass_paths:
+                    remove_scratch_file(temp_ass_path, "임시 ASS 파일")
+                remove_scratch_file(partial_output_path, "미완성 출력 파일")
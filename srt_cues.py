@@ -0,0 +1,319 @@
+# srt_cues.py
+# SRT 파일을 한 번만 파싱해서 메모리 cue 저장소(정수 배열 + 텍스트 버퍼)로 보관하고,
+# 겹침 수정 / 오류 검사 / ASS 생성이 같은 cue 목록을 공유하도록 하는 모듈
+# (중간 *.fixed.srt 파일을 쓰고 다시 읽지 않음)
+
+import os
+import re
+import threading
+from array import array
+from collections import Counter, namedtuple
+from itertools import accumulate
+
+# 원본 인덱스 문자열, 시작/종료(ms), 텍스트(여러 줄이면 '\n'으로 연결),
+# slot: 'stack' 겹침 정책에서 같은 시간에 겹쳐 표시할 줄 번호 (0 = 기본 위치)
+Cue = namedtuple('Cue', ['index', 'start_ms', 'end_ms', 'text', 'slot'], defaults=(0,))
+
+_TIME_LINE_PATTERN = re.compile(
+    r'\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+)
+
+
+def time_str_to_ms(time_str):
+    """'HH:MM:SS,ms' 형식의 시간 문자열을 밀리초(ms)로 변환합니다."""
+    try:
+        h, m, s_ms = time_str.split(':')
+        s, ms = s_ms.split(',')
+        return int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(ms)
+    except ValueError:
+        return 0
+
+
+def ms_to_time_str(ms):
+    """밀리초(ms)를 'HH:MM:SS,ms' 형식의 시간 문자열로 변환합니다."""
+    if ms < 0: ms = 0
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def ms_to_ass_time(ms):
+    """밀리초(ms)를 ASS 형식 'H:MM:SS.cc' (센티초) 문자열로 변환합니다."""
+    if ms < 0: ms = 0
+    # divmod 튜플을 만들지 않고 정수 연산만으로 한 번에 포맷 (ASS 생성 시 cue마다 2번 호출됨)
+    cs = ms // 10
+    return f"{cs // 360000:d}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+class SubtitleCues:
+    """
+    한 SRT 파일의 cue 목록 (컬럼형 저장소).
+    - starts / ends: 시작/종료 시간(ms) 정수 배열 (array('q'))
+    - 텍스트와 원본 인덱스 문자열은 각각 하나의 문자열 버퍼 + 오프셋 배열로 보관
+    cue마다 dict/튜플을 만들지 않으므로 10만 개 이상의 cue도 적은 메모리로 다룰 수 있습니다.
+    반복/인덱싱하면 Cue 튜플을 그때그때 만들어 돌려줍니다.
+    warnings에는 파싱 중 발견한 형식 오류(시간 형식 오류, 시간 줄 없는 블록 등)가 담깁니다.
+    slots는 'stack' 정책으로 겹침을 해결한 경우에만 채워지는 표시 줄 번호 배열입니다.
+    """
+
+    def __init__(self, starts=None, ends=None, text_buffer='', text_offsets=None,
+                 index_buffer='', index_offsets=None, warnings=None, path=None,
+                 overlap_policy=None, slots=None):
+        self.starts = starts if starts is not None else array('q')
+        self.ends = ends if ends is not None else array('q')
+        self._text_buffer = text_buffer
+        self._text_offsets = text_offsets if text_offsets is not None else array('q', [0])
+        self._index_buffer = index_buffer
+        self._index_offsets = index_offsets if index_offsets is not None else array('q', [0])
+        self.warnings = list(warnings or [])
+        self.path = path
+        self.overlap_policy = overlap_policy  # 적용된 겹침 해결 정책 (None이면 원본 그대로)
+        self.slots = slots
+
+    @property
+    def fixed(self):
+        """겹침 수정이 적용된 cue 목록인지 여부"""
+        return self.overlap_policy is not None
+
+    @classmethod
+    def from_cues(cls, cues, warnings=None, path=None, overlap_policy=None):
+        """Cue(또는 같은 순서의 튜플) 목록으로 저장소 생성"""
+        starts, ends, slots = array('q'), array('q'), array('q')
+        texts, indices = [], []
+        for cue in cues:
+            indices.append(cue[0])
+            starts.append(cue[1])
+            ends.append(cue[2])
+            texts.append(cue[3])
+            slots.append(cue[4] if len(cue) > 4 else 0)
+        return cls(starts, ends, ''.join(texts), _offsets(texts),
+                   ''.join(indices), _offsets(indices), warnings, path, overlap_policy,
+                   slots if any(slots) else None)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for i in range(len(self.starts)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.starts)
+        slot = self.slots[i] if self.slots is not None else 0
+        return Cue(self.index(i), self.starts[i], self.ends[i], self.text(i), slot)
+
+    def text(self, i):
+        return self._text_buffer[self._text_offsets[i]:self._text_offsets[i + 1]]
+
+    def index(self, i):
+        return self._index_buffer[self._index_offsets[i]:self._index_offsets[i + 1]]
+
+    def with_times(self, starts, ends, overlap_policy=None, slots=None):
+        """시간(과 표시 줄) 배열만 바꾼 새 저장소 (텍스트 버퍼는 공유)"""
+        return SubtitleCues(starts, ends, self._text_buffer, self._text_offsets,
+                            self._index_buffer, self._index_offsets,
+                            self.warnings, self.path, overlap_policy or self.overlap_policy,
+                            slots if slots is not None else self.slots)
+
+    def take(self, positions):
+        """주어진 위치 순서대로 cue를 골라 새 저장소를 만듦 (정렬/제거용)"""
+        positions = list(positions)
+        texts = [self.text(i) for i in positions]
+        indices = [self.index(i) for i in positions]
+        slots = array('q', (self.slots[i] for i in positions)) if self.slots is not None else None
+        return SubtitleCues(array('q', (self.starts[i] for i in positions)),
+                            array('q', (self.ends[i] for i in positions)),
+                            ''.join(texts), _offsets(texts), ''.join(indices), _offsets(indices),
+                            self.warnings, self.path, self.overlap_policy, slots)
+
+
+def _offsets(parts):
+    """문자열 조각 목록을 이어 붙였을 때의 시작 오프셋 배열 (길이 = 조각 수 + 1)"""
+    offsets = array('q', [0])
+    offsets.extend(accumulate(map(len, parts)))
+    return offsets
+
+
+def iter_srt_lines(lines, warnings=None):
+    """
+    SRT 텍스트 줄들을 한 번 훑으면서 Cue를 하나씩 yield 하는 지연 파서
+    (파일 객체를 그대로 넘기면 전체를 메모리에 올리지 않고 스트리밍으로 처리됩니다)
+    형식 오류 메시지는 warnings 리스트가 주어지면 거기에 추가됩니다.
+    """
+    if warnings is None:
+        warnings = []
+    cue_count = 0
+    index = ''
+    times = None
+    text_lines = []
+    block_has_content = False
+
+    for line_num, raw_line in enumerate(lines, start=1):
+        line = raw_line.strip()
+        if not line:
+            if block_has_content:
+                if times is not None:
+                    cue_count += 1
+                    yield Cue(index, times[0], times[1], '\n'.join(text_lines))
+                else:
+                    warnings.append(f"경고: 자막 {index or cue_count + 1}의 시간 정보가 불완전합니다.")
+                index, times, text_lines, block_has_content = '', None, [], False
+            continue
+
+        block_has_content = True
+        if times is not None:
+            text_lines.append(line)
+        elif '-->' in line:
+            match = _TIME_LINE_PATTERN.match(line)
+            if not match:
+                warnings.append(f"경고: {line_num}번 줄의 시간 형식이 잘못되었습니다: {line}")
+                continue
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+            times = (h1 * 3600000 + m1 * 60000 + s1 * 1000 + ms1,
+                     h2 * 3600000 + m2 * 60000 + s2 * 1000 + ms2)
+        elif not index:
+            index = line
+
+    if block_has_content:
+        if times is not None:
+            yield Cue(index, times[0], times[1], '\n'.join(text_lines))
+        else:
+            warnings.append(f"경고: 자막 {index or cue_count + 1}의 시간 정보가 불완전합니다.")
+
+
+def parse_srt_lines(lines, path=None):
+    """SRT 텍스트 줄들을 컬럼형 SubtitleCues로 변환"""
+    warnings = []
+    starts, ends = array('q'), array('q')
+    texts, indices = [], []
+    for index, start_ms, end_ms, text, _ in iter_srt_lines(lines, warnings):
+        indices.append(index)
+        starts.append(start_ms)
+        ends.append(end_ms)
+        texts.append(text)
+    return SubtitleCues(starts, ends, ''.join(texts), _offsets(texts),
+                        ''.join(indices), _offsets(indices), warnings, path)
+
+
+def parse_srt(srt_path):
+    """SRT 파일을 읽어 SubtitleCues로 반환 (BOM 포함 UTF-8 처리)"""
+    with open(srt_path, 'r', encoding='utf-8-sig') as f:
+        content = f.read()
+    return parse_srt_lines(content.splitlines(), srt_path)
+
+
+def iter_srt(srt_path):
+    """SRT 파일을 줄 단위로 읽으며 Cue를 yield (파일 크기와 무관하게 메모리 사용량 일정)"""
+    with open(srt_path, 'r', encoding='utf-8-sig') as f:
+        yield from iter_srt_lines(f)
+
+
+def write_srt(output_path, subtitles):
+    """cue 목록을 SRT 파일로 저장 (원본 인덱스 유지)"""
+    with open(output_path, 'w', encoding='utf-8-sig') as f:
+        for cue in subtitles:
+            f.write(f"{cue.index}\n")
+            f.write(f"{ms_to_time_str(cue.start_ms)} --> {ms_to_time_str(cue.end_ms)}\n")
+            f.write(f"{cue.text}\n\n")
+
+
+# --- 프로세스 공용 cue 캐시 ---
+# 경로별로 (수정 시각, 크기) 가 같은 동안에는 다시 파싱하지 않고,
+# 겹침 수정 결과도 이 캐시에 저장되어 검사/ASS 생성 단계에서 그대로 사용됩니다.
+# 배치가 끝날 때까지 쌓이지 않도록 자막을 마지막으로 쓰는 작업이 끝나면 제거합니다 (CueCacheReleaser).
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _file_stamp(srt_path):
+    stat = os.stat(srt_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_cues(srt_path):
+    """캐시된 cue 목록을 반환. 파일이 바뀌었거나 처음이면 파싱 후 캐시"""
+    key = os.path.abspath(srt_path)
+    stamp = _file_stamp(srt_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    subtitles = parse_srt(srt_path)
+    with _cache_lock:
+        _cache[key] = (stamp, subtitles)
+    return subtitles
+
+
+def store_cues(srt_path, subtitles):
+    """수정된 cue 목록을 캐시에 저장 (파일이 바뀌면 자동으로 무효화됨)"""
+    key = os.path.abspath(srt_path)
+    stamp = _file_stamp(srt_path)
+    with _cache_lock:
+        _cache[key] = (stamp, subtitles)
+
+
+def cached_cues(srt_path):
+    """캐시에 있는 최신 cue 목록 (겹침 수정 결과 포함), 없거나 파일이 바뀌었으면 None (파싱하지 않음)"""
+    key = os.path.abspath(srt_path)
+    stamp = _file_stamp(srt_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    return None
+
+
+def iter_cues(srt_path):
+    """
+    cue를 순서대로 반환. 캐시에 최신 cue 목록(겹침 수정 결과 포함)이 있으면 그것을,
+    없으면 파일을 캐시에 올리지 않고 스트리밍으로 읽습니다.
+    """
+    cached = cached_cues(srt_path)
+    if cached is not None:
+        return iter(cached)
+    return iter_srt(srt_path)
+
+
+def cached_overlap_policy(srt_path):
+    """캐시에 최신 cue 목록이 있으면 적용된 겹침 정책, 없거나 원본 그대로면 None (파싱하지 않음)"""
+    cached = cached_cues(srt_path)
+    return cached.overlap_policy if cached is not None else None
+
+
+def evict_cues(srt_path):
+    """자막 하나의 cue 목록을 캐시에서 제거"""
+    with _cache_lock:
+        _cache.pop(os.path.abspath(srt_path), None)
+
+
+class CueCacheReleaser:
+    """
+    배치 작업들이 쓰는 자막 경로별 남은 작업 수를 세어, 마지막으로 쓰는 작업이 끝나면 cue 캐시에서 제거
+    (같은 자막을 쓰는 다른 작업이 남아 있는 동안에는 겹침 수정 결과를 유지)
+    jobs: [(video, korean_srt, english_srt), ...]
+    """
+
+    def __init__(self, jobs):
+        self._remaining = Counter(os.path.abspath(srt) for _, *srts in jobs for srt in srts if srt)
+        self._lock = threading.Lock()
+
+    def job_finished(self, job):
+        _, *srts = job
+        for srt in srts:
+            if not srt:
+                continue
+            key = os.path.abspath(srt)
+            with self._lock:
+                self._remaining[key] -= 1
+                release = self._remaining[key] == 0
+            if release:
+                evict_cues(key)
+
+
+def clear_cue_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -1,196 +1,328 @@
-import re
+import heapq
 import os
+from array import array
+from collections import defaultdict
+from itertools import compress, count
+from operator import and_, eq, gt, le, ne
+
+from srt_cues import (
+    Cue, SubtitleCues, load_cues, parse_srt, store_cues,
+    time_str_to_ms, ms_to_time_str,  # 기존 import 호환용
+)
 
 # 사용자 정의 예외 클래스 추가
 class SevereOverlapError(Exception):
     """심각한 자막 겹침 오류를 위한 사용자 정의 예외"""
     pass
 
-# --- 새로운 자막 수정 함수 (pysrt 라이브러리를 사용하지 않음) ---
+# --- 자막 수정 함수 (srt_cues의 공용 파서/cue 캐시 사용) ---
 
-def time_str_to_ms(time_str):
-    """'HH:MM:SS,ms' 형식의 시간 문자열을 밀리초(ms)로 변환합니다."""
-    try:
-        h, m, s_ms = time_str.split(':')
-        s, ms = s_ms.split(',')
-        return int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(ms)
-    except ValueError:
-        return 0
-
-def ms_to_time_str(ms):
-    """밀리초(ms)를 'HH:MM:SS,ms' 형식의 시간 문자열로 변환합니다."""
-    if ms < 0: ms = 0
-    h, ms = divmod(ms, 3600000)
-    m, ms = divmod(ms, 60000)
-    s, ms = divmod(ms, 1000)
-    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-
-def fix_srt_overlaps_and_save(srt_path):
+def fix_srt_overlaps(subtitles, srt_name=""):
     """
-    pysrt 라이브러리를 사용하지 않고 SRT 파일의 시간 겹침을 수정하고,
-    인코딩 문제를 해결하여 새 파일로 저장합니다.
+    ('strict' 정책) 인접 자막 겹침만 수정한 새 SubtitleCues와 수정한 겹침 개수를 반환합니다.
+    수정 후에도 심각한 겹침이 남으면 SevereOverlapError를 발생시킵니다.
+    시작/종료 배열 전체에 대해 map/compress로 한 번에 비교합니다 (cue별 Python 루프 없음).
+    정렬되지 않은 입력은 먼저 시작 시간 순으로 정렬합니다 (다음 cue가 앞선 시각이면 종료 < 시작이 되므로).
     """
-    try:
-        with open(srt_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-    except Exception as e:
-        raise IOError(f"'{os.path.basename(srt_path)}' 파일을 읽는 중 오류 발생: {e}")
+    subtitles, _ = _sort_by_start(subtitles)
+    starts, ends = subtitles.starts, subtitles.ends
+    if len(starts) < 2:
+        fixed = subtitles.with_times(starts, ends, overlap_policy='strict')
+        fixed.warnings = []  # 아래 수정 경로와 같게 형식 오류 경고는 남기지 않음
+        return fixed, 0
+
+    next_starts = starts[1:]
 
-    blocks = content.strip().split('\n\n')
-    parsed_subs = []
-    time_pattern = re.compile(r'(\d{1,2}:\d{2}:\d{2},\d{1,3})\s*-->\s*(\d{1,2}:\d{2}:\d{2},\d{1,3})')
-
-    for block_num, block in enumerate(blocks):
-        lines = block.split('\n')
-        if len(lines) < 2: continue
-        
-        index_line = lines[0]
-        time_line = ""
-        text_lines_start_index = -1
-
-        for i, line in enumerate(lines):
-            if '-->' in line:
-                time_line = line
-                text_lines_start_index = i + 1
-                break
-        
-        if not time_line or text_lines_start_index == -1: continue
-        
-        text_lines = lines[text_lines_start_index:]
-        match = time_pattern.match(time_line)
-        if not match: continue
-            
-        start_str, end_str = match.groups()
-        parsed_subs.append({
-            'original_index': index_line.strip(),
-            'start_ms': time_str_to_ms(start_str),
-            'end_ms': time_str_to_ms(end_str),
-            'text': '\n'.join(text_lines)
-        })
-
-    # 1. 바로 다음 자막과의 겹침 우선 수정 (기존 로직)
-    fixed_count = 0
-    for i in range(len(parsed_subs) - 1):
-        current_sub = parsed_subs[i]
-        next_sub = parsed_subs[i+1]
-        
-        if current_sub['end_ms'] > next_sub['start_ms']:
-            current_sub['end_ms'] = next_sub['start_ms']
-            fixed_count += 1
-            
-    # 2. 심각한 겹침 오류 검사 (새로운 로직)
+    # 1. 바로 다음 자막과의 겹침 우선 수정: end[i] = min(end[i], start[i+1])
+    fixed_count = sum(map(gt, ends[:-1], next_starts))
+    fixed_ends = array('q', map(min, ends[:-1], next_starts))
+    fixed_ends.append(ends[-1])
+
+    # 2. 심각한 겹침 오류 검사
     #    수정된 데이터를 기반으로, 현재 자막의 종료시간이 다음 자막의 종료시간보다도 늦는지 확인
-    for i in range(len(parsed_subs) - 1):
-        current_sub = parsed_subs[i]
-        next_sub = parsed_subs[i+1]
-        
-        if current_sub['end_ms'] > next_sub['end_ms']:
-            # 오류 발생 시, 프로그램을 멈추고 상세 정보를 담은 예외를 발생시킴
-            error_msg = (
-                f"심각한 자막 겹침 오류가 '{os.path.basename(srt_path)}' 파일에서 발견되어 작업을 중단합니다.\n\n"
-                f"▶ 문제 자막: {current_sub['original_index']}번\n"
-                f"   시간: {ms_to_time_str(current_sub['start_ms'])} --> {ms_to_time_str(current_sub['end_ms'])}\n\n"
-                f"이 자막의 종료 시간이 다음 자막({next_sub['original_index']}번)의 종료 시간보다 늦습니다.\n"
-                f"SRT 파일을 직접 열어 해당 자막의 종료 시간을 수정해주세요."
+    severe_index = next(compress(count(), map(gt, fixed_ends[:-1], fixed_ends[1:])), None)
+    if severe_index is not None:
+        current_sub = subtitles[severe_index]
+        next_sub = subtitles[severe_index + 1]
+        # 오류 발생 시, 프로그램을 멈추고 상세 정보를 담은 예외를 발생시킴
+        error_msg = (
+            f"심각한 자막 겹침 오류가 '{srt_name}' 파일에서 발견되어 작업을 중단합니다.\n\n"
+            f"▶ 문제 자막: {current_sub.index}번\n"
+            f"   시간: {ms_to_time_str(current_sub.start_ms)} --> {ms_to_time_str(fixed_ends[severe_index])}\n\n"
+            f"이 자막의 종료 시간이 다음 자막({next_sub.index}번)의 종료 시간보다 늦습니다.\n"
+            f"SRT 파일을 직접 열어 해당 자막의 종료 시간을 수정해주세요."
+        )
+        raise SevereOverlapError(error_msg)
+
+    # 형식 오류 블록은 수정 결과에서 제외되므로 경고도 남기지 않음 (기존 *.fixed.srt 동작과 동일)
+    fixed = subtitles.with_times(starts, fixed_ends, overlap_policy='strict')
+    fixed.warnings = []
+    return fixed, fixed_count
+
+
+# --- 스윕 라인 겹침 해결기 ---
+# 정렬되지 않은 cue, 여러 cue가 동시에 겹치는 경우까지 처리하고,
+# 작업을 중단하는 대신 무엇을 바꿨는지 OverlapReport로 돌려줍니다.
+
+OVERLAP_POLICIES = ('clamp', 'merge', 'stack', 'strict')
+DEFAULT_OVERLAP_POLICY = 'clamp'
+
+# 리포트에 남길 상세 항목 최대 개수 (기계 생성 자막에서 리포트가 너무 커지지 않도록)
+MAX_REPORT_DETAILS = 50
+
+
+class OverlapReport:
+    """겹침 해결 결과 요약 (정책별로 바뀐 cue 수와 일부 상세 내역)"""
+
+    def __init__(self, policy, srt_name=""):
+        self.policy = policy
+        self.srt_name = srt_name
+        self.reordered = 0   # 시작 시간 순으로 자리가 바뀐 cue 수
+        self.dropped = 0     # 길이가 0 이하라서 제거된 cue 수
+        self.clamped = 0     # 종료 시간이 잘린 cue 수
+        self.merged = 0      # 텍스트 병합에 참여한 cue 수
+        self.stacked = 0     # 다른 줄(slot)로 쌓여 표시되는 cue 수
+        self.details = []
+
+    def add_detail(self, message):
+        if len(self.details) < MAX_REPORT_DETAILS:
+            self.details.append(message)
+
+    @property
+    def changed_count(self):
+        return self.reordered + self.dropped + self.clamped + self.merged + self.stacked
+
+    def summary(self):
+        parts = []
+        if self.reordered: parts.append(f"순서 정렬 {self.reordered}건")
+        if self.dropped: parts.append(f"길이 0 제거 {self.dropped}건")
+        if self.clamped: parts.append(f"종료 시간 자름 {self.clamped}건")
+        if self.merged: parts.append(f"텍스트 병합 {self.merged}건")
+        if self.stacked: parts.append(f"겹쳐 쌓기 {self.stacked}건")
+        changes = ", ".join(parts) if parts else "변경 없음"
+        return f"'{self.srt_name}' ({self.policy}): {changes}"
+
+
+def _sort_by_start(subtitles):
+    """시작 시간 순으로 안정 정렬한 cue 목록과 자리가 바뀐 cue 수 (이미 정렬되어 있으면 그대로)"""
+    starts = subtitles.starts
+    if all(map(le, starts[:-1], starts[1:])):
+        return subtitles, 0
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    return subtitles.take(order), sum(map(ne, order, count()))
+
+
+def _sort_and_drop_empty(subtitles, report):
+    """시작 시간 순으로 정렬하고 (안정 정렬), 종료 ≤ 시작인 cue를 제거"""
+    subtitles, reordered = _sort_by_start(subtitles)
+    if reordered:
+        report.reordered = reordered
+
+    empty = list(compress(count(), map(le, subtitles.ends, subtitles.starts)))
+    if empty:
+        for i in empty:
+            cue = subtitles[i]
+            report.add_detail(f"{cue.index}번 제거: {ms_to_time_str(cue.start_ms)} --> {ms_to_time_str(cue.end_ms)}")
+        report.dropped += len(empty)
+        empty_set = set(empty)
+        subtitles = subtitles.take(i for i in range(len(subtitles)) if i not in empty_set)
+    return subtitles
+
+
+def _resolve_clamp(subtitles, report):
+    """각 cue의 종료 시간을 다음 cue의 시작 시간으로 자름 (같은 시작 시간이면 앞 cue 제거)"""
+    starts, ends = subtitles.starts, subtitles.ends
+    next_starts = starts[1:]
+    clamped = list(compress(count(), map(gt, ends[:-1], next_starts)))
+    if not clamped:
+        return subtitles
+
+    new_ends = array('q', map(min, ends[:-1], next_starts))
+    new_ends.append(ends[-1])
+    for i in clamped:
+        report.add_detail(f"{subtitles.index(i)}번 종료 시간 {ms_to_time_str(ends[i])} → {ms_to_time_str(new_ends[i])}")
+    report.clamped = len(clamped)
+
+    subtitles = subtitles.with_times(starts, new_ends)
+    return _sort_and_drop_empty(subtitles, report)
+
+
+def _merge_cluster(subtitles, lo, hi):
+    """겹치는 cue 묶음 [lo, hi)을 경계 시점마다 잘라, 동시에 보이는 텍스트를 합친 cue 목록으로 변환"""
+    starts, ends = subtitles.starts, subtitles.ends
+    starting, ending = defaultdict(list), defaultdict(list)
+    for k in range(lo, hi):
+        starting[starts[k]].append(k)
+        ending[ends[k]].append(k)
+    boundaries = sorted(starting.keys() | ending.keys())
+
+    active = {}  # 시작 순서를 유지하는 활성 cue 집합
+    segments = []
+    for b0, b1 in zip(boundaries, boundaries[1:]):
+        for k in ending.get(b0, ()):
+            active.pop(k, None)
+        for k in starting.get(b0, ()):
+            active[k] = None
+        if not active:
+            continue
+        members = tuple(active)
+        if segments and segments[-1][2] == members and segments[-1][1] == b0:
+            segments[-1][1] = b1
+        else:
+            segments.append([b0, b1, members])
+
+    return [
+        Cue(subtitles.index(members[0]), b0, b1, '\n'.join(subtitles.text(k) for k in members))
+        for b0, b1, members in segments
+    ]
+
+
+def _resolve_merge(subtitles, report):
+    """겹치는 구간마다 동시에 보이는 cue들의 텍스트를 하나의 cue로 병합"""
+    starts, ends = subtitles.starts, subtitles.ends
+    n = len(starts)
+    merged_cues = []
+    changed = False
+    i = 0
+    while i < n:
+        j = i + 1
+        cluster_end = ends[i]
+        while j < n and starts[j] < cluster_end:
+            cluster_end = max(cluster_end, ends[j])
+            j += 1
+        if j - i == 1:
+            merged_cues.append(subtitles[i])
+        else:
+            changed = True
+            report.merged += j - i
+            report.add_detail(
+                f"{subtitles.index(i)}~{subtitles.index(j - 1)}번 {j - i}개 병합: "
+                f"{ms_to_time_str(starts[i])} --> {ms_to_time_str(cluster_end)}"
             )
-            raise SevereOverlapError(error_msg)
+            merged_cues.extend(_merge_cluster(subtitles, i, j))
+        i = j
+
+    if not changed:
+        return subtitles
+    return SubtitleCues.from_cues(merged_cues, path=subtitles.path)
+
+
+def _resolve_stack(subtitles, report):
+    """시간은 그대로 두고, 겹치는 cue마다 비어 있는 가장 낮은 표시 줄(slot)을 배정"""
+    starts, ends = subtitles.starts, subtitles.ends
+    slots = array('q', bytes(8 * len(starts)))
+    active = []       # (종료 시간, slot) 최소 힙
+    free_slots = []   # 다시 쓸 수 있는 slot 최소 힙
+    next_slot = 0
+    for k in range(len(starts)):
+        while active and active[0][0] <= starts[k]:
+            heapq.heappush(free_slots, heapq.heappop(active)[1])
+        slot = heapq.heappop(free_slots) if free_slots else next_slot
+        if slot == next_slot:
+            next_slot += 1
+        slots[k] = slot
+        heapq.heappush(active, (ends[k], slot))
+
+    stacked = list(compress(count(), slots))
+    if not stacked:
+        return subtitles
+    for i in stacked:
+        report.add_detail(f"{subtitles.index(i)}번 {slots[i] + 1}번째 줄에 표시")
+    report.stacked = len(stacked)
+    return subtitles.with_times(starts, ends, slots=slots)
+
+
+def resolve_overlaps(subtitles, policy=DEFAULT_OVERLAP_POLICY, srt_name=""):
+    """
+    cue를 시작 시간 순으로 정렬한 뒤 겹치는 구간을 정책에 따라 해결합니다. (O(n log n))
+    - clamp: 종료 시간을 다음 cue 시작 시간으로 자름
+    - merge: 겹치는 구간에 동시에 보이는 텍스트를 합침
+    - stack: 시간은 유지하고 겹치는 cue를 다른 줄에 쌓아서 표시
+    - strict: 기존 동작 (인접 겹침만 자르고, 심각한 겹침이면 SevereOverlapError)
+    (해결된 SubtitleCues, OverlapReport)를 반환합니다.
+    """
+    if policy not in OVERLAP_POLICIES:
+        raise ValueError(f"알 수 없는 겹침 정책: {policy}")
+
+    report = OverlapReport(policy, srt_name)
+    if policy == 'strict':
+        subtitles, report.reordered = _sort_by_start(subtitles)
+        resolved, report.clamped = fix_srt_overlaps(subtitles, srt_name)
+        return resolved, report
+
+    resolved = _sort_and_drop_empty(subtitles, report)
+    if policy == 'clamp':
+        resolved = _resolve_clamp(resolved, report)
+    elif policy == 'merge':
+        resolved = _resolve_merge(resolved, report)
+    else:
+        resolved = _resolve_stack(resolved, report)
 
-    # 모든 검사를 통과한 경우에만 파일 저장
-    base, ext = os.path.splitext(srt_path)
-    output_path = f"{base}.fixed{ext}"
-    
+    # 형식 오류 블록은 결과에서 제외되므로 경고도 남기지 않음 (기존 *.fixed.srt 동작과 동일)
+    resolved = resolved.with_times(resolved.starts, resolved.ends, overlap_policy=policy)
+    resolved.warnings = []
+    return resolved, report
+
+
+def _load_for_fix(srt_path, policy):
     try:
-        with open(output_path, 'w', encoding='utf-8-sig') as f:
-            for i, sub in enumerate(parsed_subs):
-                start_str = ms_to_time_str(sub['start_ms'])
-                end_str = ms_to_time_str(sub['end_ms'])
-                
-                f.write(f"{sub['original_index']}\n") # 원본 인덱스 유지
-                f.write(f"{start_str} --> {end_str}\n")
-                f.write(f"{sub['text']}\n\n")
-        
-        if fixed_count > 0:
-            print(f"INFO: '{os.path.basename(srt_path)}'의 겹침/인코딩 문제를 수정하여 '{os.path.basename(output_path)}'로 저장했습니다.")
-        else:
-            print(f"INFO: '{os.path.basename(srt_path)}'의 인코딩 문제를 처리하여 '{os.path.basename(output_path)}'로 저장했습니다.")
-        return output_path
+        subtitles = load_cues(srt_path)
+        if subtitles.fixed and subtitles.overlap_policy != policy:
+            # 다른 정책으로 수정된 캐시는 쓰지 않고 원본을 다시 파싱
+            subtitles = parse_srt(srt_path)
+        return subtitles
     except Exception as e:
-        raise IOError(f"수정된 자막 파일 저장 중 오류 발생: {e}")
+        raise IOError(f"'{os.path.basename(srt_path)}' 파일을 읽는 중 오류 발생: {e}")
+
+
+def fix_srt_overlaps_in_memory(srt_path, policy=DEFAULT_OVERLAP_POLICY):
+    """
+    SRT 파일의 시간 겹침을 정책에 따라 해결해 공용 cue 캐시에 저장합니다 (파일은 만들지 않음).
+    이후 check_srt_overlap / ASS 생성은 같은 경로로 수정된 cue 목록을 사용합니다.
+    OverlapReport를 반환합니다 ('strict' 정책에서만 SevereOverlapError 발생).
+    """
+    srt_name = os.path.basename(srt_path)
+    subtitles = _load_for_fix(srt_path, policy)
+    if subtitles.overlap_policy == policy:
+        return OverlapReport(policy, srt_name)
+
+    resolved, report = resolve_overlaps(subtitles, policy, srt_name)
+    store_cues(srt_path, resolved)
+    if report.changed_count > 0:
+        print(f"INFO: {report.summary()} (메모리에서 수정)")
+    return report
 
 
 def check_srt_overlap(srt_file):
-    # 이 함수는 변경할 필요 없습니다.
-    # ... (기존 코드와 동일) ...
+    """
+    자막 형식 오류와 인접 자막 간 시간 겹침을 검사해 오류 메시지 목록을 반환합니다.
+    겹침 수정이 메모리에서 적용된 경우 수정된 cue 목록을 검사합니다.
+    """
     try:
-        with open(srt_file, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
+        subtitles = load_cues(srt_file)
     except FileNotFoundError:
         return [f"오류: '{srt_file}' 파일을 찾을 수 없습니다."]
     except Exception as e:
         return [f"오류: 파일을 읽는 중 오류가 발생했습니다: {e}"]
 
-    entries = []
-    current_entry = {}
-    errors = []
-    line_num = 0
-
-    for line in lines:
-        line_num += 1
-        line = line.strip()
-        if not line:
-            if current_entry:
-                entries.append(current_entry)
-            current_entry = {}
-            continue
+    errors = list(subtitles.warnings)
+    starts, ends = subtitles.starts, subtitles.ends
+    overlaps = map(gt, ends[:-1], starts[1:])
+    if subtitles.slots is not None:
+        # 'stack' 정책: 서로 다른 줄에 표시되는 cue끼리의 겹침은 의도된 것이므로 제외
+        overlaps = map(and_, overlaps, map(eq, subtitles.slots[:-1], subtitles.slots[1:]))
 
-        if '-->' in line:
-            current_entry['time'] = line
-            match = re.match(r'(\d+:\d+:\d+,\d+)\s*-->\s*(\d+:\d+:\d+,\d+)', line)
-            if match:
-                current_entry['start'] = match.group(1)
-                current_entry['end'] = match.group(2)
-            else:
-                errors.append(f"경고: {line_num}번 줄의 시간 형식이 잘못되었습니다: {line}")
-                continue
-
-        elif line.isdigit() and 'index' not in current_entry:
-            if 'index' in current_entry:
-                entries.append(current_entry)
-                current_entry = {}
-            current_entry['index'] = int(line)
-
-        else:
-            if 'text' in current_entry:
-                current_entry['text'] += '\n' + line
-            else:
-                current_entry['text'] = line
-
-    if current_entry:
-        entries.append(current_entry)
-
-    def time_to_milliseconds(time_str):
-        hours, minutes, seconds_ms = time_str.split(':')
-        seconds, milliseconds = seconds_ms.split(',')
-        total_milliseconds = (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000 + int(milliseconds)
-        return total_milliseconds
-
-    for i in range(len(entries) - 1):
-        try:
-            if 'end' not in entries[i] or 'start' not in entries[i+1]:
-                errors.append(f"경고: 자막 {entries[i].get('index', i)}의 시간 정보가 불완전합니다.")
-                continue
-
-            current_end_time = time_to_milliseconds(entries[i]['end'])
-            next_start_time = time_to_milliseconds(entries[i + 1]['start'])
-
-            if current_end_time > next_start_time:
-                errors.append(
-                    f"경고: 자막 {entries[i].get('index', i)} ({entries[i].get('time', '시간 정보 없음')})이(가) "
-                    f"다음 자막 {entries[i + 1].get('index', i+1)} ({entries[i + 1].get('time', '시간 정보 없음')})과(와) 겹칩니다.\n"
-                    f"     {entries[i].get('index', i)} 종료: {entries[i].get('end', '종료 시간 없음')},  {entries[i + 1].get('index', i+1)} 시작: {entries[i + 1].get('start', '시작 시간 없음')}"
-                )
-        except (ValueError, KeyError) as e:
-            errors.append(f"경고: 자막 {entries[i].get('index', i)} 시간 처리 중 오류 발생: {e}")
-            continue
+    # 겹치는 위치만 배열 비교로 골라낸 뒤 해당 cue에 대해서만 메시지 생성
+    for i in compress(count(), overlaps):
+        current, following = subtitles[i], subtitles[i + 1]
+        current_time = f"{ms_to_time_str(current.start_ms)} --> {ms_to_time_str(current.end_ms)}"
+        following_time = f"{ms_to_time_str(following.start_ms)} --> {ms_to_time_str(following.end_ms)}"
+        current_index = current.index or i
+        following_index = following.index or i + 1
+        errors.append(
+            f"경고: 자막 {current_index} ({current_time})이(가) "
+            f"다음 자막 {following_index} ({following_time})과(와) 겹칩니다.\n"
+            f"     {current_index} 종료: {ms_to_time_str(current.end_ms)},  {following_index} 시작: {ms_to_time_str(following.start_ms)}"
+        )
 
-    return errors
\ No newline at end of file
+    return errors
@@ -0,0 +1,105 @@
+# subtitle_check_cache.py
+# 자막 검사 결과 캐시: 파일 내용 해시 기준으로 check_srt_overlap의 오류 목록을 SQLite에 저장해
+# 내용이 바뀌지 않은 자막은 다음 배치 시작 때 다시 파싱/검사하지 않습니다.
+# 겹침 수정을 적용한 자막은 이미 파싱/해결된 cue가 메모리에 있어 검사가 배열 비교뿐이므로
+# 해시를 계산하지 않고 바로 검사합니다 (캐시는 원본 그대로 검사하는 파일에만 사용).
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from srt_cues import cached_overlap_policy
+from srt_overlap_error import check_srt_overlap
+from utils import get_cache_dir
+
+CACHE_FILE_NAME = "subtitle_checks.sqlite3"
+# 키 구성(열)이 바뀌면 테이블 이름을 바꿔 이전 형식의 기록을 무시하도록 함
+CACHE_TABLE_NAME = "subtitle_checks_v2"
+
+# 검사 규칙이나 오류 메시지 형식이 바뀌면 올려서 이전 결과를 무시하도록 함
+SUBTITLE_CHECK_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_subtitle_file(path):
+    """자막 파일 전체 내용의 blake2b 해시 (경로/수정 시각과 무관하게 같은 내용이면 같은 값)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SubtitleCheckCache:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+        self._lock = threading.Lock()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {CACHE_TABLE_NAME} ("
+                    " content_hash TEXT, version INTEGER, errors_json TEXT,"
+                    " PRIMARY KEY (content_hash, version))"
+                )
+        except sqlite3.Error as e:
+            print(f"자막 검사 캐시 초기화 실패 (캐시 없이 진행): {e}")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, content_hash):
+        """저장된 오류 목록 (오류가 없던 파일은 빈 목록), 기록이 없으면 None"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT errors_json FROM {CACHE_TABLE_NAME} WHERE content_hash = ? AND version = ?",
+                    (content_hash, SUBTITLE_CHECK_VERSION)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def record(self, content_hash, errors):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {CACHE_TABLE_NAME} (content_hash, version, errors_json) VALUES (?, ?, ?)",
+                    (content_hash, SUBTITLE_CHECK_VERSION, json.dumps(errors, ensure_ascii=False))
+                )
+        except sqlite3.Error as e:
+            print(f"자막 검사 캐시 저장 실패: {e}")
+
+
+def check_srt_cached(srt_path):
+    """check_srt_overlap과 같은 오류 목록. 같은 내용의 원본 파일을 검사한 기록이 있으면 재사용"""
+    try:
+        if cached_overlap_policy(srt_path) is not None:
+            # 겹침 수정된 cue가 메모리에 있으면 해시(파일 전체 읽기)보다 바로 검사하는 편이 빠름
+            return check_srt_overlap(srt_path)
+        content_hash = hash_subtitle_file(srt_path)
+    except OSError:
+        # 파일을 읽을 수 없으면 기존 검사의 오류 메시지를 그대로 사용 (캐시하지 않음)
+        return check_srt_overlap(srt_path)
+
+    cache = get_subtitle_check_cache()
+    errors = cache.get(content_hash)
+    if errors is None:
+        errors = check_srt_overlap(srt_path)
+        cache.record(content_hash, errors)
+    return errors
+
+
+_subtitle_check_cache = None
+_subtitle_check_cache_lock = threading.Lock()
+
+
+def get_subtitle_check_cache():
+    """프로세스 전역 SubtitleCheckCache (처음 호출 시 생성)"""
+    global _subtitle_check_cache
+    with _subtitle_check_cache_lock:
+        if _subtitle_check_cache is None:
+            _subtitle_check_cache = SubtitleCheckCache()
+        return _subtitle_check_cache
@@ -1,10 +1,24 @@
 # subtitle_checker.py
-import os
-from srt_overlap_error import check_srt_overlap
+from preflight import preflight
+
+def validate_subtitle_files(video_subtitle_pairs, concurrency=None):
+    """
+    배치의 모든 한글/영어 자막을 동시에 검사해 오류가 있는 파일을 전부 반환합니다.
+    내용이 바뀌지 않은 파일은 이전 검사 결과(subtitle_check_cache)를 재사용합니다.
+
+    Args:
+        video_subtitle_pairs:  [(video_file, korean_sub, english_sub), ...] 형태의 리스트
+
+    Returns:
+        dict: {오류 파일 경로: 오류 메시지 리스트} (배치 순서, 오류가 없으면 빈 dict)
+    """
+    return preflight(video_subtitle_pairs, probe_videos=False, concurrency=concurrency).subtitle_errors
+
 
 def check_subtitle_files(video_subtitle_pairs):
     """
     선택된 자막 파일들의 오류를 검사합니다.
+    validate_subtitle_files로 전체를 검사한 뒤 배치 순서상 첫 번째 오류를 반환합니다.
 
     Args:
         video_subtitle_pairs:  [(video_file, korean_sub, english_sub), ...] 형태의 리스트
@@ -12,13 +26,4 @@ def check_subtitle_files(video_subtitle_pairs):
     Returns:
         tuple | None: 오류가 있으면 (오류 파일 경로, 오류 메시지 리스트) 튜플 반환, 없으면 None
     """
-    for video, kor, eng in video_subtitle_pairs:
-        if kor:
-            errors = check_srt_overlap(kor)
-            if errors:
-                return kor, errors
-        if eng:
-            errors = check_srt_overlap(eng)
-            if errors:
-                return eng, errors
-    return None
\ No newline at end of file
+    return next(iter(validate_subtitle_files(video_subtitle_pairs).items()), None)
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import encoder_registry
+import output_cache
+import probe_cache
+
+FAKE_FFMPEG_SOURCE = os.path.join(os.path.dirname(__file__), 'fake_ffmpeg.py')
+
+
+def _install(directory, name):
+    path = os.path.join(directory, name)
+    with open(FAKE_FFMPEG_SOURCE, 'r', encoding='utf-8') as f:
+        source = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"#!{sys.executable}\n{source}")
+    os.chmod(path, 0o755)
+    return path
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """
+    ffmpeg / ffprobe를 tests/fake_ffmpeg.py로 대체하고, 캐시 디렉터리와 프로세스 공용 싱글턴을 비운 상태로 시작
+    반환값: configure(encoders / fail / probe_fail / sleep)로 동작을 바꾸고 calls()로 호출 기록을 읽는 객체
+    (peak_hardware_sessions()는 동시에 열린 하드웨어 인코더 수의 최댓값)
+    """
+    if sys.platform == 'win32':
+        pytest.skip("가짜 ffmpeg 실행 파일은 POSIX에서만 사용")
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log_path = tmp_path / 'ffmpeg_calls.jsonl'
+    ffmpeg = _install(str(bin_dir), 'ffmpeg')
+    ffprobe = _install(str(bin_dir), 'ffprobe')
+
+    monkeypatch.setenv('DUALSUB_FFMPEG', ffmpeg)
+    monkeypatch.setenv('DUALSUB_FFPROBE', ffprobe)
+    monkeypatch.setenv('DUALSUB_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('DUALSUB_TMPFS_DIR', str(tmp_path / 'shm'))
+    monkeypatch.setenv('DUALSUB_SCRATCH_DIR', str(tmp_path / 'scratch'))
+    monkeypatch.setenv('FAKE_FFMPEG_LOG', str(log_path))
+    monkeypatch.setattr(encoder_registry, '_registry', None)
+    monkeypatch.setattr(probe_cache, '_probe_cache', None)
+    monkeypatch.setattr(output_cache, '_output_cache', None)
+
+    def configure(encoders=None, fail=None, probe_fail=None, sleep=None):
+        if encoders is not None:
+            monkeypatch.setenv('FAKE_FFMPEG_ENCODERS', ','.join(encoders))
+        if fail is not None:
+            monkeypatch.setenv('FAKE_FFMPEG_FAIL', ','.join(fail))
+        if probe_fail is not None:
+            monkeypatch.setenv('FAKE_FFPROBE_FAIL', ','.join(probe_fail))
+        if sleep is not None:
+            monkeypatch.setenv('FAKE_FFMPEG_SLEEP', str(sleep))
+
+    def calls():
+        if not log_path.exists():
+            return []
+        return [json.loads(line) for line in log_path.read_text(encoding='utf-8').splitlines()]
+
+    def peak_hardware_sessions():
+        """기록된 ffmpeg 실행 구간에서 동시에 열린 하드웨어 인코더(-c:v가 lib*가 아닌 출력) 수의 최댓값"""
+        events = []
+        for call in calls():
+            args = call['args']
+            sessions = sum(1 for previous, arg in zip(args, args[1:])
+                           if previous == '-c:v' and not arg.startswith('lib'))
+            events.append((call['started'], sessions))
+            events.append((call['finished'], -sessions))
+        peak = current = 0
+        for _, change in sorted(events):  # 같은 시각이면 끝나는 쪽을 먼저 셈
+            current += change
+            peak = max(peak, current)
+        return peak
+
+    configure(encoders=['libx264'], fail=[], probe_fail=[], sleep=0)
+    return SimpleNamespace(ffmpeg=ffmpeg, ffprobe=ffprobe, configure=configure, calls=calls,
+                           peak_hardware_sessions=peak_hardware_sessions)
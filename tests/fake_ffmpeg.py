@@ -0,0 +1,116 @@
+# 테스트용 ffmpeg / ffprobe 대체 실행 파일 (conftest.fake_ffmpeg 픽스처가 실행 파일로 복사해서 사용)
+# - 호출 인자와 시작/종료 시각을 FAKE_FFMPEG_LOG에 JSON 줄로 기록 (종료할 때 한 줄)
+# - '-encoders': FAKE_FFMPEG_ENCODERS(쉼표 구분)의 인코더 목록 출력
+# - 인코딩: '-c:v'가 FAKE_FFMPEG_FAIL(쉼표 구분)에 있으면 실패, 아니면 FAKE_FFMPEG_SLEEP초 기다린 뒤
+#   출력 파일(-i 뒤가 아닌 영상 파일 인자 전부, 인자가 더 없으면 마지막 인자)을 만들고 성공
+#   HLS 출력(.m3u8)은 세그먼트 FAKE_HLS_SEGMENTS개(기본 2개)와 초기화 세그먼트, 끝난 재생 목록을 만듦
+# - ffprobe로 호출되면 640x360, 10초, aac 오디오인 영상 정보를 출력 (FAKE_FFPROBE_FAIL에 있는 파일 이름이면 실패)
+
+import json
+import os
+import sys
+import time
+
+MEDIA_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.m4v')
+# 값으로 파일 이름을 받는 옵션 (출력 파일이 아님)
+FILE_VALUE_OPTIONS = ('-i', '-hls_segment_filename', '-hls_fmp4_init_filename')
+
+
+def env_list(name):
+    return [value for value in os.environ.get(name, '').split(',') if value]
+
+
+def log(args, started):
+    path = os.environ.get('FAKE_FFMPEG_LOG')
+    if path:
+        record = {'program': os.path.basename(sys.argv[0]), 'args': args, 'started': started, 'finished': time.time()}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def ffprobe(args):
+    if os.path.basename(args[-1]) in env_list('FAKE_FFPROBE_FAIL'):
+        print(f"{args[-1]}: Invalid data found when processing input", file=sys.stderr)
+        return 1
+    if '-show_streams' in args:
+        print(json.dumps({
+            'streams': [
+                {'codec_type': 'video', 'codec_name': 'h264', 'width': 640, 'height': 360,
+                 'avg_frame_rate': '25/1', 'pix_fmt': 'yuv420p', 'bit_rate': '1000000'},
+                {'codec_type': 'audio', 'codec_name': 'aac'},
+            ],
+            'format': {'duration': '10.0', 'bit_rate': '1100000'},
+        }))
+    else:
+        print("0.000000,K_")
+    return 0
+
+
+def output_paths(args):
+    outputs = [arg for previous, arg in zip(args, args[1:])
+               if previous not in FILE_VALUE_OPTIONS and os.path.splitext(arg)[1].lower() in MEDIA_EXTENSIONS]
+    if not outputs and args and args[-1] != '-' and not args[-1].endswith('.m3u8'):
+        outputs = [args[-1]]
+    return outputs
+
+
+def write_hls_outputs(args):
+    """hls muxer 출력마다 ffmpeg처럼 세그먼트 / 초기화 세그먼트 / 끝난 EVENT 재생 목록 작성"""
+    segment_pattern = init_name = None
+    for previous, arg in zip(args, args[1:]):
+        if previous == '-hls_segment_filename':
+            segment_pattern = arg
+        elif previous == '-hls_fmp4_init_filename':
+            init_name = arg
+        elif arg.endswith('.m3u8') and previous not in FILE_VALUE_OPTIONS:
+            playlist_dir = os.path.dirname(arg)
+            lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-TARGETDURATION:6", "#EXT-X-PLAYLIST-TYPE:EVENT"]
+            if init_name:
+                with open(os.path.join(playlist_dir, init_name), 'wb') as f:
+                    f.write(b'\0' * 1000)
+                lines.append(f'#EXT-X-MAP:URI="{init_name}"')
+            for i in range(int(os.environ.get('FAKE_HLS_SEGMENTS') or 2)):
+                segment = segment_pattern % i
+                with open(segment, 'wb') as f:
+                    f.write(b'\0' * 5000)
+                lines.extend(["#EXTINF:6.000000,", os.path.basename(segment)])
+            lines.append("#EXT-X-ENDLIST")
+            with open(arg, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            segment_pattern = init_name = None
+
+
+def ffmpeg(args):
+    if '-encoders' in args:
+        for encoder in env_list('FAKE_FFMPEG_ENCODERS'):
+            print(f" V....D {encoder:<20} fake {encoder}")
+        return 0
+
+    encoder = args[args.index('-c:v') + 1] if '-c:v' in args else None
+    if encoder in env_list('FAKE_FFMPEG_FAIL'):
+        print(f"[{encoder}] fake failure: no device", file=sys.stderr)
+        return 1
+
+    time.sleep(float(os.environ.get('FAKE_FFMPEG_SLEEP') or 0))
+    for output_path in output_paths(args):
+        with open(output_path, 'wb') as f:
+            f.write(b'\0' * 20000)
+    write_hls_outputs(args)
+    if '-progress' in args:
+        print("out_time_us=10000000\nprogress=end", flush=True)
+    return 0
+
+
+def main():
+    args = sys.argv[1:]
+    started = time.time()
+    if 'ffprobe' in os.path.basename(sys.argv[0]):
+        returncode = ffprobe(args)
+    else:
+        returncode = ffmpeg(args)
+    log(args, started)
+    return returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# 병합 ASS 작성기 테스트 (트랙 병합 순서 / 캐시 사용 여부)
+
+import pytest
+
+import srt_cues
+from ass_writer import SubtitleTrack, write_merged_ass
+from srt_overlap_error import fix_srt_overlaps_in_memory
+
+# 파일 순서가 시작 시각 순서와 다른 자막
+OUT_OF_ORDER_SRT = (
+    "1\n00:00:05,000 --> 00:00:06,000\n셋\n\n"
+    "2\n00:00:01,000 --> 00:00:02,000\n하나\n\n"
+    "3\n00:00:03,000 --> 00:00:04,000\n둘\n"
+)
+ENGLISH_SRT = (
+    "1\n00:00:02,500 --> 00:00:03,500\none\n\n"
+    "2\n00:00:04,500 --> 00:00:05,500\ntwo\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cue_cache():
+    srt_cues.clear_cue_cache()
+    yield
+    srt_cues.clear_cue_cache()
+
+
+def fixed_layout(font_size, pos_y):
+    return lambda text: (font_size, 960, pos_y)
+
+
+def write(tmp_path, korean_text, english_text=ENGLISH_SRT):
+    korean = tmp_path / 'movie.ko.srt'
+    korean.write_text(korean_text, encoding='utf-8')
+    english = tmp_path / 'movie.en.srt'
+    english.write_text(english_text, encoding='utf-8')
+    tracks = [SubtitleTrack(str(english), 'English', fixed_layout(40, 900), True),
+              SubtitleTrack(str(korean), 'Korean', fixed_layout(48, 960), False)]
+    return str(korean), tracks
+
+
+def dialogue_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.startswith('Dialogue:')]
+
+
+def event_texts(path):
+    return [line.rsplit(',', 1)[1] for line in dialogue_lines(path)]
+
+
+def test_out_of_order_track_is_merged_by_start_time(tmp_path):
+    _, tracks = write(tmp_path, OUT_OF_ORDER_SRT)
+    merged = tmp_path / 'merged.ass'
+    write_merged_ass(str(merged), 1920, 1080, tracks, batch_size=2)
+
+    assert event_texts(merged) == ['하나', 'one', '둘', 'two', '셋']
+    assert dialogue_lines(merged)[0] == "Dialogue: 0,0:00:01.00,0:00:02.00,Korean48,,0,0,0,,하나"
+    # 캐시에 없는 자막은 이번 작업 동안만 읽고 캐시에 남기지 않음
+    assert srt_cues._cache == {}
+
+
+def test_streamed_and_cached_tracks_write_the_same_file(tmp_path):
+    korean, tracks = write(tmp_path, OUT_OF_ORDER_SRT.replace("00:00:06,000", "00:00:05,900"))
+    streamed = tmp_path / 'streamed.ass'
+    write_merged_ass(str(streamed), 1920, 1080, tracks)
+
+    # 겹침 수정 결과(시작 시각 순으로 정렬된 cue)가 캐시에 있으면 그것을 사용
+    fix_srt_overlaps_in_memory(korean, 'clamp')
+    cached = tmp_path / 'cached.ass'
+    write_merged_ass(str(cached), 1920, 1080, tracks)
+
+    assert cached.read_text(encoding='utf-8') == streamed.read_text(encoding='utf-8')
+
+
+def test_equal_start_times_keep_track_order(tmp_path):
+    _, tracks = write(tmp_path, "1\n00:00:02,500 --> 00:00:03,000\n같은 시각\n")
+    merged = tmp_path / 'merged.ass'
+    write_merged_ass(str(merged), 1920, 1080, tracks)
+    assert event_texts(merged) == ['one', '같은 시각', 'two']
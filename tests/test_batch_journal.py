@@ -0,0 +1,65 @@
+# 배치 저널 재개 시 미완성 출력 정리 테스트
+
+import os
+
+from batch_journal import BatchJournal, cleanup_orphans
+from scratch import SCRATCH_DIR_PREFIX
+
+
+def touch(path):
+    path.write_bytes(b'x')
+    return str(path)
+
+
+def subtitled_outputs(video):
+    base, ext = os.path.splitext(video)
+    return [f"{base}_subtitled{ext}"]
+
+
+def test_cleanup_removes_only_exact_partial_outputs(tmp_path, monkeypatch):
+    monkeypatch.setenv('DUALSUB_TMPFS_DIR', str(tmp_path / 'shm'))
+    video = touch(tmp_path / 'movie.mp4')
+    own_partial = touch(tmp_path / 'movie_subtitled.partial.mp4')
+    # 이름이 같은 접두어로 시작하는 다른 영상의 미완성 출력 (다른 작업이 쓰는 중일 수 있음)
+    other_partial = touch(tmp_path / 'movie_extra_subtitled.partial.mp4')
+    finished_output = touch(tmp_path / 'movie_subtitled.mp4')
+
+    removed = cleanup_orphans([video], subtitled_outputs, scratch_dir=str(tmp_path / 'scratch'))
+
+    assert removed == [own_partial]
+    assert not os.path.exists(own_partial)
+    assert os.path.exists(other_partial)
+    assert os.path.exists(finished_output)
+
+
+def test_cleanup_sweeps_scratch_left_by_dead_process(tmp_path, monkeypatch):
+    monkeypatch.setenv('DUALSUB_TMPFS_DIR', str(tmp_path / 'shm'))
+    scratch_root = tmp_path / 'scratch'
+    stale = scratch_root / f"{SCRATCH_DIR_PREFIX}999999999"
+    stale.mkdir(parents=True)
+    touch(stale / 'movie_upscaled_abc_temp.mp4')
+    live = scratch_root / f"{SCRATCH_DIR_PREFIX}{os.getpid()}"
+    live.mkdir()
+
+    cleanup_orphans([], subtitled_outputs, scratch_dir=str(scratch_root))
+
+    assert not stale.exists()
+    assert live.exists()
+
+
+def test_unfinished_batch_round_trip(tmp_path):
+    journal = BatchJournal(str(tmp_path / 'journal.sqlite3'))
+    jobs = [('a.mp4', 'a.ko.srt', None), ('b.mp4', None, 'b.en.srt')]
+    batch = journal.start_batch(jobs, {'padding_mode': 'none'}, batch_key='test')
+    batch.job_started(0)
+    batch.job_finished(0, ('Success', 'ok'))
+    batch.job_started(1)
+
+    unfinished = journal.find_unfinished('test')
+    assert unfinished['settings'] == {'padding_mode': 'none'}
+    assert unfinished['pending'] == [jobs[1]]
+    assert unfinished['pending_indices'] == [1]
+    assert unfinished['results'] == [('Success', 'ok')]
+
+    batch.finish()
+    assert journal.find_unfinished('test') is None
@@ -0,0 +1,106 @@
+# 분할 인코딩의 구간 계획 / 타임스탬프 오프셋 / concat 목록 / 하드웨어 세션 예약 테스트
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from batch_scheduler import HardwareSessionLimiter, reserved_hw_sessions
+from chunked_encoder import MIN_SEGMENT_SECONDS, _concat_list_entry, plan_segments, segment_filter
+from probe_cache import ProbeCache
+from scratch import SCRATCH_DIR_PREFIX, is_scratch_path
+
+
+def every(step, duration):
+    return [float(t) for t in range(0, int(duration), step)]
+
+
+def test_plan_segments_splits_at_nearest_keyframes():
+    segments = plan_segments(every(2, 600), 600.0, 4)
+    assert segments == [(0.0, 150.0), (150.0, 300.0), (300.0, 450.0), (450.0, None)]
+
+
+def test_plan_segments_uses_nearest_keyframe_not_exact_target():
+    keyframes = [0.0, 95.0, 190.0, 310.0]
+    assert plan_segments(keyframes, 400.0, 2) == [(0.0, 190.0), (190.0, None)]
+
+
+def test_plan_segments_is_relative_to_first_keyframe():
+    # 컨테이너 시작 시각이 1.4초인 경우에도 구간 경계는 0 기준
+    keyframes = [t + 1.4 for t in every(10, 300)]
+    segments = plan_segments(keyframes, 300.0, 2)
+    assert segments == [(0.0, 150.0), (150.0, None)]
+
+
+def test_plan_segments_skips_too_short_segments():
+    # 키프레임이 드물어 경계가 같은 위치로 몰리면 짧은 구간을 만들지 않음
+    keyframes = [0.0, 100.0]
+    segments = plan_segments(keyframes, 200.0, 4)
+    assert segments == [(0.0, 100.0), (100.0, None)]
+    for start, end in segments:
+        assert (end if end is not None else 200.0) - start >= MIN_SEGMENT_SECONDS
+
+
+@pytest.mark.parametrize('keyframes, duration, count', [
+    ([], 600.0, 4),
+    ([0.0, 10.0], 0.0, 4),
+    (every(2, 600), 600.0, 1),
+    ([0.0], 600.0, 4),
+])
+def test_plan_segments_falls_back_to_single_segment(keyframes, duration, count):
+    assert plan_segments(keyframes, duration, count) == [(0.0, None)]
+
+
+def test_segment_filter_offsets_timestamps_around_subtitles():
+    assert segment_filter("ass='a.ass'", 0.0) == "ass='a.ass'"
+    assert segment_filter("pad=iw:1440:0:180:black,ass='a.ass'", 150.5) == (
+        "setpts=PTS+150.500000/TB,pad=iw:1440:0:180:black,ass='a.ass',setpts=PTS-STARTPTS"
+    )
+
+
+def test_concat_list_entry_escapes_quotes_and_sets_duration():
+    assert _concat_list_entry("/tmp/a'b.mkv", 150.0, 300.0) == "file '/tmp/a'\\''b.mkv'\nduration 150.000000\n"
+    assert _concat_list_entry("/tmp/last.mkv", 300.0, None) == "file '/tmp/last.mkv'\n"
+
+
+def test_hardware_limiter_reserves_several_sessions_at_once():
+    limiter = HardwareSessionLimiter(2)
+    with limiter.reserve(4) as granted:
+        assert granted == 2  # 최대 세션 수로 제한
+        assert reserved_hw_sessions() == 2
+
+        acquired = threading.Event()
+
+        def other_job():
+            with limiter.reserve(1):
+                acquired.set()
+
+        thread = threading.Thread(target=other_job)
+        thread.start()
+        time.sleep(0.05)
+        assert not acquired.is_set()  # 분할 작업이 세션을 모두 잡고 있는 동안 대기
+    thread.join(timeout=1)
+    assert acquired.is_set()
+    assert reserved_hw_sessions(default=7) == 7
+
+
+def test_scratch_probe_results_are_not_persisted(tmp_path):
+    scratch_dir = tmp_path / f"{SCRATCH_DIR_PREFIX}{os.getpid()}"
+    scratch_dir.mkdir()
+    temp_video = scratch_dir / 'movie_upscaled_x_temp.mp4'
+    temp_video.write_bytes(b'0' * 16)
+    video = tmp_path / 'movie.mp4'
+    video.write_bytes(b'0' * 16)
+    assert is_scratch_path(str(temp_video)) and not is_scratch_path(str(video))
+
+    output = json.dumps({'streams': [{'codec_type': 'video', 'width': 640, 'height': 360}], 'format': {}})
+    cache = ProbeCache(db_path=str(tmp_path / 'probe.sqlite3'))
+    assert cache.record_probe(str(temp_video), output).width == 640
+    assert cache.record_probe(str(video), output).width == 640
+    assert cache.lookup(str(temp_video)).height == 360  # 작업 중에는 메모리에서 재사용
+
+    fresh = ProbeCache(db_path=str(tmp_path / 'probe.sqlite3'))
+    assert fresh.lookup(str(temp_video)) is None
+    assert fresh.lookup(str(video)).width == 640
@@ -0,0 +1,56 @@
+# 헤드리스 CLI 배치 실행 테스트 (가짜 ffmpeg 사용)
+
+import json
+
+import cli
+import srt_cues
+from job_result import ERROR_INPUT
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n안녕\n"
+
+
+def run_cli(capsys, *argv):
+    exit_code = cli.main([*argv, '--quiet'])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return exit_code, sorted(records, key=lambda record: record['index'])
+
+
+def test_videos_that_fail_probe_are_reported_before_encoding(fake_ffmpeg, tmp_path, capsys):
+    fake_ffmpeg.configure(probe_fail=['broken.mp4'])
+    for name in ('good.mp4', 'broken.mp4'):
+        (tmp_path / name).write_bytes(b'fake video')
+    (tmp_path / 'ko.srt').write_text(SRT, encoding='utf-8')
+    manifest = tmp_path / 'jobs.csv'
+    manifest.write_text("video,korean_srt\ngood.mp4,ko.srt\nbroken.mp4,ko.srt\n", encoding='utf-8')
+
+    exit_code, records = run_cli(capsys, str(manifest), '--resolution', 'none')
+
+    assert exit_code == 1
+    assert records[0]['status'] == 'Success'
+    assert records[1]['status'] == 'Error'
+    assert records[1]['error_category'] == ERROR_INPUT
+    assert 'Invalid data' in records[1]['message']
+    # 실패한 영상은 인코딩을 시도하지 않음
+    encodes = [call for call in fake_ffmpeg.calls() if call['program'] == 'ffmpeg' and '-i' in call['args']]
+    assert all('broken.mp4' not in ' '.join(call['args']) for call in encodes)
+    # 사전 점검에서 캐시한 자막 cue는 배치가 끝나면 남지 않음
+    assert srt_cues._cache == {}
+
+
+def test_invalid_json_manifest_values_fail_only_their_rows(fake_ffmpeg, tmp_path, capsys):
+    (tmp_path / 'good.mp4').write_bytes(b'fake video')
+    (tmp_path / 'ko.srt').write_text(SRT, encoding='utf-8')
+    manifest = tmp_path / 'jobs.json'
+    manifest.write_text(json.dumps({'jobs': [
+        {'video': 'good.mp4', 'korean_srt': 'ko.srt', 'target_resolution': 1080},
+        {'video': ['good.mp4'], 'korean_srt': 'ko.srt'},
+        {'video': 'good.mp4', 'korean_srt': 'ko.srt', 'padding_mode': None},
+    ]}), encoding='utf-8')
+
+    exit_code, records = run_cli(capsys, str(manifest))
+
+    assert exit_code == 1
+    assert [record['status'] for record in records] == ['Error', 'Error', 'Success']
+    assert records[0]['error_category'] == ERROR_INPUT
+    assert '1080' in records[0]['message']
+    assert 'video' in records[1]['message']
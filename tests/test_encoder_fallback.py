@@ -0,0 +1,104 @@
+# 인코더 테스트 인코딩 순위 / 감지 캐시 / 실패 시 다음 인코더로 다시 시도 (가짜 ffmpeg 사용)
+
+from encoder_registry import EncoderRegistry, get_encoder_registry
+from job_result import ERROR_ENCODE
+from video_processor_manager import VideoProcessorManager
+
+ALL_ENCODERS = ['h264_nvenc', 'h264_qsv', 'h264_amf', 'h264_vaapi', 'libx264']
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n안녕\n\n2\n00:00:03,000 --> 00:00:04,000\n세상\n"
+
+
+def trial_encoders(calls):
+    return [call['args'][call['args'].index('-c:v') + 1] for call in calls
+            if call['program'] == 'ffmpeg' and 'null' in call['args']]
+
+
+def make_job(tmp_path):
+    video = tmp_path / 'movie.mp4'
+    video.write_bytes(b'fake video')
+    korean = tmp_path / 'movie.ko.srt'
+    korean.write_text(SRT, encoding='utf-8')
+    return str(video), str(korean)
+
+
+def test_trial_encode_ranks_working_encoders(fake_ffmpeg):
+    fake_ffmpeg.configure(encoders=ALL_ENCODERS, fail=['h264_qsv', 'h264_vaapi'])
+    registry = EncoderRegistry()
+    assert registry.encoder_chain() == ['h264_nvenc', 'h264_amf', 'libx264']
+    assert registry.get_encoder() == 'h264_nvenc'
+    # 빌드에 포함된 하드웨어 인코더만 우선순위대로 테스트 (소프트웨어 인코더는 테스트하지 않음)
+    assert trial_encoders(fake_ffmpeg.calls()) == ['h264_nvenc', 'h264_qsv', 'h264_amf', 'h264_vaapi']
+
+
+def test_unlisted_hardware_encoders_are_not_tried(fake_ffmpeg):
+    fake_ffmpeg.configure(encoders=['h264_vaapi', 'libx264'])
+    assert EncoderRegistry().encoder_chain() == ['h264_vaapi', 'libx264']
+    assert trial_encoders(fake_ffmpeg.calls()) == ['h264_vaapi']
+
+
+def test_capabilities_cache_hit_skips_probing(fake_ffmpeg):
+    fake_ffmpeg.configure(encoders=ALL_ENCODERS, fail=['h264_nvenc'])
+    first = EncoderRegistry().encoder_chain()
+    probe_calls = len(fake_ffmpeg.calls())
+
+    second = EncoderRegistry()
+    assert second.encoder_chain() == first == ['h264_qsv', 'h264_amf', 'h264_vaapi', 'libx264']
+    assert len(fake_ffmpeg.calls()) == probe_calls
+
+    second.invalidate()
+    second.encoder_chain()
+    assert len(fake_ffmpeg.calls()) > probe_calls
+
+
+def test_failed_encode_falls_back_to_next_encoder(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.configure(encoders=['h264_nvenc', 'libx264'])
+    registry = get_encoder_registry()
+    assert registry.encoder_chain() == ['h264_nvenc', 'libx264']
+
+    # 테스트 인코딩은 통과했지만 실제 작업에서는 NVENC가 실패하는 경우
+    fake_ffmpeg.configure(fail=['h264_nvenc'])
+    video, korean = make_job(tmp_path)
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False)
+    result, encoder = manager.process_with_fallback(video, korean, None)
+
+    assert result.status == 'Success', result.message
+    assert encoder == 'libx264'
+    assert result.attempted_encoders == ['h264_nvenc']
+    assert (tmp_path / 'movie_subtitled.mp4').exists()
+    # 이번 프로세스에서는 다음 작업부터 바로 libx264 사용
+    assert registry.encoder_chain() == ['libx264']
+    # 일시적인 실패일 수 있으므로 디스크 캐시에는 남기지 않음
+    assert EncoderRegistry().encoder_chain() == ['h264_nvenc', 'libx264']
+
+
+def test_failure_with_every_encoder_keeps_chain(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.configure(encoders=['h264_nvenc', 'libx264'])
+    registry = get_encoder_registry()
+    registry.encoder_chain()
+
+    fake_ffmpeg.configure(fail=['h264_nvenc', 'libx264'])
+    video, korean = make_job(tmp_path)
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False)
+    result, encoder = manager.process_with_fallback(video, korean, None)
+
+    assert result.status == 'Error'
+    assert result.error_category == ERROR_ENCODE
+    assert encoder == 'libx264'
+    assert result.attempted_encoders == ['h264_nvenc']
+    # 모든 인코더가 실패하면 입력 문제로 보고 체인은 그대로 둠
+    assert registry.encoder_chain() == ['h264_nvenc', 'libx264']
+
+
+def test_non_encode_errors_are_not_retried(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.configure(encoders=['h264_nvenc', 'libx264'], fail=[])
+    video, _ = make_job(tmp_path)
+    broken = tmp_path / 'broken.srt'
+    broken.write_bytes(b'\xff\xfe not utf-8 \x80')
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False)
+    result, encoder = manager.process_with_fallback(video, str(broken), None)
+
+    assert result.status == 'Error'
+    assert result.error_category != ERROR_ENCODE
+    assert encoder == 'h264_nvenc'
+    assert result.attempted_encoders == []
@@ -0,0 +1,142 @@
+# HLS 출력 테스트: 단계 계획 / master 재생 목록 / hls muxer 인자 / 출력 교체 / 하드웨어 세션 수 (가짜 ffmpeg 사용)
+
+import os
+
+import pytest
+
+from batch_scheduler import BatchScheduler
+from hls_output import DEFAULT_LADDER, build_master_playlist, hls_output_files, ladder_rungs, plan_ladder
+from video_processor_manager import VideoProcessorManager
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n안녕\n"
+
+
+def make_job(tmp_path, name='movie'):
+    video = tmp_path / f"{name}.mp4"
+    video.write_bytes(b'fake video')
+    korean = tmp_path / f"{name}.ko.srt"
+    korean.write_text(SRT, encoding='utf-8')
+    return str(video), str(korean), None
+
+
+def encode_args(fake_ffmpeg):
+    calls = [call['args'] for call in fake_ffmpeg.calls()
+             if call['program'] == 'ffmpeg' and '-filter_complex' in call['args']]
+    return calls[-1]
+
+
+def option_values(args, option):
+    return [args[i + 1] for i, arg in enumerate(args) if arg == option]
+
+
+def test_plan_ladder_scales_padded_canvas_per_rung():
+    # 1920x1080 영상 + 상하단 패딩(캔버스 1440) → 단계마다 같은 비율로 축소, 크기는 짝수
+    assert plan_ladder(1920, 1080, 1440) == [
+        (DEFAULT_LADDER[0], 1920, 1440),
+        (DEFAULT_LADDER[1], 1280, 960),
+        (DEFAULT_LADDER[2], 854, 640),
+    ]
+
+
+def test_plan_ladder_skips_rungs_larger_than_video():
+    assert [rung.name for rung, _, _ in plan_ladder(1280, 720, 720)] == ['720p', '480p']
+    # 모든 단계가 영상보다 크면 가장 낮은 단계의 비트레이트로 원본 크기 하나
+    (rung, width, height), = plan_ladder(640, 360, 360)
+    assert (rung.name, rung.height, rung.bitrate, width, height) == ('360p', 360, '1400k', 640, 360)
+    assert len(ladder_rungs(360)) == 1
+
+
+def test_master_playlist_lists_rungs_with_bandwidth_and_resolution():
+    playlist = build_master_playlist(plan_ladder(1280, 720, 720), 'fmp4')
+    assert playlist.splitlines() == [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        "#EXT-X-STREAM-INF:BANDWIDTH=4328000,RESOLUTION=1280x720",  # 2800k * 1.5 + 오디오 128k
+        "720p/index.m3u8",
+        "#EXT-X-STREAM-INF:BANDWIDTH=2228000,RESOLUTION=854x480",
+        "480p/index.m3u8",
+    ]
+    assert build_master_playlist(plan_ladder(1280, 720, 720), 'ts').splitlines()[1] == "#EXT-X-VERSION:3"
+
+
+@pytest.mark.parametrize('segment_type, muxer_type, extension', [('fmp4', 'fmp4', 'm4s'), ('ts', 'mpegts', 'ts')])
+def test_hls_command_and_output(fake_ffmpeg, tmp_path, segment_type, muxer_type, extension):
+    video, korean, english = make_job(tmp_path)
+    manager = VideoProcessorManager('top_bottom', True, 1280, 720, use_output_cache=False, hls=segment_type)
+    result = manager.process_single_video(video, korean, english)
+    assert result.status == 'Success', result.message
+
+    args = encode_args(fake_ffmpeg)
+    chains = option_values(args, '-filter_complex')[0].split(';')
+    # 스케일/패딩/자막을 한 번 적용한 뒤 단계별로 나눠 축소
+    assert chains[0].startswith("[0:v]scale=") and ",pad=iw:1080:0:180:black,ass=" in chains[0]
+    assert chains[0].endswith(",split=2[v0][v1]")
+    assert chains[1:] == ["[v0]scale=1280:1080[out0]", "[v1]scale=854:720[out1]"]
+
+    assert option_values(args, '-map') == ['[out0]', '0:a:0?', '[out1]', '0:a:0?']
+    assert option_values(args, '-c:a') == ['copy', 'copy']  # 원본 오디오가 AAC
+    assert option_values(args, '-f') == ['hls', 'hls']
+    assert option_values(args, '-hls_time') == ['6', '6']
+    assert option_values(args, '-hls_playlist_type') == ['event', 'event']
+    assert option_values(args, '-hls_segment_type') == [muxer_type, muxer_type]
+    assert option_values(args, '-hls_flags') == ['independent_segments+temp_file'] * 2
+    assert option_values(args, '-force_key_frames') == ['expr:gte(t,n_forced*6)'] * 2
+    assert option_values(args, '-sc_threshold') == ['0', '0']  # 소프트웨어 인코더는 장면 전환 키프레임 끔
+    assert option_values(args, '-hls_fmp4_init_filename') == (['init.mp4'] * 2 if segment_type == 'fmp4' else [])
+
+    # 인코딩 중에는 미완성 디렉터리에 쓰고, 성공하면 최종 디렉터리로 교체
+    build_dir = tmp_path / 'movie_with_padding_hls.partial'
+    output_dir = tmp_path / 'movie_with_padding_hls'
+    assert option_values(args, '-hls_segment_filename') == [
+        str(build_dir / '720p' / f"seg_%05d.{extension}"), str(build_dir / '480p' / f"seg_%05d.{extension}")]
+    assert args[-1] == str(build_dir / '480p' / 'index.m3u8')
+    assert not build_dir.exists()
+    assert (output_dir / 'master.m3u8').read_text(encoding='utf-8').count("#EXT-X-STREAM-INF") == 2
+    assert len(hls_output_files(str(output_dir / 'master.m3u8'))) == 1 + 2 * (3 + (segment_type == 'fmp4'))
+
+
+def test_failed_rerun_keeps_previous_output(fake_ffmpeg, tmp_path):
+    video, korean, english = make_job(tmp_path)
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False, hls='fmp4')
+    assert manager.process_single_video(video, korean, english).status == 'Success'
+    output_dir = tmp_path / 'movie_subtitled_hls'
+    previous = hls_output_files(str(output_dir / 'master.m3u8'))
+
+    fake_ffmpeg.configure(fail=['libx264'])
+    result = manager.process_single_video(video, korean, english)
+
+    assert result.status == 'Error'
+    assert hls_output_files(str(output_dir / 'master.m3u8')) == previous
+    assert all(os.path.exists(path) for path in previous)
+    assert not (tmp_path / 'movie_subtitled_hls.partial').exists()
+
+
+def test_successful_rerun_replaces_previous_output(fake_ffmpeg, tmp_path, monkeypatch):
+    video, korean, english = make_job(tmp_path)
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False, hls='ts')
+    monkeypatch.setenv('FAKE_HLS_SEGMENTS', '4')
+    assert manager.process_single_video(video, korean, english).status == 'Success'
+    monkeypatch.setenv('FAKE_HLS_SEGMENTS', '2')
+    assert manager.process_single_video(video, korean, english).status == 'Success'
+
+    output_dir = tmp_path / 'movie_subtitled_hls'
+    # 이전 출력의 세그먼트가 섞이지 않음
+    assert sorted(os.listdir(output_dir / '360p')) == ['index.m3u8', 'seg_00000.ts', 'seg_00001.ts']
+    assert not (tmp_path / 'movie_subtitled_hls.old').exists()
+
+
+def test_hardware_sessions_match_planned_rungs(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.configure(encoders=['h264_nvenc', 'libx264'], sleep=0.3)
+    video, _, _ = make_job(tmp_path)
+    assert VideoProcessorManager('none', False, 0, 0, hls='fmp4').processor.hw_sessions_needed(video) == 1
+    manager = VideoProcessorManager('none', True, 1920, 1080, use_output_cache=False, hls='fmp4')
+    assert manager.processor.hw_sessions_needed(video) == 3
+
+    jobs = [make_job(tmp_path, name) for name in ('first', 'second')]
+    scheduler = BatchScheduler(manager, max_workers=2, max_hw_sessions=4)
+    results = [result for _, _, result in scheduler.run(jobs)]
+
+    assert all(result.status == 'Success' and result.encoder == 'h264_nvenc' for result in results)
+    # 단계 3개를 인코딩하는 작업 두 개가 겹쳐 실행되면 세션 6개가 됨
+    assert fake_ffmpeg.peak_hardware_sessions() <= scheduler.max_hw_sessions
@@ -0,0 +1,80 @@
+# 세 레이아웃 동시 출력 테스트 (가짜 ffmpeg 사용): filter_complex / -map 구성과 하드웨어 세션 수
+
+import os
+
+from batch_scheduler import BatchScheduler
+from video_processor_manager import VideoProcessorManager
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n안녕\n"
+
+OUTPUT_SUFFIXES = ('_subtitled', '_with_padding', '_with_bottompadding')
+
+
+def make_job(tmp_path, name='movie'):
+    video = tmp_path / f"{name}.mp4"
+    video.write_bytes(b'fake video')
+    korean = tmp_path / f"{name}.ko.srt"
+    korean.write_text(SRT, encoding='utf-8')
+    english = tmp_path / f"{name}.en.srt"
+    english.write_text(SRT.replace('안녕', 'hello'), encoding='utf-8')
+    return str(video), str(korean), str(english)
+
+
+def encode_calls(fake_ffmpeg):
+    return [call for call in fake_ffmpeg.calls()
+            if call['program'] == 'ffmpeg' and '-filter_complex' in call['args']]
+
+
+def option_values(args, option):
+    return [args[i + 1] for i, arg in enumerate(args) if arg == option]
+
+
+def test_one_ffmpeg_writes_all_three_layouts(fake_ffmpeg, tmp_path):
+    video, korean, english = make_job(tmp_path)
+    manager = VideoProcessorManager('all', False, 0, 0, use_output_cache=False)
+    result = manager.process_single_video(video, korean, english)
+    assert result.status == 'Success', result.message
+
+    calls = encode_calls(fake_ffmpeg)
+    assert len(calls) == 1  # 디코딩은 한 번
+    args = calls[0]['args']
+    assert option_values(args, '-i') == [video]
+
+    chains = option_values(args, '-filter_complex')[0].split(';')
+    assert chains[0] == "[0:v]split=3[v0][v1][v2]"
+    assert chains[1].startswith("[v0]ass=") and chains[1].endswith("[out0]")
+    assert chains[2].startswith("[v1]pad=iw:720:0:180:black,ass=") and chains[2].endswith("[out1]")
+    assert chains[3].startswith("[v2]pad=") and chains[3].endswith("[out2]")
+
+    # 출력마다 필터 결과 하나 + 원본 오디오, 미완성 이름으로 쓴 뒤 최종 이름으로 교체
+    assert option_values(args, '-map') == ['[out0]', '0:a?', '[out1]', '0:a?', '[out2]', '0:a?']
+    assert option_values(args, '-c:v') == ['libx264'] * 3
+    assert option_values(args, '-c:a') == ['copy'] * 3
+    for suffix in OUTPUT_SUFFIXES:
+        assert str(tmp_path / f"movie{suffix}.partial.mp4") in args
+        assert os.path.exists(tmp_path / f"movie{suffix}.mp4")
+        assert not os.path.exists(tmp_path / f"movie{suffix}.partial.mp4")
+
+
+def test_upscale_is_applied_once_before_split(fake_ffmpeg, tmp_path):
+    video, korean, english = make_job(tmp_path)
+    manager = VideoProcessorManager('all', True, 1280, 720, use_output_cache=False)
+    assert manager.process_single_video(video, korean, english).status == 'Success'
+
+    chains = option_values(encode_calls(fake_ffmpeg)[0]['args'], '-filter_complex')[0].split(';')
+    assert chains[0].startswith("[0:v]scale=") and chains[0].endswith(",split=3[v0][v1][v2]")
+    assert all('scale=' not in chain for chain in chains[1:])
+
+
+def test_concurrent_jobs_stay_within_hardware_session_limit(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.configure(encoders=['h264_nvenc', 'libx264'], sleep=0.3)
+    jobs = [make_job(tmp_path, name) for name in ('first', 'second')]
+    manager = VideoProcessorManager('all', False, 0, 0, use_output_cache=False)
+    scheduler = BatchScheduler(manager, max_workers=2, max_hw_sessions=3)
+
+    results = [result for _, _, result in scheduler.run(jobs)]
+
+    assert all(result.status == 'Success' and result.encoder == 'h264_nvenc' for result in results)
+    assert len(encode_calls(fake_ffmpeg)) == 2
+    # 작업마다 레이아웃 3개를 동시에 인코딩하므로 두 작업이 겹쳐 실행되면 세션 6개가 됨
+    assert fake_ffmpeg.peak_hardware_sessions() <= scheduler.max_hw_sessions
@@ -0,0 +1,85 @@
+# 출력 캐시 유효성 검사 테스트 (HLS 출력은 재생 목록과 세그먼트 전체를 확인)
+
+import os
+
+import pytest
+
+from hls_output import DEFAULT_LADDER, build_master_playlist, hls_output_files
+from output_cache import OutputCache
+
+FINGERPRINT = 'abc123'
+
+
+def write_hls_output(output_dir, rungs=DEFAULT_LADDER[1:], segments=3):
+    planned = [(rung, rung.height * 16 // 9, rung.height) for rung in rungs]
+    os.makedirs(output_dir)
+    master = os.path.join(output_dir, 'master.m3u8')
+    with open(master, 'w', encoding='utf-8') as f:
+        f.write(build_master_playlist(planned, 'fmp4'))
+    for rung in rungs:
+        rung_dir = os.path.join(output_dir, rung.name)
+        os.makedirs(rung_dir)
+        lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-PLAYLIST-TYPE:EVENT", '#EXT-X-MAP:URI="init.mp4"']
+        with open(os.path.join(rung_dir, 'init.mp4'), 'wb') as f:
+            f.write(b'i' * 100)
+        for i in range(segments):
+            lines.extend(["#EXTINF:6.000000,", f"seg_{i:05d}.m4s"])
+            with open(os.path.join(rung_dir, f"seg_{i:05d}.m4s"), 'wb') as f:
+                f.write(b's' * 1000)
+        lines.append("#EXT-X-ENDLIST")
+        with open(os.path.join(rung_dir, 'index.m3u8'), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    return master
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OutputCache(db_path=str(tmp_path / 'outputs.sqlite3'))
+
+
+def test_hls_output_files_lists_playlists_and_segments(tmp_path):
+    master = write_hls_output(str(tmp_path / 'movie_hls'))
+    files = hls_output_files(master)
+    assert files[0] == master
+    assert len(files) == 1 + 2 * (1 + 1 + 3)  # master + 단계마다 (재생 목록, init, 세그먼트 3개)
+    assert os.path.join(str(tmp_path / 'movie_hls'), '720p', 'init.mp4') in files
+
+
+def test_hls_cache_hit_requires_intact_output(cache, tmp_path):
+    master = write_hls_output(str(tmp_path / 'movie_hls'))
+    cache.record(master, FINGERPRINT)
+    assert cache.is_valid(master, FINGERPRINT)
+    assert not cache.is_valid(master, 'other')
+
+    # 세그먼트가 잘리면 master가 그대로여도 다시 인코딩
+    segment = tmp_path / 'movie_hls' / '480p' / 'seg_00001.m4s'
+    with open(segment, 'r+b') as f:
+        f.truncate(10)
+    assert not cache.is_valid(master, FINGERPRINT)
+
+
+@pytest.mark.parametrize('missing', ['480p/seg_00002.m4s', '720p/init.mp4', '720p/index.m3u8'])
+def test_hls_cache_miss_when_file_is_missing(cache, tmp_path, missing):
+    master = write_hls_output(str(tmp_path / 'movie_hls'))
+    cache.record(master, FINGERPRINT)
+    os.remove(tmp_path / 'movie_hls' / missing)
+    assert not cache.is_valid(master, FINGERPRINT)
+
+
+def test_unfinished_hls_playlist_is_not_recorded(cache, tmp_path):
+    master = write_hls_output(str(tmp_path / 'movie_hls'))
+    playlist = tmp_path / 'movie_hls' / '720p' / 'index.m3u8'
+    playlist.write_text(playlist.read_text(encoding='utf-8').replace("#EXT-X-ENDLIST\n", ""), encoding='utf-8')
+    with pytest.raises(ValueError):
+        hls_output_files(master)
+    cache.record(master, FINGERPRINT)
+    assert not cache.is_valid(master, FINGERPRINT)
+
+
+def test_single_file_output(cache, tmp_path):
+    output = tmp_path / 'movie_subtitled.mp4'
+    output.write_bytes(b'x' * 100)
+    cache.record(str(output), FINGERPRINT)
+    assert cache.is_valid(str(output), FINGERPRINT)
+    output.write_bytes(b'x' * 50)
+    assert not cache.is_valid(str(output), FINGERPRINT)
@@ -0,0 +1,130 @@
+# 겹침 해결 정책(clamp / merge / stack / strict)과 메모리 수정 테스트
+
+import pytest
+
+import srt_cues
+from srt_cues import Cue, SubtitleCues, load_cues
+from srt_overlap_error import (
+    OVERLAP_POLICIES, SevereOverlapError, check_srt_overlap, fix_srt_overlaps, fix_srt_overlaps_in_memory,
+    resolve_overlaps,
+)
+
+
+def cues_of(*cues):
+    return SubtitleCues.from_cues([Cue(str(i + 1), start, end, text) for i, (start, end, text) in enumerate(cues)])
+
+
+def times(cues):
+    return [(cue.start_ms, cue.end_ms) for cue in cues]
+
+
+def overlap_free(cues):
+    return all(end <= start for end, start in zip(cues.ends[:-1], cues.starts[1:]))
+
+
+# 시작 시간 순서가 뒤섞인 입력 (3초, 5초, 1초)
+UNSORTED = cues_of((3000, 4000, 'b'), (5000, 6000, 'c'), (1000, 2000, 'a'))
+
+
+@pytest.fixture(autouse=True)
+def empty_cue_cache():
+    srt_cues.clear_cue_cache()
+    yield
+    srt_cues.clear_cue_cache()
+
+
+@pytest.mark.parametrize('policy', OVERLAP_POLICIES)
+def test_unsorted_input_is_sorted_without_inverted_times(policy):
+    resolved, report = resolve_overlaps(UNSORTED, policy)
+    assert [cue.text for cue in resolved] == ['a', 'b', 'c']
+    assert all(cue.end_ms >= cue.start_ms for cue in resolved)
+    assert report.reordered == 3
+    assert resolved.overlap_policy == policy
+
+
+def test_strict_fix_sorts_unsorted_overlapping_input():
+    unsorted = cues_of((3000, 6000, 'b'), (1000, 3500, 'a'), (5000, 7000, 'c'))
+    fixed, fixed_count = fix_srt_overlaps(unsorted)
+    assert times(fixed) == [(1000, 3000), (3000, 5000), (5000, 7000)]
+    assert fixed_count == 2
+
+
+def test_strict_raises_on_severe_overlap():
+    # 다음 cue의 종료 시간이 시작보다 앞서 있어 잘라도 종료 시간 순서가 맞지 않음
+    inverted = cues_of((1000, 5000, 'a'), (2000, 1500, 'b'))
+    with pytest.raises(SevereOverlapError):
+        resolve_overlaps(inverted, 'strict', 'inverted.srt')
+
+
+def test_clamp_trims_and_drops_same_start():
+    overlapping = cues_of((1000, 3000, 'a'), (2000, 4000, 'b'), (2000, 2500, 'c'), (5000, 5000, 'empty'))
+    resolved, report = resolve_overlaps(overlapping, 'clamp')
+    assert [(cue.start_ms, cue.end_ms, cue.text) for cue in resolved] == [
+        (1000, 2000, 'a'), (2000, 2500, 'c'),
+    ]
+    assert report.dropped == 2  # 길이 0 cue와 같은 시작 시간의 앞 cue
+    assert report.clamped == 2
+
+
+def test_merge_splits_multiway_overlap_at_boundaries():
+    overlapping = cues_of((1000, 4000, 'a'), (2000, 3000, 'b'), (2500, 5000, 'c'))
+    resolved, report = resolve_overlaps(overlapping, 'merge')
+    assert [(cue.start_ms, cue.end_ms, cue.text) for cue in resolved] == [
+        (1000, 2000, 'a'),
+        (2000, 2500, 'a\nb'),
+        (2500, 3000, 'a\nb\nc'),
+        (3000, 4000, 'a\nc'),
+        (4000, 5000, 'c'),
+    ]
+    assert report.merged == 3
+    assert overlap_free(resolved)
+
+
+def test_stack_keeps_times_and_assigns_lowest_free_slot():
+    overlapping = cues_of((1000, 4000, 'a'), (2000, 3000, 'b'), (3000, 5000, 'c'), (3500, 4500, 'd'))
+    resolved, report = resolve_overlaps(overlapping, 'stack')
+    assert times(resolved) == times(overlapping)
+    assert [cue.slot for cue in resolved] == [0, 1, 1, 2]
+    assert report.stacked == 3
+
+
+def test_no_overlap_is_unchanged():
+    clean = cues_of((1000, 2000, 'a'), (2000, 3000, 'b'))
+    for policy in OVERLAP_POLICIES:
+        resolved, report = resolve_overlaps(clean, policy)
+        assert times(resolved) == times(clean)
+        assert report.changed_count == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        resolve_overlaps(UNSORTED, 'shuffle')
+
+
+def test_fix_in_memory_stores_resolved_cues(tmp_path):
+    path = tmp_path / 'unsorted.srt'
+    path.write_text(
+        "1\n00:00:03,000 --> 00:00:04,000\nb\n\n"
+        "2\n00:00:05,000 --> 00:00:06,000\nc\n\n"
+        "3\n00:00:01,000 --> 00:00:03,500\na\n",
+        encoding='utf-8'
+    )
+    report = fix_srt_overlaps_in_memory(str(path), 'clamp')
+    assert report.reordered == 3 and report.clamped == 1
+    assert times(load_cues(str(path))) == [(1000, 3000), (3000, 4000), (5000, 6000)]
+    assert check_srt_overlap(str(path)) == []
+    # 같은 정책으로 다시 호출하면 캐시된 결과를 그대로 사용
+    assert fix_srt_overlaps_in_memory(str(path), 'clamp').changed_count == 0
+
+
+@pytest.mark.parametrize('policy', OVERLAP_POLICIES)
+def test_single_cue_file_drops_malformed_block_warnings_like_larger_files(tmp_path, policy):
+    path = tmp_path / 'single.srt'
+    path.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\n하나\n\n"
+        "2\n잘못된 시간 줄\n둘\n",
+        encoding='utf-8'
+    )
+    assert load_cues(str(path)).warnings  # 원본 파싱에서는 형식 오류 경고가 있음
+    fix_srt_overlaps_in_memory(str(path), policy)
+    assert check_srt_overlap(str(path)) == []
@@ -0,0 +1,91 @@
+# 소프트 자막 mux 명령 테스트 (가짜 ffmpeg 사용): 컨테이너별 자막 코덱 / 언어·기본 트랙 / faststart
+
+import os
+
+import pytest
+
+from video_processor_manager import VideoProcessorManager
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n안녕\n"
+
+
+def make_job(tmp_path):
+    video = tmp_path / 'movie.mp4'
+    video.write_bytes(b'fake video')
+    korean = tmp_path / 'movie.ko.srt'
+    korean.write_text(SRT, encoding='utf-8')
+    english = tmp_path / 'movie.en.srt'
+    english.write_text(SRT.replace('안녕', 'hello'), encoding='utf-8')
+    return str(video), str(korean), str(english)
+
+
+def mux_args(fake_ffmpeg):
+    calls = [call['args'] for call in fake_ffmpeg.calls() if call['program'] == 'ffmpeg' and '-c:s' in call['args']]
+    assert len(calls) == 1
+    return calls[0]
+
+
+def option_values(args, option):
+    return [args[i + 1] for i, arg in enumerate(args) if arg == option]
+
+
+def run_mux(tmp_path, mode, with_korean=True, with_english=True):
+    video, korean, english = make_job(tmp_path)
+    korean, english = (korean if with_korean else None), (english if with_english else None)
+    manager = VideoProcessorManager('none', False, 0, 0, use_output_cache=False, soft_subtitles=mode)
+    return manager.process_single_video(video, korean, english), video
+
+
+@pytest.mark.parametrize('mode, container, codec', [('mkv', 'mkv', 'ass'), ('mp4', 'mp4', 'mov_text')])
+def test_language_tracks_are_copied_with_korean_default(fake_ffmpeg, tmp_path, mode, container, codec):
+    result, video = run_mux(tmp_path, mode)
+    assert result.status == 'Success', result.message
+    assert result.encoder == 'copy'
+    assert os.path.exists(tmp_path / f"movie_softsub.{container}")
+
+    args = mux_args(fake_ffmpeg)
+    inputs = option_values(args, '-i')
+    assert inputs[0] == video and all(path.endswith('_temp.ass') for path in inputs[1:]) and len(inputs) == 3
+    assert option_values(args, '-map') == ['0:v', '0:a?', '1:0', '2:0']
+    assert option_values(args, '-c:v') == ['copy'] and option_values(args, '-c:a') == ['copy']
+    assert option_values(args, '-c:s') == [codec]
+    assert option_values(args, '-metadata:s:s:0')[:2] == ['language=kor', 'title=한국어']
+    assert option_values(args, '-metadata:s:s:1')[:2] == ['language=eng', 'title=English']
+    assert option_values(args, '-disposition:s:0') == ['default']
+    assert option_values(args, '-disposition:s:1') == ['0']
+    # 미완성 이름으로 쓴 뒤 성공하면 최종 이름으로 바꿈
+    assert args[-1] == str(tmp_path / f"movie_softsub.partial.{container}")
+
+
+def test_mp4_gets_faststart_and_handler_names(fake_ffmpeg, tmp_path):
+    run_mux(tmp_path, 'mp4')
+    args = mux_args(fake_ffmpeg)
+    assert option_values(args, '-movflags') == ['+faststart']
+    assert 'handler_name=한국어' in option_values(args, '-metadata:s:s:0')
+
+
+def test_mkv_has_no_mp4_only_options(fake_ffmpeg, tmp_path):
+    run_mux(tmp_path, 'mkv')
+    args = mux_args(fake_ffmpeg)
+    assert '-movflags' not in args
+    assert not any(value.startswith('handler_name=') for value in option_values(args, '-metadata:s:s:0'))
+
+
+def test_merged_mode_writes_one_default_track(fake_ffmpeg, tmp_path):
+    result, _ = run_mux(tmp_path, 'mkv-merged')
+    assert result.status == 'Success', result.message
+    args = mux_args(fake_ffmpeg)
+    assert len(option_values(args, '-i')) == 2
+    assert option_values(args, '-map') == ['0:v', '0:a?', '1:0']
+    assert option_values(args, '-metadata:s:s:0')[:2] == ['language=mul', 'title=한국어 + English']
+    assert option_values(args, '-disposition:s:0') == ['default']
+
+
+def test_single_language_uses_only_that_track(fake_ffmpeg, tmp_path):
+    result, _ = run_mux(tmp_path, 'mkv', with_korean=False)
+    assert result.status == 'Success', result.message
+    args = mux_args(fake_ffmpeg)
+    assert option_values(args, '-map') == ['0:v', '0:a?', '1:0']
+    # 영어 트랙만 있으면 그것이 기본 트랙
+    assert option_values(args, '-metadata:s:s:0')[:1] == ['language=eng']
+    assert option_values(args, '-disposition:s:0') == ['default']
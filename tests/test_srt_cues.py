@@ -0,0 +1,149 @@
+# srt_cues 파서 / 시간 변환 / cue 캐시 테스트 (FFmpeg 불필요)
+
+import pytest
+
+import srt_cues
+from srt_cues import (
+    Cue, CueCacheReleaser, iter_cues, iter_srt_lines, load_cues, ms_to_ass_time, ms_to_time_str, parse_srt,
+    parse_srt_lines, store_cues, time_str_to_ms,
+)
+
+SAMPLE_SRT = (
+    "1\n"
+    "00:00:01,000 --> 00:00:02,500\n"
+    "첫 번째 줄\n"
+    "\n"
+    "2\n"
+    "00:00:03,000 --> 00:00:04,000\n"
+    "두 줄짜리\n"
+    "자막\n"
+    "\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cue_cache():
+    srt_cues.clear_cue_cache()
+    yield
+    srt_cues.clear_cue_cache()
+
+
+def write_file(path, text, encoding='utf-8', newline='\n'):
+    with open(path, 'w', encoding=encoding, newline=newline) as f:
+        f.write(text)
+    return str(path)
+
+
+def test_parse_basic_blocks():
+    cues = parse_srt_lines(SAMPLE_SRT.splitlines())
+    assert list(cues) == [
+        Cue('1', 1000, 2500, '첫 번째 줄'),
+        Cue('2', 3000, 4000, '두 줄짜리\n자막'),
+    ]
+    assert cues.warnings == []
+
+
+def test_parse_last_block_without_trailing_blank_line():
+    cues = parse_srt_lines(SAMPLE_SRT.rstrip('\n').splitlines())
+    assert len(cues) == 2
+    assert cues[-1].text == '두 줄짜리\n자막'
+
+
+def test_parse_srt_strips_bom_and_crlf(tmp_path):
+    path = write_file(tmp_path / 'bom.srt', SAMPLE_SRT, encoding='utf-8-sig', newline='\r\n')
+    cues = parse_srt(path)
+    assert [cue.index for cue in cues] == ['1', '2']
+    assert cues[0].text == '첫 번째 줄'
+    assert cues.path == path
+
+
+def test_parse_accepts_dot_separator_and_short_fields():
+    cues = parse_srt_lines(["7", "0:0:1.5 --> 0:00:02.25", "text"])
+    assert list(cues) == [Cue('7', 1005, 2025, 'text')]
+
+
+def test_malformed_blocks_are_skipped_with_warnings():
+    lines = (
+        "1\n"
+        "00:00:01,000 -> 00:00:02,000\n"   # 화살표 오류: 시간 줄로 인식되지 않음
+        "잘못된 블록\n"
+        "\n"
+        "2\n"
+        "00:00:xx,000 --> 00:00:04,000\n"  # 시간 형식 오류
+        "\n"
+        "3\n"
+        "00:00:05,000 --> 00:00:06,000\n"
+        "정상\n"
+    ).splitlines()
+    cues = parse_srt_lines(lines)
+    assert list(cues) == [Cue('3', 5000, 6000, '정상')]
+    assert len(cues.warnings) == 3
+    assert any('6번 줄의 시간 형식' in warning for warning in cues.warnings)
+    assert any('자막 1의 시간 정보가 불완전' in warning for warning in cues.warnings)
+
+
+def test_iter_srt_lines_collects_warnings_lazily():
+    warnings = []
+    cues = iter_srt_lines(iter(["1", "no time", "", "2", "00:00:01,000 --> 00:00:02,000", "ok"]), warnings)
+    assert next(cues) == Cue('2', 1000, 2000, 'ok')
+    assert len(warnings) == 1
+
+
+def test_time_string_round_trip():
+    assert time_str_to_ms("01:02:03,456") == 3723456
+    assert ms_to_time_str(3723456) == "01:02:03,456"
+    assert ms_to_time_str(-5) == "00:00:00,000"
+    assert time_str_to_ms("garbage") == 0
+
+
+@pytest.mark.parametrize('ms, expected', [
+    (0, "0:00:00.00"),
+    (9, "0:00:00.00"),
+    (1234, "0:00:01.23"),
+    (61_990, "0:01:01.99"),
+    (3_723_456, "1:02:03.45"),
+    (36_000_000, "10:00:00.00"),
+    (-100, "0:00:00.00"),
+])
+def test_ms_to_ass_time(ms, expected):
+    assert ms_to_ass_time(ms) == expected
+
+
+def test_load_cues_is_cached_until_file_changes(tmp_path):
+    path = write_file(tmp_path / 'a.srt', SAMPLE_SRT)
+    first = load_cues(path)
+    assert load_cues(path) is first
+
+    write_file(path, SAMPLE_SRT + "3\n00:00:05,000 --> 00:00:06,000\n추가\n")
+    reloaded = load_cues(path)
+    assert reloaded is not first
+    assert len(reloaded) == 3
+
+
+def test_iter_cues_streams_without_caching(tmp_path):
+    path = write_file(tmp_path / 'a.srt', SAMPLE_SRT)
+    assert [cue.start_ms for cue in iter_cues(path)] == [1000, 3000]
+    assert srt_cues._cache == {}
+
+
+def test_iter_cues_prefers_stored_fixed_cues(tmp_path):
+    path = write_file(tmp_path / 'a.srt', SAMPLE_SRT)
+    cues = load_cues(path)
+    shifted = cues.with_times(cues.starts, type(cues.ends)('q', [2000, 3500]), overlap_policy='clamp')
+    store_cues(path, shifted)
+    assert [cue.end_ms for cue in iter_cues(path)] == [2000, 3500]
+    assert srt_cues.cached_overlap_policy(path) == 'clamp'
+
+
+def test_cue_cache_is_released_after_last_job_using_subtitle(tmp_path):
+    shared = write_file(tmp_path / 'shared.srt', SAMPLE_SRT)
+    own = write_file(tmp_path / 'own.srt', SAMPLE_SRT)
+    jobs = [('a.mp4', shared, None), ('b.mp4', shared, own)]
+    load_cues(shared)
+    load_cues(own)
+    releaser = CueCacheReleaser(jobs)
+
+    releaser.job_finished(jobs[0])
+    assert srt_cues.cached_cues(shared) is not None  # 다른 작업이 아직 사용
+    releaser.job_finished(jobs[1])
+    assert srt_cues._cache == {}
@@ -0,0 +1,47 @@
+# 자막 검사 결과 캐시 테스트 (원본 검사만 캐시, 겹침 수정된 자막은 해시 없이 바로 검사)
+
+import pytest
+
+import subtitle_check_cache
+from srt_cues import clear_cue_cache
+from srt_overlap_error import fix_srt_overlaps_in_memory
+from subtitle_check_cache import SubtitleCheckCache, check_srt_cached, hash_subtitle_file
+
+OVERLAPPING_SRT = (
+    "1\n00:00:01,000 --> 00:00:03,000\n하나\n\n"
+    "2\n00:00:02,000 --> 00:00:04,000\n둘\n"
+)
+
+
+@pytest.fixture
+def check_cache(tmp_path, monkeypatch):
+    cache = SubtitleCheckCache(db_path=str(tmp_path / 'checks.sqlite3'))
+    monkeypatch.setattr(subtitle_check_cache, '_subtitle_check_cache', cache)
+    clear_cue_cache()
+    yield cache
+    clear_cue_cache()
+
+
+def test_unfixed_subtitle_check_is_reused_by_content(check_cache, tmp_path, monkeypatch):
+    srt = tmp_path / 'movie.ko.srt'
+    srt.write_text(OVERLAPPING_SRT, encoding='utf-8')
+    errors = check_srt_cached(str(srt))
+    assert len(errors) == 1
+
+    # 같은 내용의 다른 파일은 파싱/검사 없이 저장된 결과를 사용
+    copy = tmp_path / 'copy.ko.srt'
+    copy.write_text(OVERLAPPING_SRT, encoding='utf-8')
+    monkeypatch.setattr(subtitle_check_cache, 'check_srt_overlap', lambda path: pytest.fail("다시 검사함"))
+    assert check_srt_cached(str(copy)) == errors
+
+
+def test_fixed_subtitle_is_checked_without_hashing(check_cache, tmp_path, monkeypatch):
+    srt = tmp_path / 'movie.ko.srt'
+    srt.write_text(OVERLAPPING_SRT, encoding='utf-8')
+    content_hash = hash_subtitle_file(str(srt))
+    fix_srt_overlaps_in_memory(str(srt), 'clamp')
+    monkeypatch.setattr(subtitle_check_cache, 'hash_subtitle_file', lambda path: pytest.fail("해시 계산함"))
+
+    assert check_srt_cached(str(srt)) == []
+    # 수정된 cue의 검사 결과는 원본 내용 해시로 저장하지 않음
+    assert check_cache.get(content_hash) is None
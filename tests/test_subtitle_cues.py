@@ -0,0 +1,90 @@
+# 컬럼형 cue 저장소(SubtitleCues)와 배열 기반 겹침 검사 테스트
+
+from array import array
+
+import pytest
+
+import srt_cues
+from srt_cues import Cue, SubtitleCues, store_cues
+from srt_overlap_error import check_srt_overlap
+
+CUES = [
+    Cue('1', 1000, 2000, 'a'),
+    Cue('2', 1500, 3000, '둘째\n줄'),
+    Cue('', 4000, 5000, ''),
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_cue_cache():
+    srt_cues.clear_cue_cache()
+    yield
+    srt_cues.clear_cue_cache()
+
+
+def test_from_cues_round_trip():
+    cues = SubtitleCues.from_cues(CUES, path='x.srt')
+    assert len(cues) == 3
+    assert list(cues) == CUES
+    assert cues[-1] == CUES[-1]
+    assert isinstance(cues.starts, array) and cues.starts.typecode == 'q'
+    assert list(cues.starts) == [1000, 1500, 4000]
+    assert list(cues.ends) == [2000, 3000, 5000]
+    assert cues.slots is None
+    assert not cues.fixed
+
+
+def test_text_and_index_share_one_buffer():
+    cues = SubtitleCues.from_cues(CUES)
+    assert cues._text_buffer == 'a둘째\n줄'
+    assert [cues.text(i) for i in range(3)] == ['a', '둘째\n줄', '']
+    assert [cues.index(i) for i in range(3)] == ['1', '2', '']
+
+
+def test_slots_are_kept_only_when_used():
+    cues = SubtitleCues.from_cues([Cue('1', 0, 10, 'a', 0), Cue('2', 5, 10, 'b', 1)])
+    assert list(cues.slots) == [0, 1]
+    assert cues[1].slot == 1
+
+
+def test_with_times_shares_text_and_marks_policy():
+    cues = SubtitleCues.from_cues(CUES)
+    fixed = cues.with_times(cues.starts, array('q', [1500, 3000, 5000]), overlap_policy='clamp')
+    assert fixed.fixed and fixed.overlap_policy == 'clamp'
+    assert fixed._text_buffer is cues._text_buffer
+    assert fixed[0] == Cue('1', 1000, 1500, 'a')
+    assert cues[0].end_ms == 2000  # 원본은 그대로
+
+
+def test_take_reorders_and_filters():
+    cues = SubtitleCues.from_cues(CUES)
+    taken = cues.take([2, 0])
+    assert list(taken) == [CUES[2], CUES[0]]
+    assert taken.text(1) == 'a'
+
+
+def test_check_srt_overlap_reports_adjacent_overlaps(tmp_path):
+    path = tmp_path / 'o.srt'
+    path.write_text(
+        "1\n00:00:01,000 --> 00:00:03,000\na\n\n"
+        "2\n00:00:02,000 --> 00:00:04,000\nb\n\n"
+        "3\n00:00:05,000 --> 00:00:06,000\nc\n",
+        encoding='utf-8'
+    )
+    errors = check_srt_overlap(str(path))
+    assert len(errors) == 1
+    assert '자막 1' in errors[0] and '다음 자막 2' in errors[0]
+
+
+def test_check_srt_overlap_ignores_stacked_cues(tmp_path):
+    path = tmp_path / 's.srt'
+    path.write_text("1\n00:00:01,000 --> 00:00:03,000\na\n\n2\n00:00:02,000 --> 00:00:04,000\nb\n", encoding='utf-8')
+    stacked = SubtitleCues.from_cues([Cue('1', 1000, 3000, 'a', 0), Cue('2', 2000, 4000, 'b', 1)],
+                                     overlap_policy='stack')
+    store_cues(str(path), stacked)
+    assert check_srt_overlap(str(path)) == []
+
+
+def test_check_srt_overlap_missing_file(tmp_path):
+    errors = check_srt_overlap(str(tmp_path / 'missing.srt'))
+    assert len(errors) == 1 and '찾을 수 없습니다' in errors[0]
@@ -1,6 +1,12 @@
 # my_video_app/utils.py
 
+import os
+import platform
 import re
+import tempfile
+
+# ASS 오버라이드 태그 ({\fs..} 등) 제거용 (자막 줄마다 다시 컴파일하지 않도록 미리 컴파일)
+_OVERRIDE_TAG_PATTERN = re.compile(r"{.*?}")
 
 def escape_path(path: str) -> str:
     """
@@ -19,8 +25,10 @@ def adjust_font_size_and_position(text: str, width: int, height: int,
     """
     자막 문자열 길이에 따라 폰트 크기 및 화면 위치를 계산 (줄바꿈 제거 후 한 줄로 처리 시도)
     모든 영상이 목표 해상도(예: Full HD)로 업스케일링된 후 적용됩니다.
+    (해상도 독립 레이아웃에서는 width/height가 Full HD 기준 좌표계 크기입니다. utils.layout_space 참고)
     """
-    text_processed = re.sub(r"{.*?}", "", text).replace('\n', ' ')
+    text_processed = _OVERRIDE_TAG_PATTERN.sub("", text) if '{' in text else text
+    text_processed = text_processed.replace('\n', ' ')
     char_count = len(text_processed)
 
     # 폰트 크기 계산 로직 (초기 로직 유지)
@@ -48,4 +56,84 @@ def adjust_font_size_and_position(text: str, width: int, height: int,
         # 한글 자막 위치 (하단에서 충분히 위로 올림)
         position_y = int(height * 0.87) # Full HD 하단 20% 지점에 상단이 오도록
 
-    return font_size, position_x, position_y
\ No newline at end of file
+    return font_size, position_x, position_y
+
+
+# 해상도 독립 레이아웃의 기준 좌표계 (폰트 크기/패딩 값이 맞춰진 Full HD)
+DESIGN_WIDTH = 1920
+DESIGN_HEIGHT = 1080
+
+
+def layout_space(width: int, height: int, pads, design_space: bool):
+    """
+    ASS 작성 좌표계와 실제 영상에 넣을 패딩을 계산해 (ASS 가로, ASS 세로, 실제 패딩 튜플)을 반환
+    - design_space=False: 기존 방식. ASS 좌표 = 실제 픽셀, 패딩도 그대로
+    - design_space=True: ASS는 Full HD 기준 좌표계(종횡비 유지)로 작성하고 PlayRes로 실제 해상도에 맞춤.
+      패딩(Full HD 기준 픽셀)은 같은 비율로 줄여 짝수 픽셀로 맞추므로, 업스케일링 없이도 자막이 같은 모양으로 보임
+    pads는 Full HD 기준 패딩 값들이며, ASS 작성(레이아웃 함수)에는 그대로 사용합니다.
+    """
+    if not design_space:
+        return width, height, tuple(pads)
+    scale = min(width / DESIGN_WIDTH, height / DESIGN_HEIGHT)
+    video_pads = tuple(int(round(pad * scale / 2)) * 2 for pad in pads)
+    return round(width / scale), round(height / scale), video_pads
+
+
+def build_upscale_filter(target_width: int, target_height: int) -> str:
+    """
+    원본 종횡비를 유지하면서 목표 해상도로 스케일 후 남는 영역을 검은색으로 채우는 필터 문자열
+    (임시 업스케일 파일 생성과 단일 패스 필터 체인에서 공통으로 사용)
+    """
+    return (
+        f"scale='min({target_width},iw*min({target_height}/ih,{target_width}/iw)):"
+        f"min({target_height},ih*min({target_height}/ih,{target_width}/iw))',"
+        f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2:black"
+    )
+
+
+def get_cache_dir() -> str:
+    """
+    감지 결과 등 영구 캐시 파일을 저장할 디렉터리 경로를 반환 (없으면 생성)
+    DUALSUB_CACHE_DIR 환경 변수로 위치를 바꿀 수 있습니다.
+    """
+    cache_dir = os.environ.get('DUALSUB_CACHE_DIR')
+    if not cache_dir:
+        if platform.system() == 'Windows':
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(base, 'dualsubencoder')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def make_unique_temp_path(directory: str, stem: str, suffix: str) -> str:
+    """
+    여러 작업이 동시에 실행되어도 겹치지 않는 임시 파일 경로를 만들어 반환
+    (예: stem="video_merged", suffix="_temp.ass" → video_merged_k3j2x9_temp.ass)
+    파일은 빈 파일로 미리 생성되어 이름이 선점됩니다.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{stem}_", suffix=suffix, dir=directory or None)
+    os.close(fd)
+    return path
+
+
+def offset_position_for_slot(pos_y: int, font_size: int, slot: int, downward: bool) -> int:
+    """
+    'stack' 겹침 정책으로 같은 시간에 겹쳐 표시되는 자막의 y 위치를 줄 번호(slot)만큼 옮김
+    downward는 레이아웃마다 다른 언어 자막 영역을 침범하지 않는 방향을 지정합니다.
+    """
+    if not slot:
+        return pos_y
+    step = slot * int(font_size * 1.1)
+    return pos_y + step if downward else pos_y - step
+
+
+def get_partial_output_path(output_path: str) -> str:
+    """
+    인코딩 중에 쓸 미완성 출력 경로 (예: video_subtitled.mp4 → video_subtitled.partial.mp4)
+    완료된 뒤에만 최종 이름으로 바꾸므로, 중단되어도 불완전한 파일이 최종 이름으로 남지 않습니다.
+    (확장자를 유지해야 FFmpeg가 출력 형식을 알 수 있음)
+    """
+    base, ext = os.path.splitext(output_path)
+    return f"{base}.partial{ext}"
@@ -4,6 +4,9 @@
 
 import re
 
+# ASS 오버라이드 태그 ({\fs..} 등) 제거용 (자막 줄마다 다시 컴파일하지 않도록 미리 컴파일)
+_OVERRIDE_TAG_PATTERN = re.compile(r"{.*?}")
+
 def escape_path(path: str) -> str:
     """
     FFmpeg 필터에서 경로가 정상 인식되도록
@@ -26,7 +29,8 @@ def adjust_font_size_and_position(text: str, width: int, height: int,
     """
 
     # 1) 텍스트 전처리 및 폰트 크기 산정 (기존 로직과 유사하되 min 보장)
-    text_processed = re.sub(r"{.*?}", "", text).replace('\n', ' ')
+    text_processed = _OVERRIDE_TAG_PATTERN.sub("", text) if '{' in text else text
+    text_processed = text_processed.replace('\n', ' ')
     char_count = len(text_processed)
 
     if char_count <= 20:
@@ -2,6 +2,9 @@
 
 import re
 
+# ASS 오버라이드 태그 ({\fs..} 등) 제거용 (자막 줄마다 다시 컴파일하지 않도록 미리 컴파일)
+_OVERRIDE_TAG_PATTERN = re.compile(r"{.*?}")
+
 def escape_path(path: str) -> str:
     """
     FFmpeg 필터에서 경로가 정상 인식되도록
@@ -20,7 +23,8 @@ def adjust_font_size_and_position(text: str, width: int, height: int,
     자막 문자열 길이에 따라 폰트 크기 및 화면 위치를 계산 (줄바꿈 제거 후 한 줄로 처리 시도)
     모든 영상이 목표 해상도(예: Full HD)로 업스케일링된 후 적용됩니다.
     """
-    text_processed = re.sub(r"{.*?}", "", text).replace('\n', ' ')
+    text_processed = _OVERRIDE_TAG_PATTERN.sub("", text) if '{' in text else text
+    text_processed = text_processed.replace('\n', ' ')
     char_count = len(text_processed)
 
     # 폰트 크기 계산 로직 (초기 로직 유지)
@@ -0,0 +1,315 @@
+# video_processor_base.py
+# 레이아웃 프로세서 공용 기반 클래스 (패딩/자막 배치 계산을 제외한 처리 파이프라인)
+
+import os
+
+from encoder_registry import get_encoder_registry
+from probe_cache import probe_media
+from ffmpeg_runner import run_ffmpeg_process, progress_args, ffmpeg_binary, ffmpeg_threads
+from chunked_encoder import run_chunked_encode
+from encoding_profiles import DEFAULT_PROFILE, encoder_args, hw_input_args, finalize_filter
+from scratch import (
+    get_scratch_space, remove_scratch_file, estimate_upscaled_size, estimate_ass_size, ScratchSpaceError,
+)
+from job_result import (
+    JobTimer, ERROR_INPUT, ERROR_SUBTITLE, ERROR_SCRATCH, ERROR_UPSCALE, ERROR_ENCODE, ERROR_UNEXPECTED,
+)
+from utils import build_upscale_filter, get_partial_output_path
+
+
+class BaseVideoProcessor:
+    """
+    세 레이아웃 프로세서(video_processor / _with_padding / _with_bottom_double_padding)의 공용 처리 파이프라인
+    (프로브 → 업스케일 → ASS → 인코딩 → 교체/정리). 하위 클래스는 레이아웃에 해당하는
+    build_subtitle_filter / generate_merged_ass / get_output_path만 구현합니다.
+    """
+
+    def __init__(self, use_upscaling, target_width, target_height, single_pass=True, scratch_dir=None):
+        self.use_upscaling = use_upscaling
+        self.target_width = target_width
+        self.target_height = target_height
+        # True: 스케일/패딩/자막을 하나의 필터 체인으로 한 번에 인코딩 (임시 업스케일 파일 없음)
+        self.single_pass = single_pass
+        # 임시 업스케일 영상을 둘 로컬 디렉터리 (None이면 DUALSUB_SCRATCH_DIR 또는 시스템 임시 디렉터리)
+        self.scratch_dir = scratch_dir
+        # FFmpeg -threads 기본값 (None이면 CPU 코어 수). 병렬 배치에서는 작업 스레드마다 ffmpeg_runner.use_threads로 지정
+        self.threads = None
+        # FFmpeg 진행 이벤트(ffmpeg_runner.ProgressEvent)를 받을 콜백. 병렬 실행 시 여러 스레드에서 호출됨
+        self.progress_callback = None
+        # 2 이상이면 긴 영상을 키프레임 구간으로 나눠 이 수만큼 동시에 인코딩 (chunked_encoder)
+        self.chunk_workers = 1
+        # 출력 화질/용량 프로파일 (encoding_profiles.PROFILE_NAMES), size-target의 목표 비트레이트 (None이면 원본 비트레이트)
+        self.encoding_profile = DEFAULT_PROFILE
+        self.target_bitrate = None
+        # True: ASS를 Full HD 기준 좌표계로 작성하고 PlayRes로 실제 해상도에 맞춤 (업스케일링 없이 원본 해상도로 인코딩 가능)
+        self.design_space_layout = False
+
+    def hw_sessions_needed(self, input_path):
+        """하드웨어 인코더로 처리할 때 동시에 여는 인코딩 세션 수 (분할 인코딩이면 동시 구간 수)"""
+        return self.chunk_workers
+
+    def process_single_video(self, input_path, korean_srt_path, english_srt_path):
+        video_name = os.path.basename(input_path)
+        video_name_no_ext = os.path.splitext(video_name)[0]
+        temp_upscaled_path = "" # 임시 업스케일링 파일 경로 저장
+        temp_ass_path = "" # 임시 ASS 파일 경로 저장
+        partial_output_path = "" # 인코딩 중인 미완성 출력 경로
+        job = JobTimer(input_path)  # 단계별 시간과 결과 정보
+
+        try:
+            output_path = self.get_output_path(input_path)
+            job.output = output_path
+
+            if not korean_srt_path and not english_srt_path:
+                warning_msg = f"{video_name}: 최소 하나의 SRT 자막 파일이 선택되지 않았습니다. 스킵합니다."
+                return job.result("Warning", warning_msg)
+
+            with job.stage('probe'):
+                original_width, original_height = self.get_video_resolution(input_path)
+            if not original_width or not original_height:
+                error_msg = f"{video_name}: 원본 비디오 해상도 가져오기 실패"
+                return job.result("Error", error_msg, ERROR_INPUT)
+
+            job.encoder = self.get_encoder()
+            current_video_path_for_processing = input_path
+            final_video_width = original_width
+            final_video_height = original_height
+            scale_filter = "" # 단일 패스 모드에서 자막 필터 앞에 붙일 스케일/패딩 필터
+
+            # --- 업스케일링 로직 ---
+            if self.use_upscaling and self.single_pass and (original_width != self.target_width or original_height != self.target_height):
+                # 임시 파일 없이 스케일 → 자막을 하나의 필터 체인으로 처리 (디코딩/인코딩 1회)
+                print(f"원본 해상도 ({original_width}x{original_height})를 목표 해상도 ({self.target_width}x{self.target_height})로 단일 패스에서 스케일링합니다.")
+                scale_filter = build_upscale_filter(self.target_width, self.target_height)
+                final_video_width = self.target_width
+                final_video_height = self.target_height
+            elif self.use_upscaling and (original_width != self.target_width or original_height != self.target_height):
+                temp_upscaled_path = get_scratch_space(self.scratch_dir).large_path(
+                    video_name_no_ext + "_upscaled", "_temp.mp4",
+                    estimate_upscaled_size(input_path, original_width, original_height, self.target_width, self.target_height)
+                )
+                print(f"원본 해상도 ({original_width}x{original_height})가 목표 해상도 ({self.target_width}x{self.target_height})와 다릅니다. 업스케일링을 시작합니다.")
+
+                with job.stage('upscale'):
+                    upscale_result, upscale_error = self.run_upscaling(input_path, temp_upscaled_path, self.target_width, self.target_height, source=input_path)
+                if not upscale_result:
+                    error_msg = f"{video_name}: 비디오 업스케일링 실패 (인코더: {self.get_encoder()}).\n{upscale_error}"
+                    return job.result("Error", error_msg, ERROR_UPSCALE)
+                
+                current_video_path_for_processing = temp_upscaled_path
+                final_video_width = self.target_width
+                final_video_height = self.target_height
+                print(f"업스케일링 완료: {current_video_path_for_processing}")
+            else:
+                print(f"업스케일링 옵션이 비활성화되었거나, 원본 해상도 ({original_width}x{original_height})가 이미 목표 해상도 ({self.target_width}x{self.target_height})와 일치합니다. 업스케일링을 건너뜀.")
+
+
+            # 이후 로직에서는 current_video_path_for_processing (업스케일링된/원본 비디오)를 사용
+            
+            # ASS 파일 경로 (임시 파일명 사용)
+            temp_ass_path = get_scratch_space(self.scratch_dir).small_path(
+                video_name_no_ext + "_merged", "_temp.ass", estimate_ass_size(korean_srt_path, english_srt_path)
+            )
+
+            with job.stage('ass'):
+                subtitle_filter, final_display_height = self.build_subtitle_filter(
+                    english_srt_path, korean_srt_path, temp_ass_path, final_video_width, final_video_height)
+            if subtitle_filter is None:
+                error_msg = f"{video_name}: ASS 파일 병합 실패."
+                return job.result("Error", error_msg, ERROR_SUBTITLE)
+            vf_filter = f"{scale_filter},{subtitle_filter}" if scale_filter else subtitle_filter
+
+            # 사용할 인코더 확인
+            encoder = self.get_encoder()
+            print(f"선택된 인코더: {encoder}")
+
+            # FFmpeg 실행 (업스케일링된/원본 비디오를 입력으로 사용)
+            # 미완성 이름으로 인코딩한 뒤 성공하면 최종 이름으로 교체 (기존 출력은 그때까지 유지)
+            partial_output_path = get_partial_output_path(output_path)
+            with job.stage('encode'):
+                if self.chunk_workers > 1:
+                    ffmpeg_result, ffmpeg_error = run_chunked_encode(self, current_video_path_for_processing, partial_output_path, vf_filter,
+                                                                     source=input_path, chunk_workers=self.chunk_workers)
+                else:
+                    ffmpeg_result, ffmpeg_error = self.run_ffmpeg(current_video_path_for_processing, partial_output_path, vf_filter, source=input_path)
+            if ffmpeg_result:
+                with job.stage('finalize'):
+                    os.replace(partial_output_path, output_path)
+
+            if ffmpeg_result and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                job.width, job.height = final_video_width, final_display_height
+                success_msg = f"{video_name}: 성공적으로 처리되었습니다. 인코더: {encoder}" \
+                              f" 최종 해상도: {final_video_width}:{final_display_height}" # 패딩을 포함한 최종 해상도
+                return job.result("Success", success_msg)
+            else:
+                error_msg = f"{video_name}: FFmpeg 처리 실패 (인코더: {encoder}).\n{ffmpeg_error}"
+                return job.result("Error", error_msg, ERROR_ENCODE)
+
+        except ScratchSpaceError as e:
+            return job.result("Error", f"{video_name}: {e}", ERROR_SCRATCH)
+        except Exception as e:
+            error_msg = f"{video_name}: 예기치 않은 오류 발생 - {e}"
+            return job.result("Error", error_msg, ERROR_UNEXPECTED)
+        finally:
+            # 성공/실패/예외와 관계없이 임시 파일 정리 (스크래치 디렉터리는 프로세스 종료 시에도 삭제됨)
+            with job.stage('cleanup'):
+                remove_scratch_file(temp_upscaled_path, "임시 업스케일링 파일")
+                remove_scratch_file(temp_ass_path, "임시 ASS 파일")
+                remove_scratch_file(partial_output_path, "미완성 출력 파일")
+
+    def build_subtitle_filter(self, english_srt_path, korean_srt_path, temp_ass_path, video_width, video_height):
+        """
+        병합 ASS를 만들고 (패딩+자막 필터 문자열, 최종 캔버스 높이)를 반환. ASS 생성에 실패하면 (None, None)
+        video_width/height는 스케일 후 영상 크기 (multi_output도 같은 필터 체인을 사용)
+        """
+        raise NotImplementedError
+
+    def generate_merged_ass(self, english_srt, korean_srt, merged_ass, width, height, *pads):
+        raise NotImplementedError
+
+    def get_output_path(self, input_path):
+        raise NotImplementedError
+
+    def get_video_resolution(self, input_path):
+        """
+        ffprobe로 비디오 해상도(width, height)를 가져온다. (probe 캐시 사용)
+        실패 시 (None, None) 리턴
+        """
+        try:
+            info = probe_media(input_path)
+            return info.width, info.height
+        except Exception as e:
+            print(f"Error getting video resolution for {input_path}: {e}")
+            return None, None
+
+    def get_video_duration(self, input_path):
+        """진행률 계산용 영상 길이(초, probe 캐시 사용). 알 수 없으면 0.0"""
+        try:
+            return probe_media(input_path).duration
+        except Exception:
+            return 0.0
+
+    def run_upscaling(self, input_path, output_path, target_width, target_height, source=None):
+        """
+        FFmpeg를 사용하여 비디오를 목표 해상도로 업스케일링합니다.
+        """
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+            threads = ffmpeg_threads(self.threads)
+            encoder = self.get_encoder()
+
+            # 원본 종횡비 유지를 위한 스케일 및 패딩 필터
+            scale_filter = build_upscale_filter(target_width, target_height)
+
+            ffmpeg_command = [
+                ffmpeg_binary(),
+                *hw_input_args(encoder),
+                '-i', input_path,
+                '-vf', finalize_filter(scale_filter, encoder),
+                *encoder_args(DEFAULT_PROFILE, encoder),  # 중간 파일은 프로파일과 관계없이 무손실
+                '-c:a', 'copy',
+                '-threads', str(threads),
+                *progress_args(),
+                '-y',
+                output_path
+            ]
+            
+            print(f"실행할 FFmpeg 업스케일링 명령어: {' '.join(ffmpeg_command)}")
+
+            returncode, stderr_tail = run_ffmpeg_process(
+                ffmpeg_command, self.get_video_duration(source or input_path),
+                source=source or input_path, stage='upscale', on_progress=self.progress_callback
+            )
+
+            if returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                return True, ""
+            else:
+                return False, stderr_tail
+
+        except FileNotFoundError:
+            return False, "FFmpeg가 설치되어 있지 않거나, 환경 변수로 등록되지 않았습니다."
+        except Exception as e:
+            return False, f"비디오 업스케일링 중 오류: {e}"
+
+    def run_ffmpeg(self, input_path, output_path, vf_filter, source=None):
+        """
+        FFmpeg 실행 함수. vf_filter에 레이아웃별 패딩/자막 필터가 들어 있음
+        """
+        try:
+            if os.path.exists(output_path):
+                print(f"기존 출력 파일 삭제: {output_path}")
+                os.remove(output_path)
+                
+            encoder = self.get_encoder()
+            threads = ffmpeg_threads(self.threads)
+
+            ffmpeg_command = [ffmpeg_binary()]
+
+            ffmpeg_command.extend(hw_input_args(encoder))
+            ffmpeg_command.extend(['-i', input_path])
+            ffmpeg_command.extend(['-vf', finalize_filter(vf_filter, encoder)])
+
+            ffmpeg_command.extend(self.encoding_args(encoder, source or input_path))
+            
+            ffmpeg_command.extend(['-c:a', 'copy'])
+            
+            ffmpeg_command.extend([
+                '-threads', str(threads),
+                *progress_args(),
+                '-y',
+                output_path
+            ])
+
+            print(f"실행할 FFmpeg 명령어: {' '.join(ffmpeg_command)}")
+
+            returncode, stderr_tail = run_ffmpeg_process(
+                ffmpeg_command, self.get_video_duration(source or input_path),
+                source=source or input_path, stage='encode', on_progress=self.progress_callback
+            )
+            
+            if returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                if not os.path.exists(output_path):
+                    return False, "출력 파일이 생성되지 않았습니다."
+                if os.path.getsize(output_path) < 10240:
+                    return False, "출력 파일이 너무 작습니다. 인코딩이 제대로 되지 않았을 수 있습니다."
+                return True, ""
+            else:
+                return False, stderr_tail
+
+        except FileNotFoundError:
+            error_msg = "FFmpeg가 설치되어 있지 않거나, 환경 변수로 등록되지 않았습니다."
+            return False, error_msg
+        except Exception as e:
+            error_msg = f"FFmpeg 처리 중 오류: {e}"
+            return False, error_msg
+
+    def encoding_args(self, encoder, source):
+        """인코딩 프로파일의 '-c:v ...' 옵션 (size-target에 목표 비트레이트가 없으면 원본 비트레이트 사용)"""
+        bitrate = self.target_bitrate
+        if self.encoding_profile == 'size-target' and not bitrate:
+            bitrate = self.get_video_bitrate(source)
+        return encoder_args(self.encoding_profile, encoder, bitrate)
+
+    def detect_nvidia_gpu(self):
+        """NVIDIA GPU 존재 여부 (프로세스 공용 레지스트리에서 한 번만 감지)"""
+        return get_encoder_registry().detect_nvidia_gpu()
+
+    def detect_cpu_vendor(self):
+        return get_encoder_registry().detect_cpu_vendor()
+
+    def get_encoder(self):
+        return get_encoder_registry().get_encoder()
+
+    def get_video_bitrate(self, input_path):
+        try:
+            info = probe_media(input_path)
+            bit_rate = info.video_bit_rate or info.bit_rate
+            if bit_rate:
+                bitrate_kbps = bit_rate // 1000
+                return f"{bitrate_kbps}k"
+            else:
+                return None
+        except Exception:
+            return None
@@ -1,20 +1,150 @@
-from video_processor import VideoProcessor
-from video_processor_with_padding import VideoProcessor as VideoProcessorWithPadding
-from video_processor_with_bottom_double_padding import VideoProcessor as VideoProcessorWithBottomDoublePadding
+# 패딩 모드에 해당하는 프로세서 모듈만 import 합니다 (헤드리스 CLI 시작 시간 단축).
+
+import contextlib
+import os
+
+from batch_scheduler import is_hardware_encoder
+from encoder_registry import get_encoder_registry
+from encoding_profiles import DEFAULT_PROFILE
+from job_result import JobResult, output_size, ERROR_ENCODE, ERROR_UPSCALE
+from output_cache import get_output_cache, job_fingerprint
+
+# 다른 인코더로 다시 시도할 실패 분류 (입력/자막/임시 공간 문제는 인코더를 바꿔도 같은 결과)
+FALLBACK_ERROR_CATEGORIES = (ERROR_ENCODE, ERROR_UPSCALE)
 
 class VideoProcessorManager:
-    def __init__(self, padding_mode, use_upscaling, target_width, target_height):
+    def __init__(self, padding_mode, use_upscaling, target_width, target_height, single_pass=True, scratch_dir=None,
+                 use_output_cache=True, chunk_workers=1, encoding_profile=DEFAULT_PROFILE, target_bitrate=None,
+                 design_space_layout=False, soft_subtitles=None, hls=None):
         self.padding_mode = padding_mode
         self.use_upscaling = use_upscaling
         self.target_width = target_width
         self.target_height = target_height
+        self.single_pass = single_pass
+        self.scratch_dir = scratch_dir
+        # True: 입력 지문이 같고 기존 출력이 그대로면 재인코딩하지 않음 (output_cache)
+        self.use_output_cache = use_output_cache
+        # 2 이상이면 영상 하나를 키프레임 구간으로 나눠 동시에 인코딩 (긴 영상의 처리 시간 단축)
+        self.chunk_workers = chunk_workers
+        # 출력 화질/용량 프로파일 (encoding_profiles.PROFILE_NAMES)과 size-target의 목표 비트레이트 (예: '4M')
+        self.encoding_profile = encoding_profile
+        self.target_bitrate = target_bitrate
+        # True: 자막을 Full HD 기준 좌표계로 작성해 원본 해상도에서도 같은 모양으로 표시 (업스케일링 선택 사항)
+        self.design_space_layout = design_space_layout
+        # 소프트 자막 모드 이름 (soft_subtitle_mux.SOFT_SUBTITLE_MODE_NAMES). 지정하면 재인코딩 없이 자막 트랙만 넣음
+        self.soft_subtitles = soft_subtitles
+        # HLS 세그먼트 형식 (hls_output.HLS_SEGMENT_TYPE_NAMES). 지정하면 해상도 단계별 HLS 세그먼트/재생 목록으로 출력
+        self.hls = hls
+        # 하드웨어 인코더 동시 세션 제한 (BatchScheduler가 설정하는 HardwareSessionLimiter, None이면 제한 없음)
+        self.hw_sessions = None
+        if self.hls and (self.soft_subtitles or self.padding_mode == 'all'):
+            raise ValueError("HLS 출력은 소프트 자막 모드나 padding_mode 'all'과 함께 사용할 수 없습니다.")
 
-        if self.padding_mode == 'top_bottom':
-            self.processor = VideoProcessorWithPadding(self.use_upscaling, self.target_width, self.target_height)
+        if self.soft_subtitles:
+            from soft_subtitle_mux import SoftSubtitleMuxer
+            self.processor = SoftSubtitleMuxer(self.soft_subtitles, self.scratch_dir)
+        elif self.padding_mode == 'all':
+            # 세 레이아웃을 한 번의 디코딩으로 모두 출력
+            from multi_output import MultiOutputProcessor
+            self.processor = MultiOutputProcessor(self.use_upscaling, self.target_width, self.target_height, self.single_pass, self.scratch_dir)
+        elif self.padding_mode == 'top_bottom':
+            from video_processor_with_padding import VideoProcessor as VideoProcessorWithPadding
+            self.processor = VideoProcessorWithPadding(self.use_upscaling, self.target_width, self.target_height, self.single_pass, self.scratch_dir)
         elif self.padding_mode == 'bottom_double':
-            self.processor = VideoProcessorWithBottomDoublePadding(self.use_upscaling, self.target_width, self.target_height)
+            from video_processor_with_bottom_double_padding import VideoProcessor as VideoProcessorWithBottomDoublePadding
+            self.processor = VideoProcessorWithBottomDoublePadding(self.use_upscaling, self.target_width, self.target_height, self.single_pass, self.scratch_dir)
         else:
-            self.processor = VideoProcessor(self.use_upscaling, self.target_width, self.target_height)
+            from video_processor import VideoProcessor
+            self.processor = VideoProcessor(self.use_upscaling, self.target_width, self.target_height, self.single_pass, self.scratch_dir)
+        if self.hls:
+            # 패딩 모드의 프로세서는 자막 배치만 담당하고, 인코딩은 단계별 HLS 출력으로 처리
+            from hls_output import HlsPackager
+            self.processor = HlsPackager(self.processor, self.hls)
+        self.processor.chunk_workers = self.chunk_workers
+        self.processor.encoding_profile = self.encoding_profile
+        self.processor.target_bitrate = self.target_bitrate
+        self.processor.design_space_layout = self.design_space_layout
 
     def process_single_video(self, input_path, korean_srt_path, english_srt_path):
-        return self.processor.process_single_video(input_path, korean_srt_path, english_srt_path)
+        if not self.use_output_cache or not (korean_srt_path or english_srt_path):
+            return self.process_with_fallback(input_path, korean_srt_path, english_srt_path)[0]
+
+        output_paths = self.get_output_paths(input_path)
+        registry = get_encoder_registry()
+        fingerprint_encoder = registry.get_encoder()
+        try:
+            fingerprint = job_fingerprint(self.processor, input_path, korean_srt_path, english_srt_path)
+        except Exception as e:
+            print(f"입력 지문 계산 실패 (출력 캐시 사용 안 함): {e}")
+            return self.process_with_fallback(input_path, korean_srt_path, english_srt_path)[0]
+
+        cache = get_output_cache()
+        if all(cache.is_valid(output_path, fingerprint) for output_path in output_paths):
+            names = ', '.join(os.path.basename(output_path) for output_path in output_paths)
+            message = f"{os.path.basename(input_path)}: 입력과 설정이 이전과 같아 기존 출력을 사용합니다. ({names})"
+            output = output_paths[0] if len(output_paths) == 1 else output_paths
+            return JobResult("Success", message, video=input_path, output=output, cached=True,
+                             input_bytes=os.path.getsize(input_path),
+                             output_bytes=output_size(output))
+
+        result, encoder = self.process_with_fallback(input_path, korean_srt_path, english_srt_path)
+        if result[0] == "Success":
+            if encoder != fingerprint_encoder:
+                # 다른 인코더로 다시 시도해 성공했다면 실제 사용한 인코더 기준으로 지문 기록
+                with registry.use_encoder(encoder):
+                    fingerprint = job_fingerprint(self.processor, input_path, korean_srt_path, english_srt_path)
+            for output_path in output_paths:
+                cache.record(output_path, fingerprint)
+        return result
+
+    def get_output_paths(self, input_path):
+        """작업 하나가 만드는 출력 경로 목록 (다중 출력 모드는 레이아웃마다 하나)"""
+        if hasattr(self.processor, 'get_output_paths'):
+            return self.processor.get_output_paths(input_path)
+        return [self.processor.get_output_path(input_path)]
+
+    def hardware_session(self, encoder, input_path):
+        """
+        encoder가 하드웨어 인코더면 동시 세션을 잡는 컨텍스트 (소프트웨어 인코더/제한 없음이면 빈 컨텍스트)
+        처리기가 한 작업에서 동시에 여는 인코더 수(hw_sessions_needed)만큼 잡음
+        (분할 인코딩은 동시 구간 수, 다중 출력은 레이아웃 수, HLS는 단계 수)
+        """
+        if self.hw_sessions is None or not is_hardware_encoder(encoder):
+            return contextlib.nullcontext()
+        sessions = self.processor.hw_sessions_needed(input_path)
+        if sessions > self.hw_sessions.max_sessions:
+            print(f"경고: {os.path.basename(input_path)} 작업은 하드웨어 인코더 세션 {sessions}개를 동시에 사용하지만 "
+                  f"제한은 {self.hw_sessions.max_sessions}개입니다. 세션을 모두 잡고 단독으로 실행합니다.")
+        return self.hw_sessions.reserve(sessions)
+
+    def process_with_fallback(self, input_path, korean_srt_path, english_srt_path):
+        """
+        인코더 체인 순서대로 처리하고 (JobResult, 마지막으로 사용한 인코더)를 반환합니다.
+        인코딩 단계에서 실패하면 다음 인코더로 다시 시도하고, 다음 인코더로 성공하면
+        실패한 인코더는 체인에서 제외되어 이후 작업은 처음부터 동작하는 인코더를 사용합니다.
+        (다음 인코더로도 실패하면 입력 문제로 보고 앞의 인코더는 그대로 둠)
+        결과의 attempted_encoders에는 실패 후 다시 시도하기 전에 사용한 인코더가 순서대로 기록됩니다.
+        """
+        registry = get_encoder_registry()
+        chain = registry.encoder_chain()
+        encoder = registry.get_encoder()
+        failed = []
+        while True:
+            with self.hardware_session(encoder, input_path), registry.use_encoder(encoder):
+                result = JobResult.from_tuple(self.processor.process_single_video(input_path, korean_srt_path, english_srt_path),
+                                              video=input_path, encoder=encoder)
+            result.attempted_encoders = list(failed)
+            if result[0] == "Success":
+                for failed_encoder in failed:
+                    registry.demote(failed_encoder)
+                return result, encoder
+            # 인코딩/업스케일링 단계의 실패만 다시 시도 (소프트 자막은 스트림 복사라 인코더와 무관)
+            if result.error_category not in FALLBACK_ERROR_CATEGORIES or self.soft_subtitles:
+                return result, encoder
+
+            remaining = chain[chain.index(encoder) + 1:] if encoder in chain else []
+            if not remaining:
+                return result, encoder
+            failed.append(encoder)
+            print(f"{os.path.basename(input_path)}: 인코더 {encoder}로 실패, {remaining[0]}로 다시 시도합니다.")
+            encoder = remaining[0]